@@ -6,6 +6,8 @@ const path = require('path');
 
 const app = express();
 const port = process.env.PORT || 3000;
+// 设置后改为监听Unix域套接字
+const socketPath = process.env.SOCKET_PATH;
 
 // 创建Solana连接
 const connection = new Connection('https://api.mainnet-beta.solana.com');
@@ -120,8 +122,12 @@ app.get('/parse/:signature', async (req, res) => {
 // 启动服务
 async function startServer() {
     await initParser();
-    app.listen(port, () => {
-        console.log(`Parser service running on port ${port}`);
+    if (socketPath) {
+        // 清理上次运行遗留的套接字文件
+        await fs.unlink(socketPath).catch(() => {});
+    }
+    app.listen(socketPath || port, () => {
+        console.log(`Parser service running on ${socketPath || `port ${port}`}`);
         console.log('Known programs:', Object.keys(KNOWN_PROGRAMS));
     });
 }
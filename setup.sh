@@ -139,6 +139,16 @@ install_python_deps() {
     pip install -r requirements.txt
 }
 
+# 编译可选的Cython聚合内核(未编译时自动使用纯Python/NumPy实现)
+build_extensions() {
+    if python3 -c "import Cython" &> /dev/null; then
+        print_message "编译 Cython 扩展..."
+        CFLAGS="-O3 -march=native" cythonize -i src/solana/_analyzer_core.pyx || print_warning "Cython 扩展编译失败，将使用纯Python实现"
+    else
+        print_warning "未安装 Cython，跳过扩展编译"
+    fi
+}
+
 # 主函数
 main() {
     print_message "开始安装..."
@@ -162,6 +172,7 @@ main() {
     install_yellowstone
     create_configs
     install_python_deps
+    build_extensions
     
     print_message "安装完成！"
     print_message "使用 ./start-services.sh 启动服务"
@@ -22,6 +22,7 @@ INACTIVE_THRESHOLD = 72 * 3600  # 不活跃阈值(秒)
 
 # 数据收集配置
 DATA_LIMIT = 100  # 每次查询的数据限制
+PARSER_WORKERS = int(os.environ.get("PARSER_WORKERS", "0")) or os.cpu_count()  # 批量解析交易的进程数，0表示CPU核数
 LOG_LEVEL = "INFO"  # 日志级别
 
 # 路径配置
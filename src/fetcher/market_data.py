@@ -34,21 +34,16 @@ class MarketDataCollector:
         """
         try:
             # 使用 DEX 解析器获取池子数据
-            pool_data = await self.dex_parser.parse_pool_data(pool_address)
+            pool = await self.dex_parser.parse_pool_data(pool_address)
             
-            if not pool_data:
+            if not pool:
                 return {}
             
-            # 从池子数据中提取价格信息
-            tokens = pool_data.get("tokens", {})
-            token_a = tokens.get("token_a", {})
-            token_b = tokens.get("token_b", {})
-            
             # 计算价格
-            reserve_a = float(token_a.get("reserve", 0))
-            reserve_b = float(token_b.get("reserve", 0))
-            decimals_a = int(token_a.get("decimals", 0))
-            decimals_b = int(token_b.get("decimals", 0))
+            reserve_a = float(pool.token_a_reserve or 0)
+            reserve_b = float(pool.token_b_reserve or 0)
+            decimals_a = int(pool.token_a_decimals or 0)
+            decimals_b = int(pool.token_b_decimals or 0)
             
             if reserve_a > 0 and reserve_b > 0:
                 # 考虑代币精度计算价格
@@ -57,10 +52,9 @@ class MarketDataCollector:
                 price = 0.0
             
             # 如果池子数据中直接包含价格信息,使用池子提供的价格
-            if "price" in pool_data:
-                pool_price = pool_data["price"].get("current_price")
-                if pool_price is not None:
-                    price = float(pool_price)
+            pool_price = pool.current_price
+            if pool_price is not None:
+                price = float(pool_price)
             
             return {
                 "current_price": price,
@@ -85,21 +79,16 @@ class MarketDataCollector:
         """
         try:
             # 使用 DEX 解析器获取池子数据
-            pool_data = await self.dex_parser.parse_pool_data(pool_address)
+            pool = await self.dex_parser.parse_pool_data(pool_address)
             
-            if not pool_data:
+            if not pool:
                 return {}
             
-            # 从池子数据中提取深度信息
-            tokens = pool_data.get("tokens", {})
-            token_a = tokens.get("token_a", {})
-            token_b = tokens.get("token_b", {})
-            
             # 计算流动性深度
-            reserve_a = float(token_a.get("reserve", 0))
-            reserve_b = float(token_b.get("reserve", 0))
-            decimals_a = int(token_a.get("decimals", 0))
-            decimals_b = int(token_b.get("decimals", 0))
+            reserve_a = float(pool.token_a_reserve or 0)
+            reserve_b = float(pool.token_b_reserve or 0)
+            decimals_a = int(pool.token_a_decimals or 0)
+            decimals_b = int(pool.token_b_decimals or 0)
             
             # 将储备金额转换为实际金额
             actual_reserve_a = reserve_a / (10 ** decimals_a)
@@ -286,7 +275,8 @@ class MarketDataCollector:
             )
             
             # 获取池子基本信息
-            pool_data = await self.dex_parser.parse_pool_data(pool_address)
+            pool = await self.dex_parser.parse_pool_data(pool_address)
+            pool_data = pool.to_dict() if pool else {}
             
             return {
                 "pool_address": pool_address,
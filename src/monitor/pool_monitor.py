@@ -344,6 +344,8 @@ class PoolMonitor:
         
         # 关闭线程池
         self.executor.shutdown(wait=True)
+        self.dex_parser.close()
+        self.market_collector.dex_parser.close()
         
         # 关闭客户端连接
         await self.client.close()
@@ -1,6 +1,7 @@
 """
 基础解析器模块，提供通用的交易解析接口和功能。
 """
+import inspect
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from solana.rpc.types import TxInfo
@@ -46,7 +47,7 @@ class BaseParser:
         
         Args:
             program_id: 程序ID
-            parser_func: 解析函数
+            parser_func: 解析函数，可以是同步函数或协程函数
         """
         self.program_parsers[program_id] = parser_func
     
@@ -95,7 +96,9 @@ class BaseParser:
             # 查找对应的解析器
             parser = self.program_parsers.get(program_id)
             if parser:
-                parsed_ix = await parser(ix, tx_info)
+                parsed_ix = parser(ix, tx_info)
+                if inspect.isawaitable(parsed_ix):
+                    parsed_ix = await parsed_ix
                 if parsed_ix:
                     instructions.append(parsed_ix)
             
@@ -111,7 +114,9 @@ class BaseParser:
                         program_id = str(inner_ix.program_id)
                         parser = self.program_parsers.get(program_id)
                         if parser:
-                            parsed_inner = await parser(inner_ix, tx_info)
+                            parsed_inner = parser(inner_ix, tx_info)
+                            if inspect.isawaitable(parsed_inner):
+                                parsed_inner = await parsed_inner
                             if parsed_inner:
                                 inner_instructions.append(parsed_inner)
                     
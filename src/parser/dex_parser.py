@@ -1,12 +1,230 @@
 """DEX protocol parser using solana-tx-parser."""
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, ClassVar
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 from solana_tx_parser import SolanaParser, ParsedTransaction
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4096)
+def _pk(address: str) -> Pubkey:
+    """Decode a base58 address once and reuse the Pubkey afterwards."""
+    return Pubkey.from_string(address)
+
+@lru_cache(maxsize=1024)
+def _is_swap_name(name: str) -> bool:
+    """Whether an instruction name denotes a swap; names repeat heavily so cache the check."""
+    return "swap" in name.lower()
+
+@dataclass
+class PoolView:
+    """Lazy view over parsed pool account data.
+    
+    Fields are read from the underlying solana-tx-parser result on access
+    instead of being copied into a nested dict up front.
+    """
+    __slots__ = ("_raw",)
+    
+    protocol: ClassVar[str] = "unknown"
+    _raw: Dict[str, Any]
+    
+    @property
+    def version(self) -> Any:
+        return self._raw.get("version")
+    
+    @property
+    def token_a_mint(self) -> Optional[str]:
+        return self._raw.get("tokenAMint")
+    
+    @property
+    def token_b_mint(self) -> Optional[str]:
+        return self._raw.get("tokenBMint")
+    
+    @property
+    def token_a_decimals(self) -> Optional[int]:
+        return self._raw.get("tokenADecimals")
+    
+    @property
+    def token_b_decimals(self) -> Optional[int]:
+        return self._raw.get("tokenBDecimals")
+    
+    @property
+    def token_a_reserve(self) -> Any:
+        return self._raw.get("tokenAReserve")
+    
+    @property
+    def token_b_reserve(self) -> Any:
+        return self._raw.get("tokenBReserve")
+    
+    @property
+    def trade_fee_numerator(self) -> Any:
+        return self._raw.get("tradeFeeNumerator")
+    
+    @property
+    def trade_fee_denominator(self) -> Any:
+        return self._raw.get("tradeFeeDenominator")
+    
+    @property
+    def protocol_fee_numerator(self) -> Any:
+        return self._raw.get("protocolFeeNumerator")
+    
+    @property
+    def protocol_fee_denominator(self) -> Any:
+        return self._raw.get("protocolFeeDenominator")
+    
+    @property
+    def current_price(self) -> Any:
+        return None
+    
+    def _fees_dict(self) -> Dict[str, Any]:
+        return {
+            "trade_fee_numerator": self.trade_fee_numerator,
+            "trade_fee_denominator": self.trade_fee_denominator,
+            "protocol_fee_numerator": self.protocol_fee_numerator,
+            "protocol_fee_denominator": self.protocol_fee_denominator
+        }
+    
+    def _tokens_dict(self) -> Dict[str, Any]:
+        return {
+            "token_a": {
+                "mint": self.token_a_mint,
+                "reserve": self.token_a_reserve,
+                "decimals": self.token_a_decimals
+            },
+            "token_b": {
+                "mint": self.token_b_mint,
+                "reserve": self.token_b_reserve,
+                "decimals": self.token_b_decimals
+            }
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the full nested pool structure."""
+        return {
+            "protocol": self.protocol,
+            "version": self.version,
+            "tokens": self._tokens_dict(),
+            "fees": self._fees_dict()
+        }
+
+@dataclass
+class JupiterPool(PoolView):
+    """Jupiter pool view."""
+    __slots__ = ()
+    
+    protocol: ClassVar[str] = "jupiter"
+    
+    @property
+    def current_price(self) -> Any:
+        return self._raw.get("currentPrice")
+    
+    @property
+    def target_price(self) -> Any:
+        return self._raw.get("targetPrice")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["price"] = {
+            "current_price": self.current_price,
+            "target_price": self.target_price
+        }
+        return data
+
+@dataclass
+class OrcaPool(PoolView):
+    """Orca pool view."""
+    __slots__ = ()
+    
+    protocol: ClassVar[str] = "orca"
+    
+    @property
+    def trade_fee_numerator(self) -> Any:
+        return self._raw.get("feeNumerator")
+    
+    @property
+    def trade_fee_denominator(self) -> Any:
+        return self._raw.get("feeDenominator")
+    
+    @property
+    def amp_factor(self) -> Any:
+        return self._raw.get("ampFactor")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["amp_factor"] = self.amp_factor
+        return data
+
+@dataclass
+class RaydiumPool(PoolView):
+    """Raydium pool view."""
+    __slots__ = ()
+    
+    protocol: ClassVar[str] = "raydium"
+    
+    @property
+    def token_a_reserve(self) -> Any:
+        # Raydium 池子账户只记录金库地址，不含储备量
+        return None
+    
+    @property
+    def token_b_reserve(self) -> Any:
+        return None
+    
+    @property
+    def token_a_vault(self) -> Optional[str]:
+        return self._raw.get("tokenAVault")
+    
+    @property
+    def token_b_vault(self) -> Optional[str]:
+        return self._raw.get("tokenBVault")
+    
+    @property
+    def status(self) -> Any:
+        return self._raw.get("status")
+    
+    @property
+    def nonce(self) -> Any:
+        return self._raw.get("nonce")
+    
+    @property
+    def open_time(self) -> Any:
+        return self._raw.get("openTime")
+    
+    @property
+    def last_updated(self) -> Any:
+        return self._raw.get("lastUpdated")
+    
+    def _tokens_dict(self) -> Dict[str, Any]:
+        return {
+            "token_a": {
+                "mint": self.token_a_mint,
+                "vault": self.token_a_vault,
+                "decimals": self.token_a_decimals
+            },
+            "token_b": {
+                "mint": self.token_b_mint,
+                "vault": self.token_b_vault,
+                "decimals": self.token_b_decimals
+            }
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["status"] = {
+            "status": self.status,
+            "nonce": self.nonce,
+            "open_time": self.open_time,
+            "last_updated": self.last_updated
+        }
+        return data
+
 class DexParser:
     """Parser for DEX protocols using solana-tx-parser."""
     
@@ -15,11 +233,15 @@ class DexParser:
     ORCA_PROGRAM_ID = "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc"
     RAYDIUM_PROGRAM_ID = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
     
-    def __init__(self, client: AsyncClient):
+    # 账户数据解析缓存容量
+    ACCOUNT_CACHE_SIZE = 2048
+    
+    def __init__(self, client: AsyncClient, max_workers: int = 4):
         """Initialize DEX parser.
         
         Args:
             client: Solana RPC client
+            max_workers: Maximum number of threads for account data decoding
         """
         self.client = client
         self.parser = SolanaParser([
@@ -36,173 +258,152 @@ class DexParser:
                 "idl": "raydium"
             }
         ])
+        
+        # 程序 ID -> 池子解析函数，直接以 Pubkey 为键，省去每次 owner 的 base58 编码
+        self._pool_parsers = {
+            _pk(self.JUPITER_PROGRAM_ID): self._parse_jupiter_pool,
+            _pk(self.ORCA_PROGRAM_ID): self._parse_orca_pool,
+            _pk(self.RAYDIUM_PROGRAM_ID): self._parse_raydium_pool
+        }
+        self._dex_program_ids = frozenset({
+            self.JUPITER_PROGRAM_ID,
+            self.ORCA_PROGRAM_ID,
+            self.RAYDIUM_PROGRAM_ID
+        })
+        self._protocol_names = {
+            self.JUPITER_PROGRAM_ID: "jupiter",
+            self.ORCA_PROGRAM_ID: "orca",
+            self.RAYDIUM_PROGRAM_ID: "raydium"
+        }
+        
+        # (程序 ID, 账户原始字节) -> 解析结果，账户数据未变化时跳过重复解码
+        self._account_cache: "OrderedDict[Tuple[str, bytes], Any]" = OrderedDict()
+        self._account_cache_lock = threading.Lock()
+        # 原生解析器是否接受 memoryview，首次被拒绝后退回 bytes
+        self._accepts_mv = True
+        
+        # 账户数据解码是同步的原生调用，放到线程池中执行以免阻塞事件循环
+        self._parse_executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="dex-parse"
+        )
     
-    async def parse_pool_data(self, pool_address: str) -> Dict[str, Any]:
+    async def parse_pool_data(self, pool_address: str) -> Optional[PoolView]:
         """Parse pool account data.
         
         Args:
             pool_address: Pool account address
             
         Returns:
-            Parsed pool data
+            Lazy view over the parsed pool data, or None if unavailable
         """
         try:
             # 获取账户数据
             account_info = await self.client.get_account_info(
-                Pubkey.from_string(pool_address)
+                _pk(pool_address)
             )
             
             if not account_info or not account_info.value:
-                return {}
-            
-            # 获取程序 ID
-            program_id = str(account_info.value.owner)
+                return None
             
             # 根据程序 ID 解析数据
-            if program_id == self.JUPITER_PROGRAM_ID:
-                return self._parse_jupiter_pool(account_info.value.data)
-            elif program_id == self.ORCA_PROGRAM_ID:
-                return self._parse_orca_pool(account_info.value.data)
-            elif program_id == self.RAYDIUM_PROGRAM_ID:
-                return self._parse_raydium_pool(account_info.value.data)
-            else:
-                logger.warning(f"Unknown DEX program ID: {program_id}")
-                return {}
+            owner = account_info.value.owner
+            pool_parser = self._pool_parsers.get(owner)
+            if pool_parser is None:
+                logger.warning(f"Unknown DEX program ID: {owner}")
+                return None
+            
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._parse_executor,
+                pool_parser,
+                account_info.value.data
+            )
                 
         except Exception as e:
             logger.error(f"Error parsing pool data: {e}")
-            return {}
+            return None
+    
+    def _parse_account_data(self, program_id: str, data: bytes) -> Any:
+        """Parse account data, memoized on program ID and raw account bytes."""
+        key = (program_id, bytes(data))
+        with self._account_cache_lock:
+            cached = self._account_cache.get(key)
+            if cached is not None:
+                self._account_cache.move_to_end(key)
+                return cached
+        
+        parsed_data = self._decode_account_data(program_id, key[1])
+        if parsed_data:
+            with self._account_cache_lock:
+                self._account_cache[key] = parsed_data
+                if len(self._account_cache) > self.ACCOUNT_CACHE_SIZE:
+                    self._account_cache.popitem(last=False)
+        return parsed_data
+    
+    def _decode_account_data(self, program_id: str, data: bytes) -> Any:
+        """Hand account bytes to solana-tx-parser without an extra copy when possible."""
+        if self._accepts_mv:
+            try:
+                return self.parser.parse_account_data(program_id, memoryview(data))
+            except TypeError:
+                logger.debug("solana-tx-parser rejected memoryview, falling back to bytes")
+                self._accepts_mv = False
+        return self.parser.parse_account_data(program_id, data)
     
-    def _parse_jupiter_pool(self, data: bytes) -> Dict[str, Any]:
+    def _parse_jupiter_pool(self, data: bytes) -> Optional[JupiterPool]:
         """Parse Jupiter pool data."""
         try:
             # 使用 solana-tx-parser 解析数据
-            parsed_data = self.parser.parse_account_data(
+            parsed_data = self._parse_account_data(
                 self.JUPITER_PROGRAM_ID,
                 data
             )
             
             if not parsed_data:
-                return {}
+                return None
             
-            # 提取关键信息
-            return {
-                "protocol": "jupiter",
-                "version": parsed_data.get("version"),
-                "tokens": {
-                    "token_a": {
-                        "mint": parsed_data.get("tokenAMint"),
-                        "reserve": parsed_data.get("tokenAReserve"),
-                        "decimals": parsed_data.get("tokenADecimals")
-                    },
-                    "token_b": {
-                        "mint": parsed_data.get("tokenBMint"),
-                        "reserve": parsed_data.get("tokenBReserve"),
-                        "decimals": parsed_data.get("tokenBDecimals")
-                    }
-                },
-                "fees": {
-                    "trade_fee_numerator": parsed_data.get("tradeFeeNumerator"),
-                    "trade_fee_denominator": parsed_data.get("tradeFeeDenominator"),
-                    "protocol_fee_numerator": parsed_data.get("protocolFeeNumerator"),
-                    "protocol_fee_denominator": parsed_data.get("protocolFeeDenominator")
-                },
-                "price": {
-                    "current_price": parsed_data.get("currentPrice"),
-                    "target_price": parsed_data.get("targetPrice")
-                }
-            }
+            return JupiterPool(parsed_data)
             
         except Exception as e:
             logger.error(f"Error parsing Jupiter pool data: {e}")
-            return {}
+            return None
     
-    def _parse_orca_pool(self, data: bytes) -> Dict[str, Any]:
+    def _parse_orca_pool(self, data: bytes) -> Optional[OrcaPool]:
         """Parse Orca pool data."""
         try:
             # 使用 solana-tx-parser 解析数据
-            parsed_data = self.parser.parse_account_data(
+            parsed_data = self._parse_account_data(
                 self.ORCA_PROGRAM_ID,
                 data
             )
             
             if not parsed_data:
-                return {}
+                return None
             
-            # 提取关键信息
-            return {
-                "protocol": "orca",
-                "version": parsed_data.get("version"),
-                "tokens": {
-                    "token_a": {
-                        "mint": parsed_data.get("tokenAMint"),
-                        "reserve": parsed_data.get("tokenAReserve"),
-                        "decimals": parsed_data.get("tokenADecimals")
-                    },
-                    "token_b": {
-                        "mint": parsed_data.get("tokenBMint"),
-                        "reserve": parsed_data.get("tokenBReserve"),
-                        "decimals": parsed_data.get("tokenBDecimals")
-                    }
-                },
-                "fees": {
-                    "trade_fee_numerator": parsed_data.get("feeNumerator"),
-                    "trade_fee_denominator": parsed_data.get("feeDenominator"),
-                    "protocol_fee_numerator": parsed_data.get("protocolFeeNumerator"),
-                    "protocol_fee_denominator": parsed_data.get("protocolFeeDenominator")
-                },
-                "amp_factor": parsed_data.get("ampFactor")
-            }
+            return OrcaPool(parsed_data)
             
         except Exception as e:
             logger.error(f"Error parsing Orca pool data: {e}")
-            return {}
+            return None
     
-    def _parse_raydium_pool(self, data: bytes) -> Dict[str, Any]:
+    def _parse_raydium_pool(self, data: bytes) -> Optional[RaydiumPool]:
         """Parse Raydium pool data."""
         try:
             # 使用 solana-tx-parser 解析数据
-            parsed_data = self.parser.parse_account_data(
+            parsed_data = self._parse_account_data(
                 self.RAYDIUM_PROGRAM_ID,
                 data
             )
             
             if not parsed_data:
-                return {}
+                return None
             
-            # 提取关键信息
-            return {
-                "protocol": "raydium",
-                "version": parsed_data.get("version"),
-                "tokens": {
-                    "token_a": {
-                        "mint": parsed_data.get("tokenAMint"),
-                        "vault": parsed_data.get("tokenAVault"),
-                        "decimals": parsed_data.get("tokenADecimals")
-                    },
-                    "token_b": {
-                        "mint": parsed_data.get("tokenBMint"),
-                        "vault": parsed_data.get("tokenBVault"),
-                        "decimals": parsed_data.get("tokenBDecimals")
-                    }
-                },
-                "fees": {
-                    "trade_fee_numerator": parsed_data.get("tradeFeeNumerator"),
-                    "trade_fee_denominator": parsed_data.get("tradeFeeDenominator"),
-                    "protocol_fee_numerator": parsed_data.get("protocolFeeNumerator"),
-                    "protocol_fee_denominator": parsed_data.get("protocolFeeDenominator")
-                },
-                "status": {
-                    "status": parsed_data.get("status"),
-                    "nonce": parsed_data.get("nonce"),
-                    "open_time": parsed_data.get("openTime"),
-                    "last_updated": parsed_data.get("lastUpdated")
-                }
-            }
+            return RaydiumPool(parsed_data)
             
         except Exception as e:
             logger.error(f"Error parsing Raydium pool data: {e}")
-            return {}
+            return None
     
     async def parse_swap_instruction(self, tx_data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse swap instruction from transaction.
@@ -222,11 +423,11 @@ class DexParser:
             
             # 查找 swap 指令
             swap_ix = None
+            dex_program_ids = self._dex_program_ids
             for ix in parsed_tx.instructions:
-                if ix.program_id in [self.JUPITER_PROGRAM_ID, self.ORCA_PROGRAM_ID, self.RAYDIUM_PROGRAM_ID]:
-                    if "swap" in ix.name.lower():
-                        swap_ix = ix
-                        break
+                if ix.program_id in dex_program_ids and _is_swap_name(ix.name):
+                    swap_ix = ix
+                    break
             
             if not swap_ix:
                 return {}
@@ -253,13 +454,10 @@ class DexParser:
             logger.error(f"Error parsing swap instruction: {e}")
             return {}
     
+    def close(self):
+        """Shut down the account data decoding thread pool."""
+        self._parse_executor.shutdown(wait=True)
+    
     def _get_protocol_name(self, program_id: str) -> str:
         """Get protocol name from program ID."""
-        if program_id == self.JUPITER_PROGRAM_ID:
-            return "jupiter"
-        elif program_id == self.ORCA_PROGRAM_ID:
-            return "orca"
-        elif program_id == self.RAYDIUM_PROGRAM_ID:
-            return "raydium"
-        else:
-            return "unknown" 
\ No newline at end of file
+        return self._protocol_names.get(program_id, "unknown") 
\ No newline at end of file
@@ -1,18 +1,51 @@
 """
 系统程序解析器模块，用于解析Solana系统程序的指令。
 """
+import logging
+import struct
 from typing import Dict, Any, Optional
 from solana.rpc.types import TxInfo
 from solana.transaction import TransactionInstruction
+from solders.pubkey import Pubkey
 from .base import ParsedInstruction
 
+logger = logging.getLogger(__name__)
+
+# 小端整数布局，直接从指令缓冲区读取，避免切片拷贝
+_U64_LE = struct.Struct("<Q")
+_CREATE_ACCOUNT_LE = struct.Struct("<QI")
+
+# 系统程序指令类型，按操作码索引
+_SYSTEM_IX_NAMES = (
+    "create_account",
+    "assign",
+    "transfer",
+    "create_account_with_seed",
+    "advance_nonce_account",
+    "withdraw_nonce_account",
+    "initialize_nonce_account",
+    "authorize_nonce_account",
+    "allocate",
+    "allocate_with_seed",
+    "assign_with_seed",
+    "transfer_with_seed",
+    "upgrade_non_centralized_system_program"
+)
+
+# 每个操作码的定长参数布局: (struct布局, 字段名)，None表示不解析参数
+_SYSTEM_IX_LAYOUT = (
+    (_CREATE_ACCOUNT_LE, ("lamports", "space")),  # create_account
+    None,
+    (_U64_LE, ("lamports",)),  # transfer
+) + (None,) * (len(_SYSTEM_IX_NAMES) - 3)
+
 class SystemParser:
     """系统程序解析器"""
     
     SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
     
     @staticmethod
-    async def parse_instruction(ix: TransactionInstruction, tx_info: TxInfo) -> Optional[ParsedInstruction]:
+    def parse_instruction(ix: TransactionInstruction, tx_info: TxInfo) -> Optional[ParsedInstruction]:
         """
         解析系统程序指令
         
@@ -23,27 +56,18 @@ class SystemParser:
         Returns:
             解析后的指令数据
         """
+        if not ix.data:
+            return None
+        
         try:
-            # 系统程序指令类型
-            instruction_types = {
-                0: "create_account",
-                1: "assign",
-                2: "transfer",
-                3: "create_account_with_seed",
-                4: "advance_nonce_account",
-                5: "withdraw_nonce_account",
-                6: "initialize_nonce_account",
-                7: "authorize_nonce_account",
-                8: "allocate",
-                9: "allocate_with_seed",
-                10: "assign_with_seed",
-                11: "transfer_with_seed",
-                12: "upgrade_non_centralized_system_program"
-            }
-            
             # 获取指令类型
             instruction_type = ix.data[0]
-            name = instruction_types.get(instruction_type, "unknown")
+            if instruction_type < len(_SYSTEM_IX_NAMES):
+                name = _SYSTEM_IX_NAMES[instruction_type]
+                layout = _SYSTEM_IX_LAYOUT[instruction_type]
+            else:
+                name = "unknown"
+                layout = None
             
             # 解析账户
             accounts = []
@@ -56,16 +80,11 @@ class SystemParser:
             
             # 解析参数
             args = {}
-            if instruction_type == 0:  # create_account
-                args = {
-                    "lamports": int.from_bytes(ix.data[1:9], "little"),
-                    "space": int.from_bytes(ix.data[9:13], "little"),
-                    "owner": str(ix.data[13:45])
-                }
-            elif instruction_type == 2:  # transfer
-                args = {
-                    "lamports": int.from_bytes(ix.data[1:9], "little")
-                }
+            if layout is not None:
+                fmt, fields = layout
+                args = dict(zip(fields, fmt.unpack_from(ix.data, 1)))
+                if instruction_type == 0:  # create_account
+                    args["owner"] = str(Pubkey.from_bytes(bytes(ix.data[13:45])))
             
             return ParsedInstruction(
                 program_id=SystemParser.SYSTEM_PROGRAM_ID,
@@ -74,6 +93,6 @@ class SystemParser:
                 args=args
             )
             
-        except Exception as e:
-            print(f"Error parsing System instruction: {str(e)}")
+        except (IndexError, ValueError, struct.error, KeyError, AttributeError) as e:
+            logger.error(f"Error parsing System instruction: {str(e)}")
             return None 
\ No newline at end of file
@@ -1,18 +1,56 @@
 """
 代币程序解析器模块，用于解析Solana代币程序的指令。
 """
+import logging
+import struct
 from typing import Dict, Any, Optional
 from solana.rpc.types import TxInfo
 from solana.transaction import TransactionInstruction
 from .base import ParsedInstruction
 
+logger = logging.getLogger(__name__)
+
+# 小端整数布局，直接从指令缓冲区读取，避免切片拷贝
+_U64_LE = struct.Struct("<Q")
+
+# 代币程序指令类型，按操作码索引
+_TOKEN_IX_NAMES = (
+    "initialize_mint",
+    "initialize_account",
+    "initialize_multisig",
+    "transfer",
+    "approve",
+    "revoke",
+    "set_authority",
+    "mint_to",
+    "burn",
+    "close_account",
+    "freeze_account",
+    "thaw_account",
+    "transfer_checked",
+    "approve_checked",
+    "mint_to_checked",
+    "burn_checked",
+    "initialize_account2",
+    "sync_native",
+    "initialize_account3",
+    "initialize_multisig2",
+    "initialize_mint2"
+)
+
+# 每个操作码的 amount 参数布局，None表示不解析参数
+_TOKEN_IX_LAYOUT = tuple(
+    _U64_LE if name in ("transfer", "mint_to", "burn") else None
+    for name in _TOKEN_IX_NAMES
+)
+
 class TokenParser:
     """代币程序解析器"""
     
     TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
     
     @staticmethod
-    async def parse_instruction(ix: TransactionInstruction, tx_info: TxInfo) -> Optional[ParsedInstruction]:
+    def parse_instruction(ix: TransactionInstruction, tx_info: TxInfo) -> Optional[ParsedInstruction]:
         """
         解析代币程序指令
         
@@ -23,35 +61,18 @@ class TokenParser:
         Returns:
             解析后的指令数据
         """
+        if not ix.data:
+            return None
+        
         try:
-            # 代币程序指令类型
-            instruction_types = {
-                0: "initialize_mint",
-                1: "initialize_account",
-                2: "initialize_multisig",
-                3: "transfer",
-                4: "approve",
-                5: "revoke",
-                6: "set_authority",
-                7: "mint_to",
-                8: "burn",
-                9: "close_account",
-                10: "freeze_account",
-                11: "thaw_account",
-                12: "transfer_checked",
-                13: "approve_checked",
-                14: "mint_to_checked",
-                15: "burn_checked",
-                16: "initialize_account2",
-                17: "sync_native",
-                18: "initialize_account3",
-                19: "initialize_multisig2",
-                20: "initialize_mint2"
-            }
-            
             # 获取指令类型
             instruction_type = ix.data[0]
-            name = instruction_types.get(instruction_type, "unknown")
+            if instruction_type < len(_TOKEN_IX_NAMES):
+                name = _TOKEN_IX_NAMES[instruction_type]
+                layout = _TOKEN_IX_LAYOUT[instruction_type]
+            else:
+                name = "unknown"
+                layout = None
             
             # 解析账户
             accounts = []
@@ -64,17 +85,9 @@ class TokenParser:
             
             # 解析参数
             args = {}
-            if instruction_type == 3:  # transfer
-                args = {
-                    "amount": int.from_bytes(ix.data[1:9], "little")
-                }
-            elif instruction_type == 7:  # mint_to
-                args = {
-                    "amount": int.from_bytes(ix.data[1:9], "little")
-                }
-            elif instruction_type == 8:  # burn
+            if layout is not None:
                 args = {
-                    "amount": int.from_bytes(ix.data[1:9], "little")
+                    "amount": layout.unpack_from(ix.data, 1)[0]
                 }
             
             return ParsedInstruction(
@@ -84,6 +97,6 @@ class TokenParser:
                 args=args
             )
             
-        except Exception as e:
-            print(f"Error parsing Token instruction: {str(e)}")
+        except (IndexError, struct.error, KeyError, AttributeError) as e:
+            logger.error(f"Error parsing Token instruction: {str(e)}")
             return None 
\ No newline at end of file
@@ -1,8 +1,11 @@
 """
 Solana交易解析客户端，用于调用Node.js解析服务。
 """
+import asyncio
+import time
 import aiohttp
-from typing import Dict, Any, Optional
+import orjson
+from typing import Dict, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,14 +15,52 @@ class TransactionParserClient:
     交易解析客户端，调用Node.js的solana-tx-parser-public服务。
     """
     
-    def __init__(self, api_url: str = "http://localhost:3000"):
+    # 健康检查结果缓存时间(秒)
+    HEALTH_TTL = 5.0
+    # 健康检查超时时间(秒)
+    HEALTH_TIMEOUT = 0.5
+    # 健康检查失败后的熔断时间范围(秒)
+    MIN_BACKOFF = 1.0
+    MAX_BACKOFF = 30.0
+    
+    def __init__(self, api_url: str = "http://localhost:3000", unix_socket_path: Optional[str] = None):
         """
         初始化解析客户端
         
         Args:
             api_url: 解析服务的API地址
+            unix_socket_path: 解析服务的Unix域套接字路径，设置后通过套接字通信
+        """
+        self.unix_socket_path = unix_socket_path
+        # 使用Unix域套接字时主机名不参与路由
+        self.api_url = "http://localhost" if unix_socket_path else api_url
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # 健康检查状态: (检查时间, 是否可用)
+        self._health: Tuple[float, bool] = (0.0, False)
+        self._fail_until = 0.0
+        self._backoff = self.MIN_BACKOFF
+        
+    def _get_session(self) -> aiohttp.ClientSession:
         """
-        self.api_url = api_url
+        获取复用的HTTP会话，避免每次请求重新建立连接
+        
+        Returns:
+            HTTP会话
+        """
+        if self._session is None or self._session.closed:
+            if self.unix_socket_path:
+                connector = aiohttp.UnixConnector(path=self.unix_socket_path)
+            else:
+                connector = aiohttp.TCPConnector(keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+        
+    async def close(self):
+        """关闭HTTP会话"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
         
     async def parse_transaction(self, signature: str) -> Optional[Dict[str, Any]]:
         """
@@ -32,14 +73,14 @@ class TransactionParserClient:
             解析后的交易数据
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.api_url}/parse/{signature}") as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Error parsing transaction {signature}: {error_text}")
-                        return None
+            session = self._get_session()
+            async with session.get(f"{self.api_url}/parse/{signature}") as response:
+                if response.status == 200:
+                    return await response.json(loads=orjson.loads)
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Error parsing transaction {signature}: {error_text}")
+                    return None
                         
         except Exception as e:
             logger.error(f"Error calling parser service: {str(e)}")
@@ -49,12 +90,41 @@ class TransactionParserClient:
         """
         检查解析服务是否可用
         
+        Returns:
+            服务是否可用
+        """
+        now = time.monotonic()
+        checked_at, available = self._health
+        if now - checked_at < self.HEALTH_TTL:
+            return available
+        if now < self._fail_until:
+            # 熔断期间直接返回不可用，不再请求服务
+            return False
+        
+        available = await self._probe_health()
+        now = time.monotonic()
+        self._health = (now, available)
+        if available:
+            self._backoff = self.MIN_BACKOFF
+        else:
+            self._fail_until = now + self._backoff
+            self._backoff = min(self._backoff * 2, self.MAX_BACKOFF)
+        return available
+    
+    async def _probe_health(self) -> bool:
+        """
+        请求解析服务的健康检查接口
+        
         Returns:
             服务是否可用
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.api_url}/health") as response:
-                    return response.status == 200
-        except:
+            session = self._get_session()
+            response = await asyncio.wait_for(
+                session.get(f"{self.api_url}/health"),
+                timeout=self.HEALTH_TIMEOUT
+            )
+            async with response:
+                return response.status == 200
+        except Exception:
             return False 
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+交易时间聚合内核
+优先使用编译好的Cython扩展；否则交易量较大时使用Numba编译的循环，其余情况使用NumPy向量化实现
+"""
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖
+    njit = None
+
+try:
+    from . import _analyzer_core as _core
+except ImportError:  # Cython扩展为可选，未编译时使用NumPy/Numba实现
+    _core = None
+
+# 交易数达到该阈值才使用JIT内核，避免小钱包承担编译预热开销
+JIT_THRESHOLD = 2000
+
+# 交易历史摘要的分箱宽度(秒)
+HOURLY_BIN = 3600
+DAILY_BIN = 86400
+# 日均交易数达到该值时按小时分箱，稀疏钱包按天分箱即可
+HOURLY_BIN_MIN_DAILY_TXS = 24
+
+
+def _aggregate_times_numpy(block_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int, int]:
+    """NumPy向量化实现"""
+    hourly = np.bincount((block_times // 3600) % 24, minlength=24)
+    days, counts = np.unique(block_times // 86400, return_counts=True)
+    return hourly, days, counts, int(block_times.min()), int(block_times.max())
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _aggregate_times_jit(block_times):
+        n = block_times.size
+        hourly = np.zeros(24, np.int64)
+        first = block_times[0]
+        last = block_times[0]
+        for i in range(n):
+            t = block_times[i]
+            hourly[(t // 3600) % 24] += 1
+            if t < first:
+                first = t
+            if t > last:
+                last = t
+
+        # 排序后顺序扫描统计每日交易数，避免使用字典
+        day_index = np.sort(block_times // 86400)
+        days = np.empty(n, np.int64)
+        counts = np.empty(n, np.int64)
+        m = 0
+        for i in range(n):
+            if m == 0 or day_index[i] != days[m - 1]:
+                days[m] = day_index[i]
+                counts[m] = 1
+                m += 1
+            else:
+                counts[m - 1] += 1
+        return hourly, days[:m], counts[:m], first, last
+else:
+    _aggregate_times_jit = None
+
+
+def aggregate_times(block_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int, int]:
+    """
+    聚合交易时间(按UTC分桶)
+
+    Args:
+        block_times: 非空的int64区块时间数组
+
+    Returns:
+        (每小时交易数, 有交易的日期(距纪元天数), 每日交易数, 最早时间, 最晚时间)
+    """
+    if _aggregate_times_jit is not None and block_times.size >= JIT_THRESHOLD:
+        hourly, days, counts, first, last = _aggregate_times_jit(block_times)
+        return hourly, days, counts, int(first), int(last)
+    return _aggregate_times_numpy(block_times)
+
+
+def aggregate_batch(
+    block_times: np.ndarray,
+    dex_ids: np.ndarray,
+    n_dex: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int, int, np.ndarray]:
+    """
+    聚合列式存储的交换交易(按UTC分桶)
+
+    Args:
+        block_times: 非空的int64区块时间数组
+        dex_ids: 与block_times等长的int8 DEX编号数组
+        n_dex: DEX编号数量
+
+    Returns:
+        (每小时交易数, 有交易的日期(距纪元天数), 每日交易数, 最早时间, 最晚时间, 各DEX交易数)
+    """
+    if _core is not None:
+        return _core.aggregate(block_times, dex_ids, n_dex)
+    return (*aggregate_times(block_times), np.bincount(dex_ids, minlength=n_dex))
+
+
+def choose_bin_seconds(transaction_count: int, days: int) -> int:
+    """
+    根据交易活跃度选择交易历史摘要的分箱宽度
+
+    Args:
+        transaction_count: 交易数
+        days: 分析的天数
+
+    Returns:
+        分箱宽度(秒)
+    """
+    if days > 0 and transaction_count / days >= HOURLY_BIN_MIN_DAILY_TXS:
+        return HOURLY_BIN
+    return DAILY_BIN
+
+
+def summarize_history(block_times: np.ndarray, bin_seconds: int) -> Dict[str, Any]:
+    """
+    将交易时间重采样为固定宽度的分箱计数，替代原始交易列表
+
+    Args:
+        block_times: 非空的int64区块时间数组
+        bin_seconds: 分箱宽度(秒)
+
+    Returns:
+        {"bin_seconds": 分箱宽度, "start": 第一个分箱的起始时间, "counts": 每个分箱的交易数}
+    """
+    first = int(block_times.min())
+    start = first - first % bin_seconds
+    bins = np.arange(start, int(block_times.max()) + bin_seconds + 1, bin_seconds)
+    counts, _ = np.histogram(block_times, bins=bins)
+    return {"bin_seconds": bin_seconds, "start": start, "counts": counts.tolist()}
@@ -0,0 +1,60 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+交易聚合的Cython内核
+输入为SwapBatch的列式数组，编译: CFLAGS="-O3 -march=native" cythonize -i src/solana/_analyzer_core.pyx
+"""
+import numpy as np
+
+from libc.stdint cimport int64_t, int8_t
+
+
+def aggregate(const int64_t[::1] block_times, const int8_t[::1] dex_ids, Py_ssize_t n_dex):
+    """
+    一次遍历聚合交易时间和DEX编号(按UTC分桶)
+
+    Args:
+        block_times: 非空的int64区块时间数组
+        dex_ids: 与block_times等长的int8 DEX编号数组
+        n_dex: DEX编号数量
+
+    Returns:
+        (每小时交易数, 有交易的日期(距纪元天数), 每日交易数, 最早时间, 最晚时间, 各DEX交易数)
+    """
+    cdef Py_ssize_t n = block_times.shape[0]
+    cdef Py_ssize_t i
+    cdef Py_ssize_t m = 0
+    cdef long hourly[24]
+    cdef int64_t t
+    cdef int64_t first = block_times[0]
+    cdef int64_t last = block_times[0]
+
+    dex_out = np.zeros(n_dex, dtype=np.int64)
+    cdef int64_t[::1] dex_totals = dex_out
+
+    for i in range(24):
+        hourly[i] = 0
+    for i in range(n):
+        t = block_times[i]
+        hourly[(t // 3600) % 24] += 1
+        dex_totals[dex_ids[i]] += 1
+        if t < first:
+            first = t
+        if t > last:
+            last = t
+
+    # 排序后顺序扫描统计每日交易数
+    cdef int64_t[::1] day_index = np.sort(np.asarray(block_times) // 86400)
+    days_out = np.empty(n, dtype=np.int64)
+    counts_out = np.empty(n, dtype=np.int64)
+    cdef int64_t[::1] days = days_out
+    cdef int64_t[::1] counts = counts_out
+    for i in range(n):
+        if m == 0 or day_index[i] != days[m - 1]:
+            days[m] = day_index[i]
+            counts[m] = 1
+            m += 1
+        else:
+            counts[m - 1] += 1
+
+    hourly_out = np.array([hourly[i] for i in range(24)], dtype=np.int64)
+    return hourly_out, days_out[:m], counts_out[:m], first, last, dex_out
@@ -2,20 +2,285 @@
 Solana交易分析模块
 负责分析交易模式和策略特征
 """
+import array
+import hashlib
 import json
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional, Tuple, Set
-from datetime import datetime, timedelta
-import statistics
-from collections import defaultdict, Counter
+import copy
+import string
+import time
+from typing import Dict, List, Any, Optional, Tuple, Mapping, Callable
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
 
+import aiohttp
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson未安装时回退到标准库json
+    orjson = None
+
+from ._agg import aggregate_batch, choose_bin_seconds, summarize_history
 from .collector import SolanaCollector
 from ..config import Config
-from ..utils.helpers import datetime_to_unix_time, unix_time_to_datetime
+from ..utils.helpers import unix_time_to_datetime
 
 logger = logging.getLogger(__name__)
 
+# 大模型API默认地址(火山引擎，OpenAI兼容接口)
+DEFAULT_LLM_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+
+# 流式响应可能持续很久，不限制总时长，只限制连接和两次数据块之间的等待
+LLM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)
+
+# DEX程序ID -> DEX名称，按识别优先级排列
+DEX_BY_PROGRAM_ID = {
+    "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4": "Jupiter V4",
+    "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB": "Jupiter V3",
+    "9W959DqEETiGZocYWCQPaJ6sBmUzgfxXfqGeTEdp3aQP": "Raydium",
+    "EMAKHqYYkYvBwAYBQ9WqCHSR8PeqLyYLt2ahcXbgjKiW": "Raydium LP"
+}
+_DEX_IDS = frozenset(DEX_BY_PROGRAM_ID)
+_DEX_PRIORITY = {program_id: i for i, program_id in enumerate(DEX_BY_PROGRAM_ID)}
+
+# DEX编号 -> DEX名称，编号即识别优先级；最后一个编号表示无法识别消息的交易，不计入统计
+DEX_NAMES = (*DEX_BY_PROGRAM_ID.values(), "Other DEX")
+_OTHER_DEX_ID = len(DEX_NAMES) - 1
+_NO_MESSAGE_ID = len(DEX_NAMES)
+
+# 提示词中的JSON使用紧凑格式，减少输入token
+if orjson is not None:
+    def _encode_json(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+        
+    _decode_json = orjson.loads
+else:
+    _encode_json = json.JSONEncoder(
+        ensure_ascii=False,
+        separators=(',', ':'),
+        check_circular=False
+    ).encode
+    _decode_json = json.loads
+
+# 默认模型配置(只读，所有调用共享)
+_DEFAULT_MODEL_CONFIG = MappingProxyType({
+    "model": "gpt-4",
+    "temperature": 0.2,
+    "max_tokens": 2500
+})
+
+# 系统提示
+_SYSTEM_PROMPT = """
+        你是一位专业的加密货币交易策略分析师，专注于Solana生态系统的交易模式分析。
+        你的任务是分析提供的交易数据，识别交易模式，并提取完整的自动化交易策略。
+        
+        请仔细分析提供的数据，包括:
+        1. 交易历史
+        2. 价格历史
+        3. 市场深度
+        4. 成交量数据
+        5. 流动性池数据
+        6. 市场情绪
+        7. 滑点分析
+        8. 异常检测结果
+        
+        你的输出必须是严格的JSON格式，包含以下关键部分:
+        
+        1. 交易模式识别
+        2. 策略提取
+        3. 改进建议
+        4. 风险分析
+        
+        确保你的分析全面、详细，并基于数据提供具体的策略参数。
+        """
+
+# 用户提示模板
+_USER_PROMPT_TEMPLATE = string.Template("""
+        请分析以下交易数据并提取完整的交易策略:
+        
+        钱包地址: $wallet_address
+        分析时段: $analyzed_days 天
+        交易次数: $transaction_count
+        
+        请根据以下数据进行分析:
+        
+        1. 基础分析:
+        - 交易频率: $trading_frequency
+        - 偏好的DEX: $preferred_dexs
+        - 交易代币: $tokens_traded
+        
+        2. 市场情绪数据:
+        $market_sentiment
+        
+        3. 流动性数据:
+        $liquidity_data
+        
+        4. 路由效率:
+        $routing_efficiency
+        
+        5. 执行性能:
+        $execution_performance
+        
+        6. 滑点分析:
+        $slippage_analysis
+        
+        7. 交易异常:
+        $transaction_anomalies
+        
+        8. 市场异常:
+        $market_anomalies
+        
+        请提供以下输出格式的分析结果:
+        
+        {
+            "pattern_recognition": {
+                "primary_pattern": "主要交易模式",
+                "secondary_patterns": ["次要模式1", "次要模式2"],
+                "timing_patterns": "时间模式分析",
+                "token_selection_logic": "代币选择逻辑"
+            },
+            "strategy": {
+                "name": "策略名称",
+                "description": "策略简要描述",
+                "target_selection": {
+                    "criteria": ["选择标准1", "选择标准2"],
+                    "filters": ["过滤条件1", "过滤条件2"]
+                },
+                "entry_strategy": {
+                    "triggers": ["入场触发条件1", "入场触发条件2"],
+                    "confirmation_signals": ["确认信号1", "确认信号2"],
+                    "optimal_timing": "最佳入场时机描述"
+                },
+                "exit_strategy": {
+                    "take_profit": "止盈策略",
+                    "stop_loss": "止损策略",
+                    "trailing_mechanisms": "追踪止损机制"
+                },
+                "position_management": {
+                    "sizing": "仓位大小计算方法",
+                    "scaling": "加减仓策略",
+                    "hedging": "对冲策略(如适用)"
+                },
+                "risk_control": {
+                    "max_position_size": "最大仓位建议",
+                    "max_daily_loss": "每日最大亏损限制",
+                    "correlation_management": "相关性管理策略"
+                },
+                "automation_flow": {
+                    "monitoring_frequency": "监控频率",
+                    "trigger_actions": ["触发动作1", "触发动作2"],
+                    "fallback_procedures": ["应急程序1", "应急程序2"]
+                }
+            },
+            "improvement_suggestions": {
+                "efficiency_gains": ["效率提升建议1", "效率提升建议2"],
+                "risk_reduction": ["风险降低建议1", "风险降低建议2"],
+                "profitability_enhancements": ["盈利能力提升建议1", "盈利能力提升建议2"]
+            },
+            "risk_analysis": {
+                "identified_risks": ["已识别风险1", "已识别风险2"],
+                "mitigation_strategies": ["风险缓解策略1", "风险缓解策略2"],
+                "market_dependency_factors": ["市场依赖因素1", "市场依赖因素2"]
+            }
+        }
+        """)
+
+@dataclass
+class SwapBatch:
+    """交换交易的列式存储，聚合统计只访问扁平数组"""
+    __slots__ = ("block_times", "dex_ids")
+    
+    block_times: np.ndarray
+    dex_ids: np.ndarray
+    
+    def __len__(self) -> int:
+        return self.block_times.size
+        
+    @classmethod
+    def from_columns(cls, block_times: array.array, dex_ids: array.array) -> "SwapBatch":
+        """由逐笔追加的区块时间和DEX编号构建(零拷贝)"""
+        return cls(
+            np.frombuffer(block_times, dtype=np.int64),
+            np.frombuffer(dex_ids, dtype=np.int8)
+        )
+
+def _swap_batch_appender(
+    block_times: array.array,
+    dex_ids: array.array
+) -> Callable[[Dict[str, Any]], None]:
+    """
+    创建在获取边界将交换交易逐笔拆分到列式数组的函数
+    
+    热循环中用到的方法和全局表预先绑定为闭包变量，避免每笔交易重复查找
+    
+    Args:
+        block_times: 区块时间数组
+        dex_ids: DEX编号数组
+        
+    Returns:
+        接收一笔交换交易的追加函数
+    """
+    append_time = block_times.append
+    append_dex = dex_ids.append
+    match_dex = _DEX_IDS.intersection
+    dex_priority = _DEX_PRIORITY.__getitem__
+    other_dex_id = _OTHER_DEX_ID
+    no_message_id = _NO_MESSAGE_ID
+    
+    def append(tx: Dict[str, Any]):
+        append_time(tx["blockTime"])
+        
+        # 识别DEX(根据程序ID)
+        transaction = tx.get("transaction")
+        message = transaction.get("message") if transaction else None
+        if message:
+            # DEX识别逻辑: 一次集合求交，多个命中时按优先级取第一个
+            matched = match_dex(message.get("accountKeys", ()))
+            append_dex(min(map(dex_priority, matched)) if matched else other_dex_id)
+        else:
+            append_dex(no_message_id)
+            
+        # TODO: 这部分需要实际解析交易数据来提取代币和金额
+        # 这需要详细的Solana交易解析逻辑，此处仅为框架示例
+        # 实际实现时需要根据不同DEX的交易格式解析交易日志
+        
+    return append
+
+def prepare_llm_request(
+    analysis_data: Dict[str, Any],
+    model_config: Optional[Mapping[str, Any]] = None
+) -> Tuple[str, str, Mapping[str, Any]]:
+    """
+    构建大型语言模型请求(无副作用)
+    
+    Args:
+        analysis_data: 分析数据
+        model_config: 模型配置，默认使用_DEFAULT_MODEL_CONFIG
+        
+    Returns:
+        (系统提示, 用户提示, 模型配置)
+    """
+    base_analysis = analysis_data['base_analysis']
+    user_prompt = _USER_PROMPT_TEMPLATE.substitute(
+        wallet_address=analysis_data['wallet_address'],
+        analyzed_days=base_analysis['analyzed_days'],
+        transaction_count=base_analysis['transaction_count'],
+        trading_frequency=_encode_json(base_analysis['trading_frequency']),
+        preferred_dexs=_encode_json(base_analysis['preferred_dexs']),
+        tokens_traded=_encode_json(base_analysis['tokens_traded']),
+        market_sentiment=_encode_json(analysis_data['market_sentiment']),
+        liquidity_data=_encode_json(analysis_data['liquidity_data']),
+        routing_efficiency=_encode_json(analysis_data['routing_efficiency']),
+        execution_performance=_encode_json(analysis_data['execution_performance']),
+        slippage_analysis=_encode_json(analysis_data['slippage_analysis']),
+        transaction_anomalies=_encode_json(analysis_data['transaction_anomalies']),
+        market_anomalies=_encode_json(analysis_data['market_anomalies'])
+    )
+    return _SYSTEM_PROMPT, user_prompt, _DEFAULT_MODEL_CONFIG if model_config is None else model_config
+
 class TransactionAnalyzer:
     """Solana交易分析器"""
     
@@ -30,6 +295,92 @@ class TransactionAnalyzer:
         self.collector = collector
         self.config = config
         
+        # 分析结果缓存: (钱包地址, 天数) -> (缓存时间, 数据)，超出容量时淘汰最久未用的条目
+        # 缓存与调用方各持一份副本，调用方修改返回结果不会污染缓存
+        self.cache_ttl = getattr(config, "analysis_cache_ttl", 300.0)
+        self.cache_max_size = getattr(config, "analysis_cache_size", 10_000)
+        self._pattern_cache: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # 限制同时进行的大模型请求数，多个钱包分析可以重叠而不触发API限流
+        self._llm_sem = asyncio.Semaphore(getattr(config, "llm_max_inflight", 4))
+        
+        # 大模型响应缓存: 提示与模型配置的哈希 -> (缓存时间, 响应)，超出容量时淘汰最久未用的条目
+        # 更换模型后修改llm_cache_seed即可让旧缓存失效
+        self.llm_cache_ttl = getattr(config, "llm_cache_ttl", 3600.0)
+        self.llm_cache_max_size = getattr(config, "llm_cache_size", 1_000)
+        self.llm_cache_seed = getattr(config, "llm_cache_seed", "")
+        self._llm_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
+        # 交易历史摘要的分箱宽度(秒)，未配置时按交易活跃度自动选择
+        self.history_bin_seconds = getattr(config, "history_bin_seconds", None)
+        
+    def _cache_get(
+        self,
+        cache: "OrderedDict[Any, Tuple[float, Any]]",
+        key: Any,
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        从缓存中读取未过期的数据
+        
+        Args:
+            cache: LRU缓存
+            key: 缓存键
+            ttl: 有效期(秒)，默认使用cache_ttl
+            
+        Returns:
+            缓存的数据，未命中或已过期时返回None
+        """
+        entry = cache.get(key)
+        if entry is not None:
+            cached_at, value = entry
+            if time.monotonic() - cached_at < (self.cache_ttl if ttl is None else ttl):
+                cache.move_to_end(key)
+                self.cache_hits += 1
+                logger.debug(f"分析缓存命中: {key}")
+                return value
+            del cache[key]
+            
+        self.cache_misses += 1
+        logger.debug(f"分析缓存未命中: {key}")
+        return None
+        
+    @staticmethod
+    def _cache_put(
+        cache: "OrderedDict[Any, Tuple[float, Any]]",
+        key: Any,
+        value: Any,
+        max_size: int,
+        cached_at: Optional[float] = None
+    ):
+        """
+        写入缓存，超出容量时淘汰最久未用的条目
+        
+        Args:
+            cache: LRU缓存
+            key: 缓存键
+            value: 缓存的数据
+            max_size: 最大条目数
+            cached_at: 缓存时间，默认为当前时间
+        """
+        cache[key] = (time.monotonic() if cached_at is None else cached_at, value)
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+            
+
+    def invalidate(self, wallet_address: str):
+        """
+        清除钱包的缓存数据(新交易入库后调用)
+        
+        Args:
+            wallet_address: 钱包地址
+        """
+        for key in [key for key in self._pattern_cache if key[0] == wallet_address]:
+            del self._pattern_cache[key]
+        
     async def analyze_wallet_trading_pattern(
         self, 
         wallet_address: str,
@@ -45,13 +396,93 @@ class TransactionAnalyzer:
         Returns:
             交易模式分析结果字典
         """
-        # 获取交易历史
-        swap_txs = await self.collector.fetch_recent_swap_transactions(
-            wallet_address, 
-            days=days
-        )
+        cache_key = (wallet_address, days)
+        cached = self._cache_get(self._pattern_cache, cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+            
+        # 流式获取交易历史，只保留聚合所需的紧凑状态，不保存原始交易
+        block_times = array.array('q')
+        dex_ids = array.array('b')
+        append = _swap_batch_appender(block_times, dex_ids)
+        async for tx in self.collector.iter_swap_transactions(wallet_address, days=days):
+            append(tx)
+            
+        batch = SwapBatch.from_columns(block_times, dex_ids)
+        result = self._summarize_swap_transactions(wallet_address, batch, days)
+        if result["success"]:
+            self._cache_put(self._pattern_cache, cache_key, copy.deepcopy(result), self.cache_max_size)
+        return result
         
-        if not swap_txs:
+    async def analyze_wallets_batch(
+        self,
+        wallets: List[str],
+        days: int = 30
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        批量分析多个钱包的交易模式，未命中缓存的钱包通过一次批量RPC获取交易
+        
+        Args:
+            wallets: 钱包地址列表
+            days: 分析最近多少天的数据
+            
+        Returns:
+            钱包地址 -> 交易模式分析结果
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for wallet_address in dict.fromkeys(wallets):
+            cached = self._cache_get(self._pattern_cache, (wallet_address, days))
+            if cached is not None:
+                results[wallet_address] = copy.deepcopy(cached)
+            else:
+                missing.append(wallet_address)
+                
+        if missing:
+            swap_txs_by_wallet = await self.collector.fetch_recent_swap_transactions_batch(
+                missing,
+                days=days
+            )
+            now = time.monotonic()
+            for wallet_address in missing:
+                block_times = array.array('q')
+                dex_ids = array.array('b')
+                append = _swap_batch_appender(block_times, dex_ids)
+                for tx in swap_txs_by_wallet.get(wallet_address, []):
+                    append(tx)
+                    
+                batch = SwapBatch.from_columns(block_times, dex_ids)
+                result = self._summarize_swap_transactions(wallet_address, batch, days)
+                if result["success"]:
+                    self._cache_put(
+                        self._pattern_cache,
+                        (wallet_address, days),
+                        copy.deepcopy(result),
+                        self.cache_max_size,
+                        now
+                    )
+                results[wallet_address] = result
+                
+        return results
+        
+    def _summarize_swap_transactions(
+        self,
+        wallet_address: str,
+        batch: SwapBatch,
+        days: int
+    ) -> Dict[str, Any]:
+        """
+        根据交换交易的聚合状态统计钱包的交易模式
+        
+        Args:
+            wallet_address: 钱包地址
+            batch: 列式存储的交换交易
+            days: 分析的天数
+            
+        Returns:
+            交易模式分析结果字典
+        """
+        if not len(batch):
             return {
                 "success": False,
                 "error": "没有找到交换交易数据",
@@ -59,94 +490,56 @@ class TransactionAnalyzer:
                 "analyzed_days": days
             }
             
-        # 分析结果
-        result = {
+        # 时间统计整体向量化计算(按UTC分桶)
+        times = batch.block_times
+        (
+            hourly_distribution,
+            days_since_epoch,
+            daily_totals,
+            first_block_time,
+            last_block_time,
+            dex_totals
+        ) = aggregate_batch(times, batch.dex_ids, len(DEX_NAMES) + 1)
+        # 只对去重后的日期做字符串转换
+        daily_counts = dict(zip(
+            days_since_epoch.astype("datetime64[D]").astype(str).tolist(),
+            daily_totals.tolist()
+        ))
+        
+        # 交易历史按固定宽度分箱，代替原始交易列表交给LLM
+        bin_seconds = self.history_bin_seconds or choose_bin_seconds(len(batch), days)
+        
+        # 分析结果在最后一次性构建；代币、金额等字段需要解析交易数据后才能填充
+        return {
             "success": True,
             "wallet": wallet_address,
             "analyzed_days": days,
-            "transaction_count": len(swap_txs),
-            "first_transaction_time": None,
-            "last_transaction_time": None,
-            "tokens_traded": set(),
-            "trading_frequency": {},
+            "transaction_count": len(batch),
+            "first_transaction_time": unix_time_to_datetime(first_block_time).isoformat(),
+            "last_transaction_time": unix_time_to_datetime(last_block_time).isoformat(),
+            "tokens_traded": [],
+            "trading_frequency": {
+                "daily_average": len(batch) / days if days > 0 else 0,
+                "daily_distribution": daily_counts,
+                "hourly_distribution": dict(enumerate(hourly_distribution.tolist())),
+                "max_transactions_in_day": int(daily_totals.max()) if daily_totals.size else 0,
+                "days_with_activity": len(daily_counts)
+            },
             "trading_volume": {},
             "trading_amount_distribution": {},
-            "preferred_dexs": {},
+            "preferred_dexs": {
+                name: count for name, count in zip(DEX_NAMES, dex_totals.tolist()) if count
+            },
             "trading_time_patterns": {},
             "token_holding_periods": {},
             "token_pairs_frequency": {},
             "position_sizing": {},
             "win_loss_ratio": {},
             "slippage_data": {},
-            "profitability_analysis": {}
+            "profitability_analysis": {},
+            "trading_history_summary": summarize_history(times, bin_seconds)
         }
         
-        # 先从基本统计开始
-        token_trades = defaultdict(list)  # 按代币分类的交易
-        token_amounts = defaultdict(list)  # 每个代币的交易金额
-        dexs_used = Counter()  # 使用的DEX计数
-        hourly_distribution = [0] * 24  # 每小时交易分布
-        
-        # 按时间排序
-        sorted_txs = sorted(swap_txs, key=lambda tx: tx.get("blockTime", 0))
-        
-        if sorted_txs:
-            result["first_transaction_time"] = unix_time_to_datetime(sorted_txs[0].get("blockTime", 0)).isoformat()
-            result["last_transaction_time"] = unix_time_to_datetime(sorted_txs[-1].get("blockTime", 0)).isoformat()
-        
-        # 分析每个交易
-        for tx in sorted_txs:
-            # 提取交易时间
-            block_time = tx.get("blockTime", 0)
-            tx_time = unix_time_to_datetime(block_time)
-            
-            # 更新小时分布
-            hour = tx_time.hour
-            hourly_distribution[hour] += 1
-            
-            # 识别DEX(根据程序ID)
-            if tx.get("transaction") and tx["transaction"].get("message"):
-                account_keys = tx["transaction"]["message"].get("accountKeys", [])
-                
-                # DEX识别逻辑
-                if "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4" in account_keys:
-                    dexs_used["Jupiter V4"] += 1
-                elif "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB" in account_keys:
-                    dexs_used["Jupiter V3"] += 1
-                elif "9W959DqEETiGZocYWCQPaJ6sBmUzgfxXfqGeTEdp3aQP" in account_keys:
-                    dexs_used["Raydium"] += 1
-                elif "EMAKHqYYkYvBwAYBQ9WqCHSR8PeqLyYLt2ahcXbgjKiW" in account_keys:
-                    dexs_used["Raydium LP"] += 1
-                else:
-                    dexs_used["Other DEX"] += 1
-                    
-            # TODO: 这部分需要实际解析交易数据来提取代币和金额
-            # 这需要详细的Solana交易解析逻辑，此处仅为框架示例
-            # 实际实现时需要根据不同DEX的交易格式解析交易日志
-        
-        # 编译结果
-        # 交易频率分析
-        daily_counts = defaultdict(int)
-        for tx in sorted_txs:
-            tx_date = unix_time_to_datetime(tx.get("blockTime", 0)).date().isoformat()
-            daily_counts[tx_date] += 1
-            
-        result["trading_frequency"] = {
-            "daily_average": len(sorted_txs) / days if days > 0 else 0,
-            "daily_distribution": dict(daily_counts),
-            "hourly_distribution": dict(enumerate(hourly_distribution)),
-            "max_transactions_in_day": max(daily_counts.values()) if daily_counts else 0,
-            "days_with_activity": len(daily_counts)
-        }
-        
-        # DEX偏好
-        result["preferred_dexs"] = dict(dexs_used)
-        
-        # 将集合转换为列表(JSON可序列化)
-        result["tokens_traded"] = list(result["tokens_traded"])
-        
-        return result
-        
     async def analyze_trading_pattern(
         self,
         wallet_address: str,
@@ -171,11 +564,7 @@ class TransactionAnalyzer:
             return base_analysis
             
         # 收集更多详细数据
-        # 1. 历史交易数据
-        swap_txs = await self.collector.fetch_recent_swap_transactions(
-            wallet_address, 
-            days=days
-        )
+        # 1. 历史交易数据已在基础分析中聚合，不再保存或发送原始交易列表
         
         # 2. 价格历史数据(这里需要实际实现)
         # price_history = await self._fetch_price_history(tokens, days)
@@ -189,23 +578,42 @@ class TransactionAnalyzer:
         # 5. 池子数据(这里需要实际实现)
         # pool_history = await self._fetch_pool_history(token_pairs, days)
         
+        # 并发获取相互独立的市场和执行数据
+        (
+            market_sentiment,
+            liquidity_data,
+            routing_efficiency,
+            execution_performance,
+            slippage_analysis,
+            transaction_anomalies,
+            market_anomalies
+        ) = await asyncio.gather(
+            self._get_market_sentiment(),
+            self._get_liquidity_data(),
+            self._get_routing_efficiency(),
+            self._get_execution_performance(),
+            self._get_slippage_analysis(),
+            self._detect_transaction_anomalies(),
+            self._detect_market_anomalies()
+        )
+        
         # 准备分析数据
         analysis_data = {
             "wallet_address": wallet_address,
             "base_analysis": base_analysis,
-            "trading_history": swap_txs,
+            "trading_history_summary": base_analysis["trading_history_summary"],
             # 下面部分在实际实现时需要填充
             "price_history": {},  # 代币价格历史
             "depth_history": {},  # 市场深度历史
             "volume_history": {},  # 成交量历史
             "pool_history": {},   # 流动性池子历史
-            "market_sentiment": await self._get_market_sentiment(),
-            "liquidity_data": await self._get_liquidity_data(),
-            "routing_efficiency": await self._get_routing_efficiency(),
-            "execution_performance": await self._get_execution_performance(),
-            "slippage_analysis": await self._get_slippage_analysis(),
-            "transaction_anomalies": await self._detect_transaction_anomalies(),
-            "market_anomalies": await self._detect_market_anomalies()
+            "market_sentiment": market_sentiment,
+            "liquidity_data": liquidity_data,
+            "routing_efficiency": routing_efficiency,
+            "execution_performance": execution_performance,
+            "slippage_analysis": slippage_analysis,
+            "transaction_anomalies": transaction_anomalies,
+            "market_anomalies": market_anomalies
         }
         
         # 构建请求LLM进行分析的数据
@@ -325,141 +733,38 @@ class TransactionAnalyzer:
         Returns:
             分析结果
         """
-        # 设置默认配置
-        if model_config is None:
-            model_config = {
-                "model": "gpt-4",
-                "temperature": 0.2,
-                "max_tokens": 2500
-            }
-            
-        # 构建系统提示
-        system_prompt = """
-        你是一位专业的加密货币交易策略分析师，专注于Solana生态系统的交易模式分析。
-        你的任务是分析提供的交易数据，识别交易模式，并提取完整的自动化交易策略。
-        
-        请仔细分析提供的数据，包括:
-        1. 交易历史
-        2. 价格历史
-        3. 市场深度
-        4. 成交量数据
-        5. 流动性池数据
-        6. 市场情绪
-        7. 滑点分析
-        8. 异常检测结果
-        
-        你的输出必须是严格的JSON格式，包含以下关键部分:
-        
-        1. 交易模式识别
-        2. 策略提取
-        3. 改进建议
-        4. 风险分析
-        
-        确保你的分析全面、详细，并基于数据提供具体的策略参数。
-        """
-        
-        # 构建用户提示
-        user_prompt = f"""
-        请分析以下交易数据并提取完整的交易策略:
-        
-        钱包地址: {analysis_data['wallet_address']}
-        分析时段: {analysis_data['base_analysis']['analyzed_days']} 天
-        交易次数: {analysis_data['base_analysis']['transaction_count']}
-        
-        请根据以下数据进行分析:
-        
-        1. 基础分析:
-        - 交易频率: {json.dumps(analysis_data['base_analysis']['trading_frequency'])}
-        - 偏好的DEX: {json.dumps(analysis_data['base_analysis']['preferred_dexs'])}
-        - 交易代币: {json.dumps(analysis_data['base_analysis']['tokens_traded'])}
-        
-        2. 市场情绪数据:
-        {json.dumps(analysis_data['market_sentiment'])}
-        
-        3. 流动性数据:
-        {json.dumps(analysis_data['liquidity_data'])}
-        
-        4. 路由效率:
-        {json.dumps(analysis_data['routing_efficiency'])}
-        
-        5. 执行性能:
-        {json.dumps(analysis_data['execution_performance'])}
-        
-        6. 滑点分析:
-        {json.dumps(analysis_data['slippage_analysis'])}
-        
-        7. 交易异常:
-        {json.dumps(analysis_data['transaction_anomalies'])}
-        
-        8. 市场异常:
-        {json.dumps(analysis_data['market_anomalies'])}
+        system_prompt, user_prompt, model_config = prepare_llm_request(analysis_data, model_config)
+        base_analysis = analysis_data['base_analysis']
         
-        请提供以下输出格式的分析结果:
-        
-        {
-            "pattern_recognition": {
-                "primary_pattern": "主要交易模式",
-                "secondary_patterns": ["次要模式1", "次要模式2"],
-                "timing_patterns": "时间模式分析",
-                "token_selection_logic": "代币选择逻辑"
-            },
-            "strategy": {
-                "name": "策略名称",
-                "description": "策略简要描述",
-                "target_selection": {
-                    "criteria": ["选择标准1", "选择标准2"],
-                    "filters": ["过滤条件1", "过滤条件2"]
-                },
-                "entry_strategy": {
-                    "triggers": ["入场触发条件1", "入场触发条件2"],
-                    "confirmation_signals": ["确认信号1", "确认信号2"],
-                    "optimal_timing": "最佳入场时机描述"
-                },
-                "exit_strategy": {
-                    "take_profit": "止盈策略",
-                    "stop_loss": "止损策略",
-                    "trailing_mechanisms": "追踪止损机制"
-                },
-                "position_management": {
-                    "sizing": "仓位大小计算方法",
-                    "scaling": "加减仓策略",
-                    "hedging": "对冲策略(如适用)"
-                },
-                "risk_control": {
-                    "max_position_size": "最大仓位建议",
-                    "max_daily_loss": "每日最大亏损限制",
-                    "correlation_management": "相关性管理策略"
-                },
-                "automation_flow": {
-                    "monitoring_frequency": "监控频率",
-                    "trigger_actions": ["触发动作1", "触发动作2"],
-                    "fallback_procedures": ["应急程序1", "应急程序2"]
-                }
-            },
-            "improvement_suggestions": {
-                "efficiency_gains": ["效率提升建议1", "效率提升建议2"],
-                "risk_reduction": ["风险降低建议1", "风险降低建议2"],
-                "profitability_enhancements": ["盈利能力提升建议1", "盈利能力提升建议2"]
-            },
-            "risk_analysis": {
-                "identified_risks": ["已识别风险1", "已识别风险2"],
-                "mitigation_strategies": ["风险缓解策略1", "风险缓解策略2"],
-                "market_dependency_factors": ["市场依赖因素1", "市场依赖因素2"]
-            }
+        analysis_request = {
+            "wallet_address": analysis_data['wallet_address'],
+            "days_analyzed": base_analysis['analyzed_days'],
+            "transaction_count": base_analysis['transaction_count']
         }
-        """
-        
-        # 实际实现时，这里应调用配置的大型语言模型API
-        # 例如 OpenAI API, Azure OpenAI, Anthropic Claude等
         
+        # 配置了API密钥时调用大型语言模型API
+        if getattr(self.config, "llm_api_key", ""):
+            # 相同输入直接复用缓存的响应，避免重复的API往返和token消耗
+            key = hashlib.blake2b(
+                "\x00".join((
+                    self.llm_cache_seed,
+                    system_prompt,
+                    user_prompt,
+                    json.dumps(dict(model_config), sort_keys=True)
+                )).encode(),
+                digest_size=16
+            ).hexdigest()
+            result = self._cache_get(self._llm_cache, key, self.llm_cache_ttl)
+            if result is None:
+                result = await self._call_llm(system_prompt, user_prompt, model_config, analysis_request)
+                if result["success"]:
+                    self._cache_put(self._llm_cache, key, result, self.llm_cache_max_size)
+            return result
+            
         # 模拟返回结果(实际应用中需要实现真实API调用)
         return {
             "success": True,
-            "analysis_request": {
-                "wallet_address": analysis_data['wallet_address'],
-                "days_analyzed": analysis_data['base_analysis']['analyzed_days'],
-                "transaction_count": analysis_data['base_analysis']['transaction_count']
-            },
+            "analysis_request": analysis_request,
             "analysis_result": {
                 "pattern_recognition": {
                     "primary_pattern": "短期动量跟踪与反转点捕捉",
@@ -532,4 +837,74 @@ class TransactionAnalyzer:
                     ]
                 }
             }
-        } 
\ No newline at end of file
+        } 
+        
+    async def _call_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model_config: Mapping[str, Any],
+        analysis_request: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        以流式方式调用大型语言模型API(OpenAI兼容接口)
+        
+        Args:
+            system_prompt: 系统提示
+            user_prompt: 用户提示
+            model_config: 模型配置
+            analysis_request: 分析请求摘要
+            
+        Returns:
+            分析结果
+        """
+        url = getattr(self.config, "llm_base_url", DEFAULT_LLM_BASE_URL).rstrip("/") + "/chat/completions"
+        headers = {"Authorization": f"Bearer {self.config.llm_api_key}"}
+        payload = {
+            **model_config,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "stream": True
+        }
+        
+        parts = []
+        try:
+            async with self._llm_sem:
+                async with self.collector.session.post(url, json=payload, headers=headers, timeout=LLM_TIMEOUT) as response:
+                    response.raise_for_status()
+                    # 逐行读取SSE事件，边接收边拼接增量内容
+                    async for line in response.content:
+                        line = line.strip()
+                        if not line.startswith(b"data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == b"[DONE]":
+                            break
+                        choices = _decode_json(data).get("choices") or []
+                        if choices:
+                            delta = choices[0].get("delta", {}).get("content")
+                            if delta:
+                                parts.append(delta)
+        except Exception as e:
+            logger.error(f"大模型请求失败: {e}")
+            return {"success": False, "error": str(e), "analysis_request": analysis_request}
+            
+        content = "".join(parts)
+        try:
+            analysis_result = _decode_json(content)
+        except ValueError:
+            logger.error("大模型返回的不是有效的JSON")
+            return {
+                "success": False,
+                "error": "大模型返回的不是有效的JSON",
+                "analysis_request": analysis_request,
+                "raw_response": content
+            }
+            
+        return {
+            "success": True,
+            "analysis_request": analysis_request,
+            "analysis_result": analysis_result
+        }
@@ -2,15 +2,27 @@
 Solana blockchain data collector using solana-tx-parser.
 """
 import asyncio
+import base64
+import hashlib
 import logging
+import random
 import time
-from typing import Dict, List, Any, Optional, Set
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Dict, List, Any, Optional, Set, Tuple, AsyncIterator, Callable, FrozenSet
 from datetime import datetime
+from functools import lru_cache
 
+import aiohttp
+import orjson
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.commitment import Commitment
 from solana.rpc.types import MemcmpOpts
+from solana.rpc.websocket_api import connect
 from solders.pubkey import Pubkey
+from solders.rpc.config import RpcTransactionLogsFilterMentions
+from solders.rpc.responses import LogsNotification
 from solders.transaction import Transaction
 
 # 导入 solana-tx-parser
@@ -24,21 +36,198 @@ from solana_tx_parser import (
 
 logger = logging.getLogger(__name__)
 
+# 识别交换交易的DEX程序ID
+SWAP_PROGRAM_IDS = frozenset({
+    "JUP2jxvXaqu7NQY1GmNF4m1vodw12LVXYxbFL2uJvfo",  # Jupiter
+    "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB",  # Jupiter V3
+    "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4",  # Jupiter V4
+    "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc",  # Orca Whirlpool
+    "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8",  # Raydium AMM
+    "9W959DqEETiGZocYWCQPaJ6sBmUzgfxXfqGeTEdp3aQP",  # Raydium
+    "EMAKHqYYkYvBwAYBQ9WqCHSR8PeqLyYLt2ahcXbgjKiW"   # Raydium LP
+})
+
+# 单个JSON-RPC批量请求中的最大请求数
+RPC_BATCH_SIZE = 100
+# getSignaturesForAddress每页签名数
+SIGNATURE_PAGE_SIZE = 1000
+# 合并WebSocket交易通知的时间窗口(秒)
+NOTIFY_BATCH_WINDOW = 0.05
+# 交易处理流水线各阶段队列的容量，队列满时上游等待
+PIPELINE_QUEUE_SIZE = 256
+# 并发获取和解析交易的工作协程数
+PIPELINE_FETCH_WORKERS = 4
+# 订阅通知到达时交易可能尚未可查询，getTransaction返回空时的重试次数和间隔(秒)
+NOTIFY_FETCH_RETRIES = 3
+NOTIFY_RETRY_DELAY = 0.5
+# 单次RPC请求的超时，按请求设置，共享会话上的流式大模型请求不受影响
+RPC_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+@dataclass
+class TxData(Mapping):
+    """Parsed transaction handed to transaction callbacks.
+    
+    Slotted to keep cached transactions small; it also implements the
+    read-only Mapping protocol so callbacks can keep using tx_data["slot"]
+    or tx_data.get("meta").
+    """
+    __slots__ = ("signature", "slot", "blockTime", "meta", "instructions", "logs")
+    
+    signature: str
+    slot: Optional[int]
+    blockTime: Optional[int]
+    meta: Optional[Dict[str, Any]]
+    instructions: List[Any]
+    logs: List[Any]
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+        
+    def __iter__(self):
+        return iter(self.__slots__)
+        
+    def __len__(self) -> int:
+        return len(self.__slots__)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize a plain dict, e.g. for JSON serialization."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+@dataclass
+class PoolSnapshot:
+    """Latest pool state observed at or after a transaction's slot.
+    
+    The RPC node only serves current account state, so this is not the
+    state immediately before or after the transaction.
+    """
+    __slots__ = ("state", "context_slot", "pool_info")
+    
+    state: Dict[str, Any]
+    context_slot: Optional[int]
+    pool_info: Dict[str, Any]
+
+@lru_cache(maxsize=131072)
+def _pk(address: str) -> Pubkey:
+    """Decode a base58 address once and reuse the Pubkey afterwards."""
+    return Pubkey.from_string(address)
+
+def _notified_signatures(messages: List[Any]) -> List[str]:
+    """Extract transaction signatures from a batch of logsSubscribe messages."""
+    return [
+        str(msg.result.value.signature)
+        for msg in messages
+        if isinstance(msg, LogsNotification)
+    ]
+
+def _pool_token_masks(meta: Optional[Dict[str, Any]], pool_addresses: List[str]) -> Dict[str, int]:
+    """
+    Encode the mints each pool holds in a transaction as an int bitmask.
+    
+    Token balance entries owned by a pool address are that pool's vaults.
+    Mints are numbered per transaction, so a mask only has as many bits
+    as the transaction has mints.
+    """
+    masks = dict.fromkeys(pool_addresses, 0)
+    if not meta:
+        return masks
+    mint_bits: Dict[str, int] = {}
+    for balances in (meta.get("preTokenBalances"), meta.get("postTokenBalances")):
+        for balance in balances or ():
+            owner = balance.get("owner")
+            if owner in masks:
+                bit = mint_bits.setdefault(balance["mint"], len(mint_bits))
+                masks[owner] |= 1 << bit
+    return masks
+
+def _anchor_discriminator(account_name: str) -> bytes:
+    """Anchor account discriminator: first 8 bytes of sha256("account:<Name>")."""
+    return hashlib.sha256(f"account:{account_name}".encode()).digest()[:8]
+
+def _specialize_pool_handlers(
+    is_pool: Callable[[bytes], bool],
+    parse_pool: Callable[[bytes], Optional[Dict[str, Any]]],
+    discriminators: FrozenSet[bytes]
+) -> Tuple[Callable[[bytes], bool], Callable[[bytes], Optional[Dict[str, Any]]]]:
+    """
+    Build the pool check/parse functions for one program.
+    
+    Anchor programs only accept accounts whose 8-byte discriminator belongs
+    to their IDL; programs without an Anchor IDL (e.g. Raydium AMM v4) use
+    the handlers unchanged.
+    """
+    if not discriminators:
+        return is_pool, parse_pool
+        
+    def check(data: bytes) -> bool:
+        return bytes(data[:8]) in discriminators and is_pool(data)
+        
+    def parse(data: bytes) -> Optional[Dict[str, Any]]:
+        return parse_pool(data) if bytes(data[:8]) in discriminators else None
+        
+    return check, parse
+
 class SolanaCollector:
     """
     Collector for Solana blockchain data using solana-tx-parser.
     """
     
-    def __init__(self, rpc_url: str, commitment: str = "confirmed"):
+    # 已确认交易不可变，按签名缓存的最大条数
+    TX_CACHE_SIZE = 50_000
+    # 池子元数据缓存有效期(秒)和最大条数
+    POOL_CACHE_TTL = 60.0
+    POOL_CACHE_SIZE = 50_000
+    # 池子最新状态内存缓存的最大条数
+    POOL_STATE_CACHE_SIZE = 10_000
+    # 池子状态每个slot都可能变化，缓存只在很短时间内有效(秒)
+    POOL_STATE_TTL = 2.0
+    # 轮询失败后指数退避的上限(秒)
+    MAX_POLL_BACKOFF = 60.0
+    # 连续失败达到该次数后熔断，熔断期间不再请求RPC
+    BREAKER_THRESHOLD = 5
+    BREAKER_RESET = 30.0
+    
+    def __init__(
+        self,
+        rpc_url: str,
+        commitment: str = "confirmed",
+        batch_size: int = RPC_BATCH_SIZE,
+        ws_url: Optional[str] = None
+    ):
         """
         Initialize the Solana collector.
         
         Args:
             rpc_url: URL of the Solana RPC node
             commitment: The commitment level to use
+            batch_size: Maximum number of calls per JSON-RPC batch request
+            ws_url: WebSocket URL of the RPC node (derived from rpc_url if omitted)
         """
+        self.rpc_url = rpc_url
+        self.ws_url = ws_url or rpc_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        self.commitment = commitment
+        self.batch_size = batch_size
+        # 部分RPC服务商不支持批量请求，首次被拒绝后改为逐个请求
+        self._batch_supported = True
+        self._tx_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._parsed_tx_cache: "OrderedDict[str, TxData]" = OrderedDict()
+        self._raw_tx_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._pool_cache: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        # Latest pool accounts by address with their fetch time, in a short-lived LRU
+        self._pool_state_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
         self.client = AsyncClient(rpc_url, commitment=commitment)
+        self._session: Optional[aiohttp.ClientSession] = None
         self.monitored_addresses: Set[str] = set()
+        # Addresses served by the shared polling dispatcher -> their callbacks
+        self._polled_addresses: Dict[str, List[callable]] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+        # Bounded queues joining the fetch/parse and callback stages
+        self._sig_queue: Optional[asyncio.Queue] = None
+        self._parsed_queue: Optional[asyncio.Queue] = None
+        self._pipeline_tasks: Optional[List[asyncio.Task]] = None
+        # Delayed re-queues of notified signatures that were not yet available
+        self._retry_tasks: Set[asyncio.Task] = set()
         self.monitored_pairs: Set[tuple[str, str]] = set()
         self.monitored_pools: Dict[str, Dict[str, Any]] = {}
         self.callbacks: Dict[str, List[callable]] = {
@@ -48,7 +237,7 @@ class SolanaCollector:
         }
         
         # Initialize transaction parser with known AMM IDLs
-        self.parser = SolanaParser([
+        idl_specs = [
             {
                 "programId": "JUP2jxvXaqu7NQY1GmNF4m1vodw12LVXYxbFL2uJvfo",
                 "idl": IDL.JUPITER
@@ -61,8 +250,35 @@ class SolanaCollector:
                 "programId": "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8",
                 "idl": IDL.RAYDIUM
             }
-        ])
+        ]
+        self.parser = SolanaParser(idl_specs)
+        # Bound once so hot paths skip the self.parser attribute walk
+        self._known_programs: Dict[str, str] = dict(self.parser.KNOWN_PROGRAMS)
+        self._known_program_set: FrozenSet[str] = frozenset(self._known_programs)
         
+        # Pool check/parse functions specialized per owner program at init,
+        # so the hot path is one dict lookup on the owner
+        pool_handlers = {
+            "Jupiter": (self._is_jupiter_pool, self._parse_jupiter_pool),
+            "Orca": (self._is_orca_pool, self._parse_orca_pool),
+            "Raydium": (self._is_raydium_pool, self._parse_raydium_pool)
+        }
+        idl_by_program = {spec["programId"]: spec["idl"] for spec in idl_specs}
+        self._pool_check_by_program: Dict[str, Callable[[bytes], bool]] = {}
+        self._snap_by_program: Dict[str, Callable[[bytes], Optional[Dict[str, Any]]]] = {}
+        for program_id, name in self._known_programs.items():
+            if name not in pool_handlers:
+                continue
+            idl = idl_by_program.get(program_id) or {}
+            discriminators = frozenset(
+                _anchor_discriminator(account["name"])
+                for account in idl.get("accounts", [])
+            )
+            (
+                self._pool_check_by_program[program_id],
+                self._snap_by_program[program_id]
+            ) = _specialize_pool_handlers(*pool_handlers[name], discriminators)
+            
         logger.info(f"Initialized Solana collector with RPC URL: {rpc_url}")
         
     async def listen_for_transactions(self, address: str, callback: callable):
@@ -81,76 +297,602 @@ class SolanaCollector:
             if callback not in self.callbacks['transaction']:
                 self.callbacks['transaction'].append(callback)
             
-            # Start monitoring loop
+            # Prefer pushed notifications; fall back to polling if the
+            # WebSocket endpoint is unavailable or the connection drops
+            try:
+                await self._subscribe_transactions(address, callback)
+            except Exception as e:
+                logger.warning(f"Log subscription for {address} failed, falling back to polling: {e}")
+                
+            await self._poll_transactions(address, callback)
+            
+        except Exception as e:
+            logger.error(f"Error setting up transaction listener: {e}")
+            
+    async def _subscribe_transactions(self, address: str, callback: callable):
+        """
+        Receive new transactions of an address through logsSubscribe.
+        
+        Args:
+            address: The address to monitor
+            callback: Function to call when new transaction is detected
+        """
+        async with connect(self.ws_url) as websocket:
+            await websocket.logs_subscribe(
+                RpcTransactionLogsFilterMentions(_pk(address)),
+                commitment=Commitment(self.commitment)
+            )
+            # First message confirms the subscription
+            await websocket.recv()
+            
             while True:
-                try:
-                    # Get recent signatures
-                    signatures = await self.client.get_signatures_for_address(
-                        Pubkey.from_string(address),
-                        limit=10
+                # Coalesce notifications arriving within a short window so
+                # they are fetched with one batched request instead of one each
+                sigs = _notified_signatures(await websocket.recv())
+                deadline = time.monotonic() + NOTIFY_BATCH_WINDOW
+                while len(sigs) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        sigs.extend(_notified_signatures(
+                            await asyncio.wait_for(websocket.recv(), remaining)
+                        ))
+                    except asyncio.TimeoutError:
+                        break
+                        
+                if sigs:
+                    # A notification can arrive before getTransaction can serve
+                    # the transaction, so unresolved signatures are retried
+                    await self._process_signatures(sigs, [callback], retries=NOTIFY_FETCH_RETRIES)
+                    
+    async def _poll_transactions(self, address: str, callback: callable):
+        """
+        Poll an address for new transactions through the shared dispatcher.
+        
+        Args:
+            address: The address to monitor
+            callback: Function to call when new transaction is detected
+        """
+        callbacks = self._polled_addresses.setdefault(address, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+            
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll_all())
+        try:
+            # Shielded so one listener being cancelled does not stop the others
+            await asyncio.shield(self._poll_task)
+        finally:
+            callbacks.remove(callback)
+            if not callbacks:
+                self._polled_addresses.pop(address, None)
+        
+    async def _poll_all(self):
+        """Poll every polled address with one batched request per tick."""
+        failures = 0
+        while True:
+            try:
+                addresses = list(self._polled_addresses)
+                
+                # Get recent signatures of all addresses in one batch request
+                pages = await self._rpc_batch([
+                    ("getSignaturesForAddress", [address, {"limit": 10, "commitment": self.commitment}])
+                    for address in addresses
+                ])
+                sigs_by_address = {
+                    address: [sig_info["signature"] for sig_info in page]
+                    for address, page in zip(addresses, pages)
+                    if page
+                }
+                
+                if sigs_by_address:
+                    # Warm the transaction cache for all addresses at once
+                    await self._get_transactions([
+                        sig for sigs in sigs_by_address.values() for sig in sigs
+                    ])
+                    for address, sigs in sigs_by_address.items():
+                        await self._process_signatures(sigs, self._polled_addresses.get(address, []))
+                        
+                # Wait before next check
+                failures = 0
+                await asyncio.sleep(1)
+                
+            except Exception as e:
+                failures += 1
+                # Exponential backoff with jitter so retries do not line up
+                delay = min(self.MAX_POLL_BACKOFF, 2 ** failures)
+                if failures >= self.BREAKER_THRESHOLD:
+                    # Breaker open: leave the RPC node alone until the reset period passes
+                    delay = max(delay, self.BREAKER_RESET)
+                    logger.error(f"Error monitoring transactions ({failures} consecutive failures), pausing polling: {e}")
+                else:
+                    logger.error(f"Error monitoring transactions: {e}")
+                await asyncio.sleep(random.uniform(delay, delay * 2))
+                
+    async def _process_signatures(
+        self,
+        sigs: List[str],
+        callbacks: List[callable],
+        retries: int = 0
+    ):
+        """
+        Queue new transactions for fetching, parsing and dispatch to callbacks.
+        
+        Waits only while the pipeline queue is full, so a slow callback
+        delays the next poll through backpressure instead of stalling it.
+        
+        Args:
+            sigs: Transaction signatures
+            callbacks: Functions to call with each parsed transaction
+            retries: How many times to re-queue signatures getTransaction
+                does not return yet, NOTIFY_RETRY_DELAY seconds apart
+        """
+        if self._pipeline_tasks is None:
+            self._start_pipeline()
+        await self._sig_queue.put((sigs, callbacks, retries))
+        
+    async def _retry_signatures(self, sigs: List[str], callbacks: List[callable], retries: int):
+        """Re-queue unresolved signatures after a delay."""
+        await asyncio.sleep(NOTIFY_RETRY_DELAY)
+        await self._sig_queue.put((sigs, callbacks, retries))
+        
+    def _start_pipeline(self):
+        """Start the fetch/parse workers and the callback dispatcher."""
+        self._sig_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._parsed_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._pipeline_tasks = [
+            asyncio.create_task(self._fetch_worker())
+            for _ in range(PIPELINE_FETCH_WORKERS)
+        ]
+        self._pipeline_tasks.append(asyncio.create_task(self._dispatch_worker()))
+        
+    async def _fetch_worker(self):
+        """Fetch and parse queued signatures, passing the results on to the dispatcher."""
+        while True:
+            sigs, callbacks, retries = await self._sig_queue.get()
+            try:
+                parsed, unresolved = await self._fetch_parsed_transactions(sigs)
+                if parsed:
+                    await self._parsed_queue.put((parsed, callbacks))
+                if unresolved and retries > 0:
+                    # Retried from a separate task so the worker never
+                    # blocks on the queue it consumes
+                    task = asyncio.create_task(
+                        self._retry_signatures(unresolved, callbacks, retries - 1)
                     )
+                    self._retry_tasks.add(task)
+                    task.add_done_callback(self._retry_tasks.discard)
+            except Exception as e:
+                logger.error(f"Error fetching transactions: {e}")
+            finally:
+                self._sig_queue.task_done()
+                
+    async def _dispatch_worker(self):
+        """Hand parsed transactions to their callbacks."""
+        while True:
+            parsed, callbacks = await self._parsed_queue.get()
+            for tx_data in parsed:
+                # Call callbacks with parsed data
+                for callback in callbacks:
+                    try:
+                        callback(tx_data)
+                    except Exception as e:
+                        logger.error(f"Error in transaction callback: {e}")
+            self._parsed_queue.task_done()
+            
+    async def _fetch_parsed_transactions(self, sigs: List[str]) -> Tuple[List[TxData], List[str]]:
+        """
+        Fetch and parse transactions by signature.
+        
+        Args:
+            sigs: Transaction signatures
+            
+        Returns:
+            Parsed transactions in signature order, and the signatures
+            getTransaction returned nothing for
+        """
+        # Reuse parsed results for signatures seen before; fetch the rest in one batch
+        parsed = [self._parsed_tx_cache.get(sig) for sig in sigs]
+        missing = [i for i, tx_data in enumerate(parsed) if tx_data is None]
+        unresolved = []
+        if missing:
+            tx_responses = await self._get_transactions([sigs[i] for i in missing])
+            for i, tx_response in zip(missing, tx_responses):
+                if not tx_response:
+                    unresolved.append(sigs[i])
+                    continue
+                try:
+                    parsed[i] = self._parse_transaction(sigs[i], tx_response)
+                except Exception as e:
+                    logger.error(f"Error processing transaction {sigs[i]}: {e}")
+                    continue
+                self._parsed_tx_cache[sigs[i]] = parsed[i]
+                if len(self._parsed_tx_cache) > self.TX_CACHE_SIZE:
+                    self._parsed_tx_cache.popitem(last=False)
                     
-                    if signatures:
-                        # Process each new transaction
-                        for sig_info in signatures:
-                            # Get full transaction data with metadata
-                            tx_response = await self.client.get_transaction(
-                                sig_info.signature,
-                                max_supported_transaction_version=0
-                            )
-                            
-                            if tx_response:
-                                try:
-                                    # Flatten transaction to include CPI calls
-                                    flattened_tx = flattenTransactionResponse(tx_response)
-                                    
-                                    # Parse transaction logs
-                                    logs = parseLogs(tx_response.meta.logs if tx_response.meta else [])
-                                    
-                                    # Parse each instruction
-                                    parsed_instructions = []
-                                    for ix in flattened_tx:
-                                        try:
-                                            parsed_ix = self.parser.parse(ix)
-                                            if parsed_ix:
-                                                # Add corresponding logs
-                                                ix_logs = [log for log in logs if log.id == len(parsed_instructions)]
-                                                parsed_ix["logs"] = ix_logs
-                                                parsed_instructions.append(parsed_ix)
-                                        except Exception as e:
-                                            logger.warning(f"Failed to parse instruction: {e}")
-                                            continue
-                                    
-                                    # Create enriched transaction data
-                                    tx_data = {
-                                        "signature": sig_info.signature,
-                                        "slot": tx_response.slot,
-                                        "blockTime": tx_response.block_time,
-                                        "meta": tx_response.meta,
-                                        "instructions": parsed_instructions,
-                                        "logs": logs
-                                    }
-                                    
-                                    # Call callback with parsed data
-                                    try:
-                                        callback(tx_data)
-                                    except Exception as e:
-                                        logger.error(f"Error in transaction callback: {e}")
-                                        
-                                except Exception as e:
-                                    logger.error(f"Error processing transaction {sig_info.signature}: {e}")
-                                    continue
+        result = []
+        for sig, tx_data in zip(sigs, parsed):
+            if tx_data is None:
+                continue
+            self._parsed_tx_cache.move_to_end(sig)
+            result.append(tx_data)
+        return result, unresolved
+        
+    def _parse_transaction(self, sig: str, tx_response: Dict[str, Any]) -> TxData:
+        """
+        Parse a raw getTransaction result into enriched transaction data.
+        
+        Args:
+            sig: Transaction signature
+            tx_response: Raw getTransaction result
+            
+        Returns:
+            Enriched transaction data
+        """
+        # Flatten transaction to include CPI calls
+        flattened_tx = flattenTransactionResponse(tx_response)
+        
+        # Parse transaction logs
+        meta = tx_response.get("meta")
+        logs = parseLogs((meta.get("logMessages") or []) if meta else [])
+        
+        # Group logs by instruction index in one pass
+        logs_by_id = defaultdict(list)
+        for log in logs:
+            logs_by_id[log.id].append(log)
+            
+        # Parse each instruction
+        known = self._known_program_set
+        parse = self.parser.parse
+        parsed_instructions = []
+        for idx, ix in enumerate(flattened_tx):
+            # Only programs with a registered IDL can be parsed; skip the rest
+            # instead of letting parse() raise for every unknown instruction
+            if str(ix.program_id) not in known:
+                continue
+            try:
+                parsed_ix = parse(ix)
+                if parsed_ix:
+                    # Add corresponding logs
+                    parsed_ix["logs"] = logs_by_id.get(idx, [])
+                    parsed_instructions.append(parsed_ix)
+            except Exception as e:
+                logger.warning(f"Failed to parse instruction: {e}")
+                continue
+        
+        # Create enriched transaction data
+        return TxData(
+            signature=sig,
+            slot=tx_response.get("slot"),
+            blockTime=tx_response.get("blockTime"),
+            meta=meta,
+            instructions=parsed_instructions,
+            logs=logs
+        )
+        
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Shared HTTP session with a bounded keep-alive connection pool.
+        
+        Every RPC call of the collector goes through this session, so
+        TCP/TLS handshakes are paid once per pooled connection rather than
+        per call. Created lazily so it binds to the running event loop.
+        No session-wide timeout is set: RPC calls pass RPC_TIMEOUT per
+        request, and other users (e.g. streaming LLM calls) bring their own.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32,
+                    limit_per_host=32,
+                    keepalive_timeout=300,
+                    ttl_dns_cache=300
+                )
+            )
+        return self._session
+        
+    async def _rpc_batch(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Send JSON-RPC calls as batch requests.
+        
+        Args:
+            calls: List of (method, params) tuples
+            
+        Returns:
+            Results in the same order as calls (None for failed calls)
+        """
+        results: List[Any] = [None] * len(calls)
+        for start in range(0, len(calls), self.batch_size):
+            chunk = calls[start:start + self.batch_size]
+            if not self._batch_supported:
+                results[start:start + len(chunk)] = await self._rpc_call_many(chunk)
+                continue
+                
+            payload = [
+                {"jsonrpc": "2.0", "id": start + i, "method": method, "params": params}
+                for i, (method, params) in enumerate(chunk)
+            ]
+            async with self.session.post(self.rpc_url, json=payload, timeout=RPC_TIMEOUT) as response:
+                if 400 <= response.status < 500:
+                    # 很多服务商直接以4xx(403/413/429)拒绝批量请求
+                    replies = {"status": response.status, "body": (await response.text())[:200]}
+                else:
+                    response.raise_for_status()
+                    replies = await response.json()
+                
+            # 不支持批量的服务商返回单个错误对象或4xx状态，而不是响应数组
+            if not isinstance(replies, list):
+                logger.warning(f"RPC node rejected batch request, falling back to single calls: {replies}")
+                self._batch_supported = False
+                results[start:start + len(chunk)] = await self._rpc_call_many(chunk)
+                continue
+                
+            # 批量响应不保证顺序，按请求ID归位；单个请求失败不影响其余结果
+            for reply in replies:
+                if "error" in reply:
+                    logger.warning(f"RPC batch call {reply.get('id')} failed: {reply['error']}")
+                    continue
+                results[reply["id"]] = reply.get("result")
+                
+        return results
+        
+    async def _get_transactions(
+        self,
+        signatures: List[str],
+        use_cache: bool = True
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch transactions by signature, serving repeats from an LRU cache.
+        
+        Args:
+            signatures: Transaction signatures
+            use_cache: Read and populate the LRU cache. One-off history
+                scans pass False so they do not evict hot live entries.
+            
+        Returns:
+            Raw getTransaction results in the same order (None if not found)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(signatures)
+        missing: List[int] = []
+        for i, sig in enumerate(signatures):
+            cached = self._tx_cache.get(sig) if use_cache else None
+            if cached is not None:
+                self._tx_cache.move_to_end(sig)
+                results[i] = cached
+            else:
+                missing.append(i)
+                
+        if missing:
+            fetched = await self._rpc_batch([
+                ("getTransaction", [signatures[i], {
+                    "encoding": "json",
+                    "commitment": self.commitment,
+                    "maxSupportedTransactionVersion": 0
+                }])
+                for i in missing
+            ])
+            for i, tx in zip(missing, fetched):
+                if tx is None:
+                    continue
+                results[i] = tx
+                if not use_cache:
+                    continue
+                self._tx_cache[signatures[i]] = tx
+                if len(self._tx_cache) > self.TX_CACHE_SIZE:
+                    self._tx_cache.popitem(last=False)
                     
-                    # Wait before next check
-                    await asyncio.sleep(1)
+        return results
+        
+    async def get_raw_transaction(self, signature: str) -> Optional[bytes]:
+        """
+        Get a transaction as pre-serialized JSON bytes.
+        
+        The bytes are encoded once and cached by signature, so re-emitting a
+        transaction downstream (queues, storage, sockets) needs no JSON
+        re-encode on repeat access.
+        
+        Args:
+            signature: Transaction signature
+            
+        Returns:
+            JSON-encoded getTransaction result, or None if not found
+        """
+        raw = self._raw_tx_cache.get(signature)
+        if raw is not None:
+            self._raw_tx_cache.move_to_end(signature)
+            return raw
+            
+        tx = (await self._get_transactions([signature]))[0]
+        if tx is None:
+            return None
+        raw = self._raw_tx_cache[signature] = orjson.dumps(tx)
+        if len(self._raw_tx_cache) > self.TX_CACHE_SIZE:
+            self._raw_tx_cache.popitem(last=False)
+        return raw
+        
+    async def _rpc_call_many(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Send JSON-RPC calls concurrently as individual requests.
+        
+        Used when the node does not accept batches; the requests share the
+        pooled keep-alive connections, so they overlap instead of queuing.
+        
+        Args:
+            calls: List of (method, params) tuples
+            
+        Returns:
+            Results in the same order as calls (None for failed calls)
+        """
+        replies = await asyncio.gather(
+            *(self._rpc_call(method, params) for method, params in calls),
+            return_exceptions=True
+        )
+        results = []
+        for (method, _), reply in zip(calls, replies):
+            # 单个请求失败(如429)不影响其余请求
+            if isinstance(reply, Exception):
+                logger.warning(f"RPC call {method} failed: {reply}")
+                reply = None
+            results.append(reply)
+        return results
+        
+    async def _rpc_call(self, method: str, params: List[Any]) -> Any:
+        """
+        Send a single JSON-RPC call.
+        
+        Args:
+            method: RPC method name
+            params: RPC parameters
+            
+        Returns:
+            The call result, or None if the call failed
+        """
+        payload = {"jsonrpc": "2.0", "id": 0, "method": method, "params": params}
+        async with self.session.post(self.rpc_url, json=payload, timeout=RPC_TIMEOUT) as response:
+            response.raise_for_status()
+            reply = await response.json()
+            
+        if "error" in reply:
+            logger.warning(f"RPC call {method} failed: {reply['error']}")
+            return None
+        return reply.get("result")
+        
+    async def fetch_recent_swap_transactions_batch(
+        self,
+        wallets: List[str],
+        days: int = 30
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch recent swap transactions for several wallets using JSON-RPC batching.
+        
+        Args:
+            wallets: Wallet addresses
+            days: How many days of history to fetch
+            
+        Returns:
+            Mapping of wallet address to its swap transactions
+        """
+        cutoff = int(time.time()) - days * 86400
+        signatures: Dict[str, List[str]] = {wallet: [] for wallet in wallets}
+        
+        # 分页获取所有钱包在时间范围内的签名，每页一次批量请求
+        before: Dict[str, Optional[str]] = {wallet: None for wallet in signatures}
+        while before:
+            pending = list(before)
+            calls = []
+            for wallet in pending:
+                options: Dict[str, Any] = {
+                    "limit": SIGNATURE_PAGE_SIZE,
+                    "commitment": self.commitment
+                }
+                if before[wallet]:
+                    options["before"] = before[wallet]
+                calls.append(("getSignaturesForAddress", [wallet, options]))
+                
+            pages = await self._rpc_batch(calls)
+            
+            before = {}
+            for wallet, page in zip(pending, pages):
+                if not page:
+                    continue
+                for sig_info in page:
+                    block_time = sig_info.get("blockTime")
+                    if block_time and block_time >= cutoff and sig_info.get("err") is None:
+                        signatures[wallet].append(sig_info["signature"])
+                last_time = page[-1].get("blockTime")
+                if len(page) == SIGNATURE_PAGE_SIZE and last_time and last_time >= cutoff:
+                    before[wallet] = page[-1]["signature"]
                     
-                except Exception as e:
-                    logger.error(f"Error monitoring transactions: {e}")
-                    await asyncio.sleep(5)  # Wait longer after error
+        # 一次性批量获取所有交易详情
+        owners = [(wallet, sig) for wallet, sigs in signatures.items() for sig in sigs]
+        transactions = await self._get_transactions([sig for _, sig in owners], use_cache=False)
+        
+        swap_txs: Dict[str, List[Dict[str, Any]]] = {wallet: [] for wallet in wallets}
+        for (wallet, _), tx in zip(owners, transactions):
+            if self._is_swap_transaction(tx):
+                swap_txs[wallet].append(tx)
+                
+        return swap_txs
+        
+    async def iter_swap_transactions(
+        self,
+        wallet: str,
+        days: int = 30
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream recent swap transactions for a wallet page by page.
+        
+        Each page of signatures is resolved with one batched getTransaction
+        request, so at most one page of transactions is held in memory.
+        
+        Args:
+            wallet: Wallet address
+            days: How many days of history to fetch
+            
+        Yields:
+            Swap transactions of the wallet, newest first
+        """
+        cutoff = int(time.time()) - days * 86400
+        before: Optional[str] = None
+        while True:
+            options: Dict[str, Any] = {
+                "limit": SIGNATURE_PAGE_SIZE,
+                "commitment": self.commitment
+            }
+            if before:
+                options["before"] = before
+            page = (await self._rpc_batch([("getSignaturesForAddress", [wallet, options])]))[0]
+            if not page:
+                return
+                
+            signatures = [
+                sig_info["signature"]
+                for sig_info in page
+                if sig_info.get("blockTime") and sig_info["blockTime"] >= cutoff and sig_info.get("err") is None
+            ]
+            transactions = await self._get_transactions(signatures, use_cache=False)
+            for tx in transactions:
+                if self._is_swap_transaction(tx):
+                    yield tx
                     
-        except Exception as e:
-            logger.error(f"Error setting up transaction listener: {e}")
+            last_time = page[-1].get("blockTime")
+            if len(page) < SIGNATURE_PAGE_SIZE or not last_time or last_time < cutoff:
+                return
+            before = page[-1]["signature"]
             
+    @staticmethod
+    def _is_swap_transaction(tx: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a getTransaction result is a timestamped swap.
+        
+        Results without a blockTime are dropped here once, so consumers can
+        read tx["blockTime"] directly instead of defaulting it to epoch 0.
+        """
+        if not tx or not tx.get("blockTime"):
+            return False
+        account_keys = tx.get("transaction", {}).get("message", {}).get("accountKeys", [])
+        return not SWAP_PROGRAM_IDS.isdisjoint(account_keys)
+        
+    async def fetch_recent_swap_transactions(
+        self,
+        wallet: str,
+        days: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch recent swap transactions for a wallet.
+        
+        Args:
+            wallet: Wallet address
+            days: How many days of history to fetch
+            
+        Returns:
+            Swap transactions of the wallet
+        """
+        swap_txs = await self.fetch_recent_swap_transactions_batch([wallet], days=days)
+        return swap_txs[wallet]
+        
     async def _get_amm_snapshot(self, tx: Dict[str, Any], parsed_tx: ParsedTransaction) -> Optional[Dict[str, Any]]:
         """
         Get AMM state snapshot at transaction time.
@@ -163,119 +905,208 @@ class SolanaCollector:
             AMM state snapshot
         """
         try:
-            # Get pools involved in transaction
-            pool_addresses = set()
-            
-            # Check program IDs
-            for program_id in parsed_tx.program_ids:
-                if program_id in self.parser.KNOWN_PROGRAMS:
-                    # This is a DEX program, check accounts
-                    for account in parsed_tx.accounts:
-                        if await self._is_pool_account(account):
-                            pool_addresses.add(account)
-                            
+            # Only transactions touching a DEX program can involve pools
+            if self._known_program_set.isdisjoint(parsed_tx.program_ids):
+                return None
+            candidates = list(dict.fromkeys(parsed_tx.accounts))
+            
+            # Classify accounts from the cache, fetching the misses in one batch
+            is_pool: Dict[str, bool] = {}
+            pool_info: Dict[str, Dict[str, Any]] = {}
+            unknown: List[str] = []
+            for address in candidates:
+                flag = self._pool_cache_get("is_pool", address)
+                info = self._pool_cache_get("info", address)
+                if flag is None or info is None:
+                    unknown.append(address)
+                else:
+                    is_pool[address] = flag
+                    pool_info[address] = info
+                    
+            if unknown:
+                accounts = await self._get_accounts_batch(unknown)
+                for address in unknown:
+                    account = accounts.get(address)
+                    is_pool[address] = self._pool_cache_put("is_pool", address, self._is_pool_data(account))
+                    pool_info[address] = self._pool_cache_put("info", address, self._pool_info_from_account(address, account))
+                    
+            pool_addresses = [address for address in candidates if is_pool[address]]
             if not pool_addresses:
                 return None
                 
-            # Get state for each pool
+            # Historical account state is not available over RPC; this is the
+            # latest state of each pool at or after the transaction's slot
+            accounts = await self._get_accounts_at_slot(pool_addresses, tx["slot"])
+            
             amm_states = {}
             for pool_address in pool_addresses:
-                # Get pool state before transaction
-                before_state = await self._get_pool_state_at_slot(
-                    pool_address,
-                    tx["slot"] - 1
-                )
-                
-                # Get pool state after transaction  
-                after_state = await self._get_pool_state_at_slot(
-                    pool_address,
-                    tx["slot"]
-                )
+                account = accounts.get(pool_address)
+                state = self._parse_pool_state(account)
                 
-                if before_state and after_state:
-                    amm_states[pool_address] = {
-                        "before": before_state,
-                        "after": after_state,
-                        "pool_info": await self._get_pool_info(pool_address)
-                    }
+                if state:
+                    amm_states[pool_address] = PoolSnapshot(
+                        state=state,
+                        context_slot=account["context_slot"],
+                        pool_info=pool_info[pool_address]
+                    )
                     
             return {
-                "pool_addresses": list(pool_addresses),
+                "pool_addresses": pool_addresses,
                 "states": amm_states,
-                "route_type": self._determine_route_type(amm_states)
+                "route_type": self._determine_route_type(
+                    amm_states, _pool_token_masks(tx.get("meta"), pool_addresses)
+                )
             }
             
         except Exception as e:
             logger.error(f"Error getting AMM snapshot: {e}")
             return None
             
-    async def _get_pool_state_at_slot(self, pool_address: str, slot: int) -> Optional[Dict[str, Any]]:
+    async def _get_accounts_batch(
+        self,
+        addresses: List[str],
+        slot: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Get pool state at specific slot.
+        Fetch several accounts with getMultipleAccounts.
+        
+        The node always answers with its current account state; slot only
+        makes it refuse to answer before it has reached that slot. The
+        result is therefore the latest state at or after slot, never the
+        state as of slot.
         
         Args:
-            pool_address: Pool address
-            slot: Block slot
+            addresses: Account addresses
+            slot: Minimum context slot the node must have reached
             
         Returns:
-            Pool state data
+            Mapping of address to {"owner": program ID, "data": raw bytes,
+            "context_slot": slot the node answered at}; accounts that do not
+            exist are omitted
         """
-        try:
-            # Get account data at slot
-            account_data = await self.client.get_account_info(
-                Pubkey.from_string(pool_address),
-                commitment=Commitment("confirmed"),
-                slot=slot
-            )
+        options: Dict[str, Any] = {"encoding": "base64", "commitment": self.commitment}
+        if slot is not None:
+            options["minContextSlot"] = slot
             
-            if not account_data:
-                return None
-                
-            # Parse pool data based on program
-            program_id = str(account_data.owner)
-            if program_id in self.parser.KNOWN_PROGRAMS:
-                program_name = self.parser.KNOWN_PROGRAMS[program_id]
-                
-                if program_name == "Jupiter":
-                    return self._parse_jupiter_pool(account_data.data)
-                elif program_name == "Orca":
-                    return self._parse_orca_pool(account_data.data)
-                elif program_name == "Raydium":
-                    return self._parse_raydium_pool(account_data.data)
-                    
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error getting pool state: {e}")
-            return None
-            
-    async def _get_pool_info(self, pool_address: str) -> Dict[str, Any]:
-        """Get basic pool information."""
-        try:
-            # Get current pool data
-            account_data = await self.client.get_account_info(
-                Pubkey.from_string(pool_address)
-            )
+        # getMultipleAccounts接受最多100个地址
+        chunks = [addresses[start:start + 100] for start in range(0, len(addresses), 100)]
+        replies = await self._rpc_batch([
+            ("getMultipleAccounts", [chunk, options])
+            for chunk in chunks
+        ])
+        
+        accounts: Dict[str, Dict[str, Any]] = {}
+        for chunk, reply in zip(chunks, replies):
+            if not reply:
+                continue
+            context_slot = (reply.get("context") or {}).get("slot")
+            for address, value in zip(chunk, reply.get("value") or []):
+                if value:
+                    accounts[address] = {
+                        "owner": value["owner"],
+                        "data": base64.b64decode(value["data"][0]),
+                        "context_slot": context_slot
+                    }
+        return accounts
+        
+    async def _get_accounts_at_slot(self, addresses: List[str], slot: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch the latest pool accounts at or after a slot, through a short-lived cache.
+        
+        Like _get_accounts_batch this is current state, not state as of
+        slot. A cached account is reused only while it is younger than
+        POOL_STATE_TTL and was answered at a context slot no older than
+        slot; the rest are fetched from the RPC node.
+        
+        Args:
+            addresses: Pool account addresses
+            slot: Minimum context slot of the returned state
             
-            if not account_data:
-                return {}
+        Returns:
+            Mapping of address to account, as returned by _get_accounts_batch
+        """
+        now = time.monotonic()
+        accounts: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for address in addresses:
+            entry = self._pool_state_cache.get(address)
+            if (
+                entry is not None
+                and now - entry[0] < self.POOL_STATE_TTL
+                and (entry[1]["context_slot"] or 0) >= slot
+            ):
+                self._pool_state_cache.move_to_end(address)
+                accounts[address] = entry[1]
+            else:
+                missing.append(address)
                 
-            # Get program info
-            program_id = str(account_data.owner)
-            program_name = self.parser.KNOWN_PROGRAMS.get(program_id, "unknown")
+        if missing:
+            fetched = await self._get_accounts_batch(missing, slot=slot)
+            for address, account in fetched.items():
+                self._remember_pool_state(address, account)
+            accounts.update(fetched)
+        return accounts
+        
+    def _remember_pool_state(self, address: str, account: Dict[str, Any]):
+        """Store a pool account in the in-memory LRU, evicting the oldest entry."""
+        self._pool_state_cache[address] = (time.monotonic(), account)
+        self._pool_state_cache.move_to_end(address)
+        if len(self._pool_state_cache) > self.POOL_STATE_CACHE_SIZE:
+            self._pool_state_cache.popitem(last=False)
             
-            return {
-                "address": pool_address,
-                "program_id": program_id,
-                "program_name": program_name
-            }
+    def _parse_pool_state(self, account: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Parse pool state from fetched account data.
+        
+        Args:
+            account: Account from _get_accounts_batch
             
-        except Exception as e:
-            logger.error(f"Error getting pool info: {e}")
+        Returns:
+            Pool state data
+        """
+        if not account:
+            return None
+            
+        # Parse pool data with the owner program's specialized parser
+        fn = self._snap_by_program.get(account["owner"])
+        return fn(account["data"]) if fn else None
+        
+    def _pool_cache_get(self, kind: str, address: str) -> Any:
+        """Return cached pool metadata if it is still fresh, else None."""
+        key = (kind, address)
+        entry = self._pool_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.POOL_CACHE_TTL:
+            del self._pool_cache[key]
+            return None
+        self._pool_cache.move_to_end(key)
+        return entry[1]
+        
+    def _pool_cache_put(self, kind: str, address: str, value: Any) -> Any:
+        """Store pool metadata in the short-lived LRU cache and return it."""
+        key = (kind, address)
+        self._pool_cache[key] = (time.monotonic(), value)
+        self._pool_cache.move_to_end(key)
+        if len(self._pool_cache) > self.POOL_CACHE_SIZE:
+            self._pool_cache.popitem(last=False)
+        return value
+        
+    def _pool_info_from_account(self, pool_address: str, account: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get basic pool information from fetched account data."""
+        if not account:
             return {}
             
-    def _determine_route_type(self, amm_states: Dict[str, Any]) -> str:
-        """Determine transaction route type."""
+        # Get program info
+        program_id = account["owner"]
+        return {
+            "address": pool_address,
+            "program_id": program_id,
+            "program_name": self._known_programs.get(program_id, "unknown")
+        }
+        
+    def _determine_route_type(self, amm_states: Dict[str, PoolSnapshot], token_masks: Dict[str, int]) -> str:
+        """Determine transaction route type from the pools' token bitmasks."""
         if not amm_states:
             return "unknown"
             
@@ -285,56 +1116,37 @@ class SolanaCollector:
             return "direct"
         elif pool_count > 1:
             # Check if multi-hop by analyzing token flow
-            tokens_seen = set()
-            for state in amm_states.values():
-                pool_info = state.get("pool_info", {})
-                pool_tokens = set(pool_info.get("tokens", []))
+            tokens_seen = 0
+            for pool_address in amm_states:
+                pool_tokens = token_masks.get(pool_address, 0)
                 
-                if tokens_seen and not tokens_seen.intersection(pool_tokens):
+                if tokens_seen and not tokens_seen & pool_tokens:
                     return "multi-hop"
                     
-                tokens_seen.update(pool_tokens)
+                tokens_seen |= pool_tokens
                 
             return "split"
             
         return "unknown"
         
-    async def _is_pool_account(self, account: str) -> bool:
-        """Check if an account is a pool account."""
-        try:
-            # Get account info
-            account_data = await self.client.get_account_info(
-                Pubkey.from_string(account)
-            )
+    def _is_pool_data(self, account: Optional[Dict[str, Any]]) -> bool:
+        """Check if fetched account data belongs to a pool account."""
+        if not account:
+            return False
             
-            if not account_data:
-                return False
-                
-            # Check if owned by known DEX program
-            program_id = str(account_data.owner)
-            if program_id not in self.parser.KNOWN_PROGRAMS:
-                return False
-                
-            # Check data size - pools have large data
-            if len(account_data.data) < 100:
-                return False
-                
-            # Check program-specific patterns
-            program_name = self.parser.KNOWN_PROGRAMS[program_id]
-            
-            if program_name == "Jupiter":
-                return self._is_jupiter_pool(account_data.data)
-            elif program_name == "Orca":
-                return self._is_orca_pool(account_data.data)
-            elif program_name == "Raydium":
-                return self._is_raydium_pool(account_data.data)
-                
+        # Check if owned by known DEX program
+        check = self._pool_check_by_program.get(account["owner"])
+        if check is None:
             return False
             
-        except Exception as e:
-            logger.error(f"Error checking pool account: {e}")
+        # Check data size - pools have large data
+        data = account["data"]
+        if len(data) < 100:
             return False
             
+        # Check program-specific patterns
+        return check(data)
+        
     def _is_jupiter_pool(self, data: bytes) -> bool:
         """Check Jupiter pool data pattern."""
         try:
@@ -386,6 +1198,12 @@ class SolanaCollector:
     async def close(self):
         """Close all connections."""
         try:
+            if self._poll_task is not None:
+                self._poll_task.cancel()
+            for task in [*(self._pipeline_tasks or []), *self._retry_tasks]:
+                task.cancel()
             await self.client.close()
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
         except Exception as e:
             logger.error(f"Error closing connections: {e}")
\ No newline at end of file
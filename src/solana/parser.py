@@ -1,30 +1,171 @@
 """
 Solana transaction parser using solana-tx-parser.
 """
+import atexit
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import re
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Union
 
+import numpy as np
 from solana.rpc.types import TxOpts
 from solana.rpc.commitment import Commitment
 from solders.pubkey import Pubkey
 from solders.transaction import Transaction
 
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖
+    njit = None
+
+from ..config import PARSER_WORKERS
+
 logger = logging.getLogger(__name__)
 
+# 字段缺失时使用的共享只读空字典，避免每次.get()都新建{}
+_EMPTY = MappingProxyType({})
+
+# 路由日志识别，忽略大小写且不为每条日志生成小写副本
+_ROUTE_RE = re.compile(r"route.*?(direct|split|multi|hop)", re.IGNORECASE)
+_ROUTE_TYPES = {"direct": "direct", "split": "split", "multi": "multi-hop", "hop": "multi-hop"}
+
+# 10的幂查找表，代币精度为u8
+_POW10 = tuple(10 ** d for d in range(256))
+
+# 按(程序ID, 指令数据)缓存的指令数据解析结果条数
+INSTRUCTION_CACHE_SIZE = 8192
+
+# 交易前后都有记录的余额数达到该值才用数组计算变化，常见交易只有几条余额，数组准备和内核调用的开销大于循环本身
+VECTOR_DIFF_MIN_BALANCES = 8
+
+# 记录代币精度的代币数上限，代币地址来自链上数据，数量不受控
+MINT_DECIMALS_CACHE_SIZE = 65_536
+
+# 地址来自链上数据，数量不受控，用有界缓存代替sys.intern以便淘汰
+@lru_cache(maxsize=100_000)
+def _intern(value):
+    """返回首次出现的相等值，让重复的地址和代币共用同一个字符串对象"""
+    return value
+
+# RPC返回的JSON中保存地址的字段
+_ADDRESS_FIELDS = ("mint", "pubkey", "programId", "owner")
+
+def _intern_rpc(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """json.loads的object_hook，解码时即对地址字段去重"""
+    for field in _ADDRESS_FIELDS:
+        value = obj.get(field)
+        if isinstance(value, str):
+            obj[field] = _intern(value)
+    return obj
+
+# 交易类型识别的日志关键词，预编译为单个正则，避免逐个关键词查找
+_LIQUIDITY_LOG_RE = re.compile("|".join(map(re.escape, [
+    "liquidity", "Liquidity", "deposit", "Deposit", "withdraw", "Withdraw", "pool", "Pool"
+])))
+_STAKE_LOG_RE = re.compile("|".join(map(re.escape, [
+    "stake", "Stake", "delegate", "Delegate", "unstake", "Unstake", "withdraw", "Withdraw"
+])))
+
+def _balance_changes_numpy(
+    pre_amounts: np.ndarray,
+    post_amounts: np.ndarray,
+    divisors: np.ndarray
+):
+    """NumPy向量化实现"""
+    changed = np.flatnonzero(post_amounts != pre_amounts)
+    pre = pre_amounts[changed]
+    post = post_amounts[changed]
+    increased = post > pre
+    # uint64相减，未选中的分支即使回绕也不影响结果
+    diff = np.where(increased, post - pre, pre - post)
+    return changed, increased, diff / divisors[changed]
+
+if njit is not None:
+    @njit(cache=True)
+    def _balance_changes_jit(pre_amounts, post_amounts, divisors):
+        n = pre_amounts.size
+        changed = np.empty(n, np.int64)
+        increased = np.empty(n, np.bool_)
+        amounts = np.empty(n, np.float64)
+        m = 0
+        for i in range(n):
+            pre = pre_amounts[i]
+            post = post_amounts[i]
+            if post > pre:
+                changed[m] = i
+                increased[m] = True
+                amounts[m] = (post - pre) / divisors[i]
+                m += 1
+            elif post < pre:
+                changed[m] = i
+                increased[m] = False
+                amounts[m] = (pre - post) / divisors[i]
+                m += 1
+        return changed[:m], increased[:m], amounts[:m]
+else:
+    _balance_changes_jit = None
+
+def _balance_changes(
+    pre_amounts: np.ndarray,
+    post_amounts: np.ndarray,
+    divisors: np.ndarray
+):
+    """
+    计算交易前后代币余额的变化，有Numba时使用编译的循环
+    
+    Args:
+        pre_amounts: 交易前的uint64原始数量数组
+        post_amounts: 交易后的uint64原始数量数组
+        divisors: 按代币精度换算的float64除数数组(10**decimals)
+        
+    Returns:
+        (有变化的下标, 是否为增加, 按精度换算后的变化量)
+    """
+    if _balance_changes_jit is not None:
+        return _balance_changes_jit(pre_amounts, post_amounts, divisors)
+    return _balance_changes_numpy(pre_amounts, post_amounts, divisors)
+
 class TransactionParser:
     """
     Parser for Solana transactions using solana-tx-parser.
     """
     
+    # DEX程序ID -> DEX名称
+    KNOWN_DEX_PROGRAMS = {
+        "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB": "Jupiter",
+        "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc": "Orca",
+        "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8": "Raydium"
+    }
+    
+    # 常见代币mint地址 -> 代币符号
+    KNOWN_TOKENS = {
+        "So11111111111111111111111111111111111111112": "SOL",
+        "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": "USDC",
+        "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB": "USDT"
+    }
+    
     def __init__(self):
         """Initialize the parser."""
         # Load known program IDs and their IDLs
-        self.known_programs = {
-            "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB": "Jupiter",
-            "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc": "Orca",
-            "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8": "Raydium"
+        self.known_programs = dict(self.KNOWN_DEX_PROGRAMS)
+        # 程序ID直接映射到指令数据解析函数
+        data_parsers = {
+            "Jupiter": self._parse_jupiter_data,
+            "Orca": self._parse_orca_data,
+            "Raydium": self._parse_raydium_data
+        }
+        self._dex_dispatch = {
+            program_id: data_parsers[name]
+            for program_id, name in self.known_programs.items()
         }
+        # 相同程序和指令数据的解析结果相同，热门交易路径会反复出现
+        self._parse_program_data = lru_cache(maxsize=INSTRUCTION_CACHE_SIZE)(self._parse_program_data)
+        # 代币精度不会改变，记录RPC数据中出现过的精度(LRU)，供缺少精度字段的余额使用
+        self._mint_decimals: "OrderedDict[str, int]" = OrderedDict()
     
     def parse_transaction(self, tx_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -37,32 +178,36 @@ class TransactionParser:
             Parsed transaction data
         """
         try:
+            transaction = tx_data.get("transaction") or _EMPTY
+            meta = tx_data.get("meta") or _EMPTY
+            
             # Extract basic transaction info
             result = {
-                "signature": tx_data.get("transaction", {}).get("signatures", [])[0],
+                "signature": transaction.get("signatures", [])[0],
                 "slot": tx_data.get("slot"),
                 "block_time": tx_data.get("blockTime"),
-                "success": not tx_data.get("meta", {}).get("err"),
-                "fee": tx_data.get("meta", {}).get("fee", 0),
+                "success": not meta.get("err"),
+                "fee": meta.get("fee", 0),
                 "instructions": [],
                 "token_transfers": [],
-                "program_ids": set(),
-                "accounts": set()
+                # Insertion-ordered dicts dedupe while keeping first-seen order
+                "program_ids": {},
+                "accounts": {}
             }
             
             # Parse instructions
-            if "message" in tx_data.get("transaction", {}):
-                message = tx_data["transaction"]["message"]
+            if "message" in transaction:
+                message = transaction["message"]
                 
                 # Get account keys
                 account_keys = []
                 for key in message.get("accountKeys", []):
                     if isinstance(key, str):
-                        account_keys.append(key)
+                        account_keys.append(_intern(key))
                     elif isinstance(key, dict) and "pubkey" in key:
-                        account_keys.append(key["pubkey"])
+                        account_keys.append(_intern(key["pubkey"]))
                         
-                result["accounts"].update(account_keys)
+                result["accounts"] = dict.fromkeys(account_keys)
                 
                 # Parse each instruction
                 for idx, ix in enumerate(message.get("instructions", [])):
@@ -70,45 +215,50 @@ class TransactionParser:
                     if parsed_ix:
                         result["instructions"].append(parsed_ix)
                         if "programId" in parsed_ix:
-                            result["program_ids"].add(parsed_ix["programId"])
+                            result["program_ids"][parsed_ix["programId"]] = None
                             
             # Parse token transfers
-            if "meta" in tx_data and "postTokenBalances" in tx_data["meta"]:
-                pre_balances = tx_data["meta"].get("preTokenBalances", [])
-                post_balances = tx_data["meta"].get("postTokenBalances", [])
+            if "postTokenBalances" in meta:
+                pre_balances = meta.get("preTokenBalances", [])
+                post_balances = meta["postTokenBalances"]
                 
                 # Create balance maps
                 pre_map = {
-                    (b.get("accountIndex"), b.get("mint")): b 
+                    (b.get("accountIndex"), _intern(b.get("mint"))): b 
                     for b in pre_balances if "mint" in b
                 }
                 post_map = {
-                    (b.get("accountIndex"), b.get("mint")): b 
+                    (b.get("accountIndex"), _intern(b.get("mint"))): b 
                     for b in post_balances if "mint" in b
                 }
                 
-                # Find balance changes
-                for key in post_map:
-                    idx, mint = key
-                    post_bal = post_map[key]
-                    
-                    if key in pre_map:
-                        pre_bal = pre_map[key]
-                        
-                        pre_amount = float(pre_bal.get("uiTokenAmount", {}).get("uiAmount", 0))
-                        post_amount = float(post_bal.get("uiTokenAmount", {}).get("uiAmount", 0))
-                        
-                        if post_amount != pre_amount:
-                            transfer = {
-                                "token": mint,
-                                "from_index": idx if post_amount < pre_amount else None,
-                                "to_index": idx if post_amount > pre_amount else None,
-                                "amount": abs(post_amount - pre_amount),
-                                "decimals": post_bal.get("uiTokenAmount", {}).get("decimals", 0)
-                            }
-                            result["token_transfers"].append(transfer)
+                # Find balance changes: diff all paired amounts at once and
+                # only build transfer dicts for the entries that changed
+                keys = sorted(post_map.keys() & pre_map.keys())
+                # Compare raw integer amounts (u64, so uint64 arrays) and only
+                # convert to UI units for the transfers that are emitted
+                pre_amounts = np.array(
+                    [int((pre_map[key].get("uiTokenAmount") or _EMPTY).get("amount", "0")) for key in keys],
+                    dtype=np.uint64
+                )
+                post_amounts = np.array(
+                    [int((post_map[key].get("uiTokenAmount") or _EMPTY).get("amount", "0")) for key in keys],
+                    dtype=np.uint64
+                )
+                for i in np.flatnonzero(post_amounts != pre_amounts).tolist():
+                    idx, mint = keys[i]
+                    delta = int(post_amounts[i]) - int(pre_amounts[i])
+                    decimals = (post_map[keys[i]].get("uiTokenAmount") or _EMPTY).get("decimals", 0)
+                    transfer = {
+                        "token": mint,
+                        "from_index": idx if delta < 0 else None,
+                        "to_index": idx if delta > 0 else None,
+                        "amount": abs(delta) / _POW10[decimals],
+                        "decimals": decimals
+                    }
+                    result["token_transfers"].append(transfer)
                             
-            # Convert sets to lists for JSON serialization
+            # Convert to lists for JSON serialization
             result["program_ids"] = list(result["program_ids"])
             result["accounts"] = list(result["accounts"])
             
@@ -137,25 +287,24 @@ class TransactionParser:
             program_id = account_keys[program_id_index]
             
             # Get account metas
+            header = ix.get("header") or _EMPTY
+            num_signers = header.get("numRequiredSignatures", 0)
+            num_writable = header.get("numRequiredWritableSignings", 0)
             accounts = []
             for idx in ix.get("accounts", []):
                 if idx < len(account_keys):
                     accounts.append({
                         "pubkey": account_keys[idx],
-                        "is_signer": idx < ix.get("header", {}).get("numRequiredSignatures", 0),
-                        "is_writable": idx < ix.get("header", {}).get("numRequiredWritableSignings", 0)
+                        "is_signer": idx < num_signers,
+                        "is_writable": idx < num_writable
                     })
                     
-            # Parse data based on program
+            # Parse data based on program; results are cached, so hand out a copy
             parsed_data = None
-            if program_id in self.known_programs:
-                program_name = self.known_programs[program_id]
-                if program_name == "Jupiter":
-                    parsed_data = self._parse_jupiter_data(ix.get("data"))
-                elif program_name == "Orca":
-                    parsed_data = self._parse_orca_data(ix.get("data"))
-                elif program_name == "Raydium":
-                    parsed_data = self._parse_raydium_data(ix.get("data"))
+            if program_id in self._dex_dispatch:
+                parsed_data = self._parse_program_data(program_id, ix.get("data"))
+                if parsed_data:
+                    parsed_data = dict(parsed_data)
                     
             return {
                 "programId": program_id,
@@ -167,6 +316,20 @@ class TransactionParser:
             logger.error(f"Error parsing instruction: {e}")
         return None
     
+    def _parse_program_data(self, program_id: str, data: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Parse instruction data of a known program.
+        
+        Args:
+            program_id: Program ID
+            data: Encoded instruction data
+            
+        Returns:
+            Parsed instruction data
+        """
+        parser_fn = self._dex_dispatch.get(program_id)
+        return parser_fn(data) if parser_fn else None
+        
     def _parse_jupiter_data(self, data: str) -> Optional[Dict[str, Any]]:
         """Parse Jupiter instruction data."""
         try:
@@ -193,68 +356,17 @@ class TransactionParser:
         except Exception as e:
             logger.error(f"Error parsing Raydium data: {e}")
         return None
-
-# 创建解析器实例
-parser = TransactionParser()
-
-# 外部接口函数
-def parse_transaction(tx_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    解析单个交易
     
-    Args:
-        tx_data: 原始交易数据
-        
-    Returns:
-        解析后的交易数据
-    """
-    return parser.parse_transaction(tx_data)
-
-def prepare_for_mobile_storage(parsed_txs: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
-    """
-    准备用于移动端存储的数据
-    
-    Args:
-        parsed_txs: 单个或多个已解析的交易数据
-        
-    Returns:
-        适合移动端存储的数据
-    """
-    if isinstance(parsed_txs, dict):
-        return parser.prepare_for_storage(parsed_txs)
-    elif isinstance(parsed_txs, list):
-        return [parser.prepare_for_storage(tx) for tx in parsed_txs]
-    else:
-        raise ValueError("输入数据类型错误，应为字典或字典列表")
-
-def prepare_for_api_analysis(parsed_txs: List[Dict[str, Any]], wallet_address: str) -> Dict[str, Any]:
-        """
-        准备用于API分析的数据
-        
-        Args:
-            parsed_txs: 已解析的交易数据列表
-            wallet_address: 钱包地址
-            
-        Returns:
-            适合提交给API分析的数据
-        """
-    return parser.prepare_for_api_analysis(parsed_txs, wallet_address)
-
-def extract_trading_pairs(parsed_txs: List[Dict[str, Any]]) -> Dict[str, int]:
-        """
-        从解析后的交易中提取交易对
-        
-        Args:
-            parsed_txs: 已解析的交易数据列表
-            
-        Returns:
-            交易对及其交易次数
-        """
-    return parser.extract_trading_pairs(parsed_txs) 
+    # 交易类型识别
+    def _is_liquidity_transaction(self, tx_data: Dict[str, Any]) -> bool:
+        """检查是否为流动性交易"""
+        # 检查日志中是否包含流动性相关关键词
+        if "meta" in tx_data and "logMessages" in tx_data["meta"]:
+            log_messages = tx_data["meta"]["logMessages"]
             if log_messages and isinstance(log_messages, list):
-                for log in log_messages:
-                    if any(keyword in log for keyword in ["liquidity", "Liquidity", "deposit", "Deposit", "withdraw", "Withdraw", "pool", "Pool"]):
-                        return True
+                # 关键词不含换行，拼接后一次搜索等价于逐条检查
+                if _LIQUIDITY_LOG_RE.search("\n".join(log_messages)):
+                    return True
                         
         return False
     
@@ -264,9 +376,8 @@ def extract_trading_pairs(parsed_txs: List[Dict[str, Any]]) -> Dict[str, int]:
         if "meta" in tx_data and "logMessages" in tx_data["meta"]:
             log_messages = tx_data["meta"]["logMessages"]
             if log_messages and isinstance(log_messages, list):
-                for log in log_messages:
-                    if any(keyword in log for keyword in ["stake", "Stake", "delegate", "Delegate", "unstake", "Unstake", "withdraw", "Withdraw"]):
-                        return True
+                if _STAKE_LOG_RE.search("\n".join(log_messages)):
+                    return True
                         
         return False
     
@@ -289,6 +400,23 @@ def extract_trading_pairs(parsed_txs: List[Dict[str, Any]]) -> Dict[str, int]:
                     
         return dex_info
     
+    def _decimals(self, mint: str, ui_amount: Dict[str, Any]) -> int:
+        """代币精度，余额数据缺少精度时使用之前记录的值，均无时为0"""
+        mint_decimals = self._mint_decimals
+        decimals = ui_amount.get("decimals")
+        if decimals is None:
+            decimals = mint_decimals.get(mint)
+            if decimals is None:
+                return 0
+            mint_decimals.move_to_end(mint)
+            return decimals
+        # 只记录实际出现的精度，缺失时的默认值不会固化到缓存中
+        mint_decimals[mint] = decimals
+        mint_decimals.move_to_end(mint)
+        if len(mint_decimals) > MINT_DECIMALS_CACHE_SIZE:
+            mint_decimals.popitem(last=False)
+        return decimals
+    
     def _extract_token_transfers(self, tx_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """提取代币转账信息"""
         token_transfers = []
@@ -300,63 +428,85 @@ def extract_trading_pairs(parsed_txs: List[Dict[str, Any]]) -> Dict[str, int]:
             post_balances = tx_data["meta"]["postTokenBalances"]
             
             # 创建余额索引
-            pre_bal_map = {(b.get("accountIndex"), b.get("mint")): b for b in pre_balances if "mint" in b}
-            post_bal_map = {(b.get("accountIndex"), b.get("mint")): b for b in post_balances if "mint" in b}
+            pre_bal_map = {(b.get("accountIndex"), _intern(b.get("mint"))): b for b in pre_balances if "mint" in b}
+            post_bal_map = {(b.get("accountIndex"), _intern(b.get("mint"))): b for b in post_balances if "mint" in b}
             
             # 提取账户映射
             account_keys = []
             if "transaction" in tx_data and "message" in tx_data["transaction"]:
                 account_keys = tx_data["transaction"]["message"].get("accountKeys", [])
             
+            # 交易前后都有记录的余额一次性比较，只在交易后出现的是新创建的代币账户
+            common = sorted(post_bal_map.keys() & pre_bal_map.keys())
+            new_only = sorted(post_bal_map.keys() - pre_bal_map.keys())
+            
+            # 代币数量为u64，超出int64范围，因此使用uint64数组
+            pre_uis = [pre_bal_map[key].get("uiTokenAmount") or _EMPTY for key in common]
+            post_uis = [post_bal_map[key].get("uiTokenAmount") or _EMPTY for key in common]
+            if len(common) >= VECTOR_DIFF_MIN_BALANCES:
+                changed, increased, amounts = _balance_changes(
+                    np.array([int(ui.get("amount", "0")) for ui in pre_uis], dtype=np.uint64),
+                    np.array([int(ui.get("amount", "0")) for ui in post_uis], dtype=np.uint64),
+                    np.array([_POW10[self._decimals(mint, ui)] for (_, mint), ui in zip(common, post_uis)], dtype=np.float64)
+                )
+                changes = zip(changed.tolist(), increased.tolist(), amounts.tolist())
+            else:
+                changes = []
+                for i, (pre_ui, post_ui) in enumerate(zip(pre_uis, post_uis)):
+                    pre_amount = int(pre_ui.get("amount", "0"))
+                    post_amount = int(post_ui.get("amount", "0"))
+                    if post_amount != pre_amount:
+                        divisor = _POW10[self._decimals(common[i][1], post_ui)]
+                        changes.append((i, post_amount > pre_amount, abs(post_amount - pre_amount) / divisor))
+            
             # 查找余额变化
-            for key in post_bal_map:
-                idx, mint = key
-                post_bal = post_bal_map[key]
+            for i, is_increase, amount in changes:
+                idx, mint = common[i]
                 
-                # 检查此代币在交易前是否有余额记录
-                if key in pre_bal_map:
-                    pre_bal = pre_bal_map[key]
-                    
-                    pre_amount = int(pre_bal.get("uiTokenAmount", {}).get("amount", "0"))
-                    post_amount = int(post_bal.get("uiTokenAmount", {}).get("amount", "0"))
-                    
-                    # 如果余额增加，说明是接收方
-                    if post_amount > pre_amount:
-                        token_transfer = {
-                            "token": mint,
-                            "token_symbol": self.KNOWN_TOKENS.get(mint, "Unknown"),
-                            "from_address": None,  # 无法直接确定发送方
-                            "to_address": post_bal.get("owner"),
-                            "amount": (post_amount - pre_amount) / (10 ** post_bal.get("uiTokenAmount", {}).get("decimals", 0))
-                        }
-                        token_transfers.append(token_transfer)
-                    # 如果余额减少，说明是发送方
-                    elif post_amount < pre_amount:
-                        token_transfer = {
-                            "token": mint,
-                            "token_symbol": self.KNOWN_TOKENS.get(mint, "Unknown"),
-                            "from_address": pre_bal.get("owner"),
-                            "to_address": None,  # 无法直接确定接收方
-                            "amount": (pre_amount - post_amount) / (10 ** pre_bal.get("uiTokenAmount", {}).get("decimals", 0))
-                        }
-                        token_transfers.append(token_transfer)
-                # 如果交易前没有记录，但交易后有，说明是新创建的代币账户
+                # 如果余额增加，说明是接收方
+                if is_increase:
+                    token_transfer = {
+                        "token": mint,
+                        "token_symbol": self.KNOWN_TOKENS.get(mint, "Unknown"),
+                        "from_address": None,  # 无法直接确定发送方
+                        "to_address": post_bal_map[common[i]].get("owner"),
+                        "amount": amount
+                    }
+                # 如果余额减少，说明是发送方
                 else:
-                    post_amount = int(post_bal.get("uiTokenAmount", {}).get("amount", "0"))
-                    if post_amount > 0:
-                        token_transfer = {
-                            "token": mint,
-                            "token_symbol": self.KNOWN_TOKENS.get(mint, "Unknown"),
-                            "from_address": None,
-                            "to_address": post_bal.get("owner"),
-                            "amount": post_amount / (10 ** post_bal.get("uiTokenAmount", {}).get("decimals", 0))
-                        }
-                        token_transfers.append(token_transfer)
-                        
+                    token_transfer = {
+                        "token": mint,
+                        "token_symbol": self.KNOWN_TOKENS.get(mint, "Unknown"),
+                        "from_address": pre_bal_map[common[i]].get("owner"),
+                        "to_address": None,  # 无法直接确定接收方
+                        "amount": amount
+                    }
+                token_transfers.append(token_transfer)
+                
+            # 如果交易前没有记录，但交易后有，说明是新创建的代币账户
+            for idx, mint in new_only:
+                post_bal = post_bal_map[(idx, mint)]
+                post_ui = post_bal.get("uiTokenAmount") or _EMPTY
+                post_amount = int(post_ui.get("amount", "0"))
+                if post_amount > 0:
+                    decimals = self._decimals(mint, post_ui)
+                    token_transfer = {
+                        "token": mint,
+                        "token_symbol": self.KNOWN_TOKENS.get(mint, "Unknown"),
+                        "from_address": None,
+                        "to_address": post_bal.get("owner"),
+                        "amount": post_amount / _POW10[decimals]
+                    }
+                    token_transfers.append(token_transfer)
+                    
         return token_transfers
     
-    def _extract_swap_info(self, tx_data: Dict[str, Any]) -> Dict[str, Any]:
-        """提取交换信息"""
+    def _extract_swap_info(
+        self,
+        tx_data: Dict[str, Any],
+        token_transfers: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """提取交换信息，调用方已提取过代币转账时直接传入，避免重复遍历余额"""
         swap_info = {
             "input_token": None,
             "input_token_symbol": None,
@@ -369,61 +519,47 @@ def extract_trading_pairs(parsed_txs: List[Dict[str, Any]]) -> Dict[str, int]:
         }
         
         # 从代币转账中推断交换信息
-        token_transfers = self._extract_token_transfers(tx_data)
+        if token_transfers is None:
+            token_transfers = self._extract_token_transfers(tx_data)
         
-        # 按照地址分组
-        transfers_by_address = {}
+        # 单次遍历，按地址记录最大流出和最大流入的转账 [最大流出, 最大流入]
+        extremes_by_address = defaultdict(lambda: [None, None])
         for transfer in token_transfers:
+            amount = transfer["amount"]
             from_addr = transfer.get("from_address")
             to_addr = transfer.get("to_address")
             
             if from_addr:
-                if from_addr not in transfers_by_address:
-                    transfers_by_address[from_addr] = {"in": [], "out": []}
-                transfers_by_address[from_addr]["out"].append(transfer)
-                
+                extremes = extremes_by_address[from_addr]
+                if extremes[0] is None or amount > extremes[0]["amount"]:
+                    extremes[0] = transfer
+                    
             if to_addr:
-                if to_addr not in transfers_by_address:
-                    transfers_by_address[to_addr] = {"in": [], "out": []}
-                transfers_by_address[to_addr]["in"].append(transfer)
+                extremes = extremes_by_address[to_addr]
+                if extremes[1] is None or amount > extremes[1]["amount"]:
+                    extremes[1] = transfer
         
-        # 尝试找到同时有代币流入和流出的地址(可能是交换发起者)
-        candidate_addresses = []
-        for addr, transfers in transfers_by_address.items():
-            if transfers["in"] and transfers["out"]:
-                candidate_addresses.append(addr)
-                
-        # 如果找到了候选地址，使用第一个作为交换发起者
-        if candidate_addresses:
-            trader_addr = candidate_addresses[0]
-            in_transfers = transfers_by_address[trader_addr]["in"]
-            out_transfers = transfers_by_address[trader_addr]["out"]
-            
-            # 假设最大的流出是输入代币，最大的流入是输出代币
-            if out_transfers:
-                max_out = max(out_transfers, key=lambda t: t.get("amount", 0))
+        # 同时有代币流入和流出的第一个地址可能是交换发起者
+        # 假设最大的流出是输入代币，最大的流入是输出代币
+        for max_out, max_in in extremes_by_address.values():
+            if max_out is not None and max_in is not None:
                 swap_info["input_token"] = max_out.get("token")
                 swap_info["input_token_symbol"] = max_out.get("token_symbol")
                 swap_info["input_amount"] = max_out.get("amount")
-                
-            if in_transfers:
-                max_in = max(in_transfers, key=lambda t: t.get("amount", 0))
                 swap_info["output_token"] = max_in.get("token")
                 swap_info["output_token_symbol"] = max_in.get("token_symbol")
                 swap_info["output_amount"] = max_in.get("amount")
+                break
                 
         # 检查日志中的路由信息
         if "meta" in tx_data and "logMessages" in tx_data["meta"]:
             log_messages = tx_data["meta"]["logMessages"]
             if log_messages and isinstance(log_messages, list):
                 for log in log_messages:
-                    if "route" in log.lower():
-                        if "direct" in log.lower():
-                            swap_info["route_type"] = "direct"
-                        elif "split" in log.lower():
-                            swap_info["route_type"] = "split"
-                        elif "multi" in log.lower() or "hop" in log.lower():
-                            swap_info["route_type"] = "multi-hop"
+                    match = _ROUTE_RE.search(log)
+                    if match:
+                        swap_info["route_type"] = _ROUTE_TYPES[match.group(1).lower()]
+                        break
                             
         return swap_info
     
@@ -446,10 +582,56 @@ def extract_trading_pairs(parsed_txs: List[Dict[str, Any]]) -> Dict[str, int]:
             "amount": None
         }
 
+
 # 创建解析器实例
 parser = TransactionParser()
 
+# 批量交易数达到该值才分发到进程池，小批量直接处理以免进程间通信开销占主导
+PARALLEL_MIN_BATCH = 256
+# 每个进程池任务包含的交易数
+PARALLEL_CHUNK_SIZE = 32
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    """懒加载进程池(进程数见config.PARSER_WORKERS)，子进程导入本模块时各自创建解析器实例"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PARSER_WORKERS)
+    return _pool
+
+def shutdown_pool():
+    """关闭批量解析使用的进程池，之后的批量调用会重新创建"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+atexit.register(shutdown_pool)
+
+def _map_transactions(fn, txs: List[Dict[str, Any]]) -> List[Any]:
+    """对每个交易调用模块级函数fn，交易较多时在进程池中并行处理"""
+    if len(txs) < PARALLEL_MIN_BATCH:
+        return [fn(tx) for tx in txs]
+    return list(_get_pool().map(fn, txs, chunksize=PARALLEL_CHUNK_SIZE))
+
+def _prepare_for_storage(tx: Dict[str, Any]) -> Dict[str, Any]:
+    """供进程池调用的模块级包装函数"""
+    return parser.prepare_for_storage(tx)
+
 # 外部接口函数
+def load_transaction(data: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    解码RPC返回的原始交易JSON，解码时对地址字段去重
+    
+    Args:
+        data: getTransaction结果的JSON文本
+        
+    Returns:
+        可直接传给parse_transaction的交易数据
+    """
+    return json.loads(data, object_hook=_intern_rpc)
+
 def parse_transaction(tx_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     解析单个交易
@@ -462,6 +644,18 @@ def parse_transaction(tx_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     return parser.parse_transaction(tx_data)
 
+def parse_transactions(tx_datas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    批量解析交易(如一个区块内的交易)，交易较多时使用多进程并行解析
+    
+    Args:
+        tx_datas: 原始交易数据列表
+        
+    Returns:
+        解析后的交易数据列表，顺序与输入一致
+    """
+    return _map_transactions(parse_transaction, tx_datas)
+
 def prepare_for_mobile_storage(parsed_txs: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
     """
     准备用于移动端存储的数据
@@ -475,7 +669,7 @@ def prepare_for_mobile_storage(parsed_txs: Union[Dict[str, Any], List[Dict[str,
     if isinstance(parsed_txs, dict):
         return parser.prepare_for_storage(parsed_txs)
     elif isinstance(parsed_txs, list):
-        return [parser.prepare_for_storage(tx) for tx in parsed_txs]
+        return _map_transactions(_prepare_for_storage, parsed_txs)
     else:
         raise ValueError("输入数据类型错误，应为字典或字典列表")
 
@@ -1,16 +1,80 @@
 """数据库操作模块 - 专注于交易数据存储和查询"""
-import json
+import atexit
+import hashlib
 import sqlite3
 import logging
-from typing import Dict, Any, Optional
+import mmap
+import threading
+import time
+from typing import Dict, Any, Optional, List, Set, Tuple, Union, Iterator
 import os
+from collections import OrderedDict
 from datetime import datetime
 
+import orjson
+
+try:
+    import zstandard
+except ImportError:  # zstandard为可选依赖，未安装时raw_data不压缩
+    zstandard = None
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3为可选依赖，未安装时使用标准库的blake2b
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
+# zstd帧的魔数，用于区分压缩与未压缩的raw_data
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+if zstandard is not None:
+    _compress = zstandard.ZstdCompressor(level=3).compress
+    _decompress = zstandard.ZstdDecompressor().decompress
+else:
+    _compress = None
+    _decompress = None
+
+def _dump_raw(data: Dict[str, Any]) -> bytes:
+    """Serialize raw data to JSON bytes."""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+def _pack_raw(raw: bytes) -> bytes:
+    """Prepare serialized raw data for the raw_data column, zstd-compressed when available."""
+    return _compress(raw) if _compress is not None else raw
+
+def _encode_raw(data: Dict[str, Any]) -> bytes:
+    """Serialize raw data for the raw_data column, zstd-compressed when available."""
+    return _pack_raw(_dump_raw(data))
+
+def _fingerprint(raw: bytes) -> str:
+    """128-bit content hash of serialized raw data."""
+    if blake3 is not None:
+        return blake3(raw).hexdigest()[:32]
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def _decode_raw(value: Union[str, bytes, None]) -> Optional[str]:
+    """Return the JSON text stored in a raw_data column."""
+    if isinstance(value, bytes):
+        if value.startswith(_ZSTD_MAGIC):
+            if _decompress is None:
+                raise RuntimeError("zstandard is required to read compressed raw_data")
+            value = _decompress(value)
+        return value.decode()
+    return value
+
 class Database:
     """数据库操作类"""
     
+    # 写入缓冲攒够该行数或等待超过该时间(秒)后批量提交
+    WRITE_BATCH_SIZE = 512
+    WRITE_BATCH_INTERVAL = 0.1
+    # 批量提交失败后按指数退避重试，连续失败该次数后改为逐行写入，仍失败的行丢弃
+    WRITE_MAX_RETRIES = 5
+    WRITE_MAX_BACKOFF = 5.0
+    # 记录最近已存储交易指纹的条数，用于跳过重复写入
+    SEEN_CACHE_SIZE = 100_000
+    
     def __init__(self):
         """Initialize database."""
         self.base_dir = 'data'
@@ -25,6 +89,40 @@ class Database:
         self.tx_db = os.path.join(self.base_dir, 'transactions', self.current_date, 'transactions.db')
         self.pools_db = os.path.join(self.base_dir, 'pools', 'pools.db')
         self.market_db = os.path.join(self.base_dir, 'market', 'market.db')
+        
+        # 每个数据库文件保持一个长连接，避免每次读写都重新打开
+        self._lock = threading.Lock()
+        self._conns = {
+            path: self._connect(path)
+            for path in (self.tx_db, self.pools_db, self.market_db)
+        }
+        
+        # 待写入的行，按(数据库, SQL)分组，由后台线程定时批量提交
+        # 缓冲攒满时只唤醒后台线程，不在调用方(事件循环)中写库
+        # 每行附带交易指纹(其他表为None)，提交成功后才记入已存储指纹
+        self._pending: Dict[Tuple[str, str], List[Tuple[tuple, Optional[str]]]] = {}
+        self._pending_lock = threading.Lock()
+        # 同一时间只有一次flush在取出并写入缓冲，保证各批次按入队顺序提交
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        # 提交失败的批次: (数据库, SQL) -> (连续失败次数, 下次重试时间)，只在持有_flush_lock时访问
+        self._write_failures: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        
+        # 最近已存储交易的内容指纹(LRU)，以及已入队但尚未提交的指纹
+        self._seen_tx: "OrderedDict[str, None]" = OrderedDict()
+        self._queued_tx: Set[str] = set()
+    
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        """Open a long-lived autocommit connection in WAL mode."""
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        # WAL模式下读写互不阻塞，NORMAL同步级别提交时不再每次fsync
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
     
     def initialize(self):
         """Initialize database tables."""
@@ -39,10 +137,21 @@ class Database:
                 output_amount REAL,
                 pool_address TEXT,
                 program_id TEXT,
-                raw_data TEXT
+                raw_data BLOB
             )
         ''')
         
+        # 按代币和交易对查询的索引，取最近交易时直接按索引顺序读取，无需排序
+        self._execute_query(self.tx_db, '''
+            CREATE INDEX IF NOT EXISTS ix_tx_in_ts ON transactions (input_token, timestamp DESC)
+        ''')
+        self._execute_query(self.tx_db, '''
+            CREATE INDEX IF NOT EXISTS ix_tx_out_ts ON transactions (output_token, timestamp DESC)
+        ''')
+        self._execute_query(self.tx_db, '''
+            CREATE INDEX IF NOT EXISTS ix_tx_pair_ts ON transactions (input_token, output_token, timestamp DESC)
+        ''')
+        
         # 池子数据表
         self._execute_query(self.pools_db, '''
             CREATE TABLE IF NOT EXISTS pools (
@@ -53,7 +162,7 @@ class Database:
                 reserve_b REAL,
                 last_update INTEGER,
                 program_id TEXT,
-                raw_data TEXT
+                raw_data BLOB
             )
         ''')
         
@@ -66,36 +175,179 @@ class Database:
                 price REAL,
                 volume_24h REAL,
                 tvl REAL,
-                raw_data TEXT
+                raw_data BLOB
             )
         ''')
         
+        self._start_flusher()
         logger.info("Database initialized successfully")
     
     def _execute_query(self, db_path: str, query: str, params: tuple = None):
         """Execute SQL query."""
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            with self._lock:
+                self._conns[db_path].execute(query, params or ())
                 
-            conn.commit()
-            
         except Exception as e:
             logger.error(f"Database error: {e}")
             raise
+    
+    def _execute_many(self, db_path: str, query: str, rows: List[tuple]):
+        """Execute SQL query for many rows in one transaction; errors are logged by the caller."""
+        with self._lock:
+            conn = self._conns[db_path]
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(query, rows)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    @staticmethod
+    def tx_fingerprint(tx_data: Dict[str, Any]) -> str:
+        """
+        Content fingerprint of a transaction, for deduplication.
         
-        finally:
-            if conn:
-                conn.close()
+        Args:
+            tx_data: Transaction data
+            
+        Returns:
+            32-character hex digest (BLAKE3 if installed, else BLAKE2b)
+        """
+        return _fingerprint(_dump_raw(tx_data))
+    
+    def _seen_before(self, fingerprint: str) -> bool:
+        """Return whether a fingerprint was already stored or is queued for storing."""
+        with self._pending_lock:
+            if fingerprint in self._seen_tx:
+                self._seen_tx.move_to_end(fingerprint)
+                return True
+            return fingerprint in self._queued_tx
+    
+    def _mark_stored(self, fingerprints: List[str]):
+        """Move fingerprints of committed rows from the queued set into the stored LRU."""
+        with self._pending_lock:
+            for fingerprint in fingerprints:
+                self._queued_tx.discard(fingerprint)
+                self._seen_tx[fingerprint] = None
+                self._seen_tx.move_to_end(fingerprint)
+            while len(self._seen_tx) > self.SEEN_CACHE_SIZE:
+                self._seen_tx.popitem(last=False)
+    
+    def _enqueue_write(self, db_path: str, query: str, params: tuple, fingerprint: Optional[str] = None):
+        """Buffer a row for the next batched write, waking the flusher when the batch is full."""
+        with self._pending_lock:
+            if fingerprint is not None:
+                self._queued_tx.add(fingerprint)
+            rows = self._pending.setdefault((db_path, query), [])
+            rows.append((params, fingerprint))
+            full = len(rows) >= self.WRITE_BATCH_SIZE
+        self._start_flusher()
+        if full:
+            self._flush_requested.set()
+    
+    def flush(self, final: bool = False):
+        """
+        Write all buffered rows, one transaction per table.
+        
+        Flushes are serialized so batches commit in the order they were
+        queued. A batch that fails to commit is put back at the front of
+        the buffer and retried with exponential backoff. After
+        WRITE_MAX_RETRIES failures, or on the final flush, its rows are
+        written one by one and the rows that still fail are dropped.
+        
+        Args:
+            final: Last flush before closing, skips the backoff and retries
+        """
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                if not final:
+                    # 退避中的批次留在缓冲中，等到重试时间再提交
+                    for key, (_, retry_at) in self._write_failures.items():
+                        if retry_at > now and key in pending:
+                            self._pending[key] = pending.pop(key)
+            for key, rows in pending.items():
+                try:
+                    self._execute_many(key[0], key[1], [params for params, _ in rows])
+                except Exception as e:
+                    failures = self._write_failures.get(key, (0, now))[0] + 1
+                    if not final and failures < self.WRITE_MAX_RETRIES:
+                        delay = min(self.WRITE_BATCH_INTERVAL * 2 ** failures, self.WRITE_MAX_BACKOFF)
+                        logger.warning(f"Error flushing {len(rows)} buffered rows, retrying in {delay:.1f}s: {e}")
+                        self._write_failures[key] = (failures, time.monotonic() + delay)
+                        with self._pending_lock:
+                            self._pending[key] = rows + self._pending.get(key, [])
+                        continue
+                    logger.error(f"Error flushing {len(rows)} buffered rows after {failures} attempts, writing them one by one: {e}")
+                    rows = self._write_rows_individually(key, rows)
+                self._write_failures.pop(key, None)
+                self._mark_stored([fingerprint for _, fingerprint in rows if fingerprint is not None])
+    
+    def _write_rows_individually(
+        self,
+        key: Tuple[str, str],
+        rows: List[Tuple[tuple, Optional[str]]]
+    ) -> List[Tuple[tuple, Optional[str]]]:
+        """Write rows of a repeatedly failing batch one at a time, dropping the ones that fail; returns the written rows."""
+        written = []
+        dropped = []
+        for row in rows:
+            try:
+                self._execute_many(key[0], key[1], [row[0]])
+            except Exception as e:
+                dropped.append(row)
+                error = e
+            else:
+                written.append(row)
+        if dropped:
+            logger.error(f"Dropped {len(dropped)} rows that could not be written to {key[0]}: {error}")
+            # 丢弃的交易之后可以重新存储
+            with self._pending_lock:
+                for _, fingerprint in dropped:
+                    self._queued_tx.discard(fingerprint)
+        return written
+    
+    def _start_flusher(self):
+        """Start the background thread that flushes buffered rows."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="db-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+    
+    def _flush_loop(self):
+        """Flush buffered rows every WRITE_BATCH_INTERVAL seconds, or as soon as a batch fills, until closed."""
+        while not self._closed.is_set():
+            self._flush_requested.wait(self.WRITE_BATCH_INTERVAL)
+            self._flush_requested.clear()
+            self.flush()
+    
+    def _fetch_rows(self, db_path: str, query: str, params: tuple) -> List[Dict[str, Any]]:
+        """Run a read query on the shared connection and return rows as dicts."""
+        # 先提交缓冲中的写入，保证能读到刚存储的数据
+        self.flush()
+        with self._lock:
+            cursor = self._conns[db_path].cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(query, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        for row in rows:
+            if "raw_data" in row:
+                row["raw_data"] = _decode_raw(row["raw_data"])
+        return rows
     
     async def store_transaction(self, tx_data: Dict[str, Any]):
         """Store transaction data."""
         try:
+            # 序列化一次，同时用于去重指纹和raw_data列
+            raw = _dump_raw(tx_data)
+            fingerprint = _fingerprint(raw)
+            if self._seen_before(fingerprint):
+                logger.debug(f"Skipped duplicate transaction: {tx_data.get('tx_hash')}")
+                return
+                
             query = '''
                 INSERT OR REPLACE INTO transactions 
                 (tx_hash, timestamp, input_token, input_amount, 
@@ -112,11 +364,11 @@ class Database:
                 float(tx_data.get('output_token', {}).get('amount', 0)),
                 tx_data.get('pool_address'),
                 tx_data.get('program_id'),
-                json.dumps(tx_data)
+                _pack_raw(raw)
             )
             
-            self._execute_query(self.tx_db, query, params)
-            logger.debug(f"Stored transaction: {tx_data.get('tx_hash')}")
+            self._enqueue_write(self.tx_db, query, params, fingerprint)
+            logger.debug(f"Queued transaction: {tx_data.get('tx_hash')}")
             
         except Exception as e:
             logger.error(f"Error storing transaction: {e}")
@@ -139,11 +391,11 @@ class Database:
                 float(pool_data.get('reserve_b', 0)),
                 int(datetime.now().timestamp() * 1000),
                 pool_data.get('program_id'),
-                json.dumps(pool_data)
+                _encode_raw(pool_data)
             )
             
-            self._execute_query(self.pools_db, query, params)
-            logger.debug(f"Stored pool state: {pool_data.get('pool_address')}")
+            self._enqueue_write(self.pools_db, query, params)
+            logger.debug(f"Queued pool state: {pool_data.get('pool_address')}")
             
         except Exception as e:
             logger.error(f"Error storing pool state: {e}")
@@ -163,51 +415,91 @@ class Database:
                 float(market_data.get('price', 0)),
                 float(market_data.get('volume_24h', 0)),
                 float(market_data.get('tvl', 0)),
-                json.dumps(market_data)
+                _encode_raw(market_data)
             )
             
-            self._execute_query(self.market_db, query, params)
-            logger.debug(f"Stored market state for pool: {pool_address}")
+            self._enqueue_write(self.market_db, query, params)
+            logger.debug(f"Queued market state for pool: {pool_address}")
             
         except Exception as e:
             logger.error(f"Error storing market state: {e}")
     
+    def iter_raw_transactions(self, date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """遍历某日(YYYY-MM-DD，默认当天)交易目录下的原始交易JSON文件，用于批量重新解析"""
+        # 文件经mmap映射后直接交给orjson解码，不整体读入内存，由操作系统按需换页
+        day_dir = os.path.join(self.base_dir, 'transactions', date or self.current_date)
+        if not os.path.isdir(day_dir):
+            return
+        with os.scandir(day_dir) as entries:
+            paths = sorted(entry.path for entry in entries if entry.is_file() and entry.name.endswith('.json'))
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        with memoryview(mm) as view:
+                            data = orjson.loads(view)
+                yield data
+            except (ValueError, OSError, orjson.JSONDecodeError) as e:
+                # 空文件无法映射，损坏的文件跳过
+                logger.warning(f"Skipping raw transaction file {path}: {e}")
+    
+    def close(self):
+        """Flush buffered rows and close database connections."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flush_requested.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush(final=True)
+        with self._pending_lock:
+            lost = sum(len(rows) for rows in self._pending.values())
+            self._queued_tx.clear()
+        if lost:
+            logger.error(f"Closing database with {lost} rows that could not be written")
+        with self._lock:
+            for conn in self._conns.values():
+                conn.close()
+    
     def get_transactions_by_token(self, token_address: str, limit: int = 100):
         """获取代币的所有交易"""
+        # 拆成两个分支，各自走对应索引；OR条件会导致全表扫描加排序
         query = """
-        SELECT * FROM transactions 
-        WHERE input_token = ? OR output_token = ?
+        SELECT * FROM (
+            SELECT * FROM transactions
+            WHERE input_token = ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT * FROM transactions
+            WHERE output_token = ? AND input_token IS NOT ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        )
         ORDER BY timestamp DESC
         LIMIT ?
         """
-        try:
-            conn = sqlite3.connect(self.tx_db)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, (token_address, token_address, limit))
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            if conn:
-                conn.close()
+        return self._fetch_rows(
+            self.tx_db, query,
+            (token_address, limit, token_address, token_address, limit, limit)
+        )
     
     def get_transactions_by_pair(self, token_a: str, token_b: str, limit: int = 100):
         """获取交易对的所有交易"""
+        # 两个方向分别按交易对索引的时间顺序读取后归并，读够limit行即停止，无需排序；
+        # 编号参数只绑定一次，第二个分支排除两个代币相同时的重复行
         query = """
-        SELECT * FROM transactions 
-        WHERE (input_token = ? AND output_token = ?) 
-           OR (input_token = ? AND output_token = ?)
+        SELECT * FROM transactions
+        WHERE input_token = ?1 AND output_token = ?2
+        UNION ALL
+        SELECT * FROM transactions
+        WHERE input_token = ?2 AND output_token = ?1 AND ?1 <> ?2
         ORDER BY timestamp DESC
-        LIMIT ?
+        LIMIT ?3
         """
-        try:
-            conn = sqlite3.connect(self.tx_db)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, (token_a, token_b, token_b, token_a, limit))
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            if conn:
-                conn.close()
+        return self._fetch_rows(self.tx_db, query, (token_a, token_b, limit))
     
     def get_pool_states_by_address(self, pool_address: str, limit: int = 100):
         """获取池子状态历史"""
@@ -217,15 +509,7 @@ class Database:
         ORDER BY last_update DESC
         LIMIT ?
         """
-        try:
-            conn = sqlite3.connect(self.pools_db)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, (pool_address, limit))
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            if conn:
-                conn.close()
+        return self._fetch_rows(self.pools_db, query, (pool_address, limit))
 
 # 创建一个单例数据库对象
 db = Database()
@@ -1,10 +1,23 @@
 """
 数据库模型定义
+
+表结构(CREATE_TABLES_SQL)与索引(CREATE_INDEXES_SQL)分开定义：批量导入数据时先只建表，
+写入并提交后再调用create_indexes()一次性建索引，避免每行插入都维护B树。
+新增索引请加到CREATE_INDEXES_SQL，不要写进建表语句。
 """
 import sqlite3
 
-# 数据库初始化SQL语句
-INIT_DB_SQL = """
+# 连接级PRAGMA，建表前设置，使批量写入不必每条语句都等待fsync
+FAST_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# 建表SQL语句
+CREATE_TABLES_SQL = """
 -- 基础交易表
 CREATE TABLE IF NOT EXISTS base_transactions (
     tx_hash TEXT PRIMARY KEY,
@@ -88,8 +101,10 @@ CREATE TABLE IF NOT EXISTS monitored_pairs (
     created_at INTEGER DEFAULT (strftime('%s', 'now') * 1000),
     FOREIGN KEY (address_id) REFERENCES monitored_addresses(address)
 );
+"""
 
--- 创建索引
+# 索引SQL语句，批量导入完成后再执行
+CREATE_INDEXES_SQL = """
 CREATE INDEX IF NOT EXISTS idx_base_transactions_tokens ON base_transactions(input_token, output_token);
 CREATE INDEX IF NOT EXISTS idx_base_transactions_timestamp ON base_transactions(timestamp);
 CREATE INDEX IF NOT EXISTS idx_market_states_timestamp ON market_states(timestamp);
@@ -97,6 +112,23 @@ CREATE INDEX IF NOT EXISTS idx_pool_states_pool_address ON pool_states(pool_addr
 CREATE INDEX IF NOT EXISTS idx_analysis_results_token_pair ON analysis_results(token_pair);
 """
 
-def get_schema_sql():
-    """返回数据库模型SQL"""
-    return INIT_DB_SQL 
\ No newline at end of file
+# 数据库初始化SQL语句
+INIT_DB_SQL = CREATE_TABLES_SQL + CREATE_INDEXES_SQL
+
+def get_pragma_sql(pragmas=FAST_PRAGMAS):
+    """返回PRAGMA设置SQL"""
+    return "".join(pragma + ";\n" for pragma in pragmas)
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas=FAST_PRAGMAS):
+    """在连接上应用PRAGMA设置"""
+    conn.executescript(get_pragma_sql(pragmas))
+
+def create_indexes(conn: sqlite3.Connection):
+    """批量导入提交后创建索引"""
+    conn.executescript(CREATE_INDEXES_SQL)
+
+def get_schema_sql(with_indexes: bool = True):
+    """返回数据库模型SQL，WAL等PRAGMA在建表前设置；批量导入时传入with_indexes=False"""
+    if with_indexes:
+        return get_pragma_sql() + INIT_DB_SQL
+    return get_pragma_sql() + CREATE_TABLES_SQL 
\ No newline at end of file
@@ -2,38 +2,130 @@
 Solana transaction parser core implementation.
 """
 import json
-import base64
-from typing import Dict, List, Any, Optional, Set
+import struct
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, FrozenSet, Callable, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
-@dataclass
-class TokenTransfer:
+import numpy as np
+
+try:
+    from based58 import b58decode as _b58decode
+except ImportError:  # based58为可选依赖，未安装时使用纯Python的base58
+    from base58 import b58decode as _b58decode
+
+# Recently seen instruction payloads, repeated often within a block
+INSTRUCTION_DATA_CACHE_SIZE = 4096
+
+# Little-endian layouts for fixed-width IDL types
+_FIXED_TYPES = {
+    "u8": struct.Struct("<B"),
+    "u16": struct.Struct("<H"),
+    "u32": struct.Struct("<I"),
+    "u64": struct.Struct("<Q"),
+    "i8": struct.Struct("<b"),
+    "i16": struct.Struct("<h"),
+    "i32": struct.Struct("<i"),
+    "i64": struct.Struct("<q"),
+    "bool": struct.Struct("<?"),
+}
+_U32 = _FIXED_TYPES["u32"]
+
+def _fixed_reader(layout: struct.Struct) -> Callable[[bytes, int], Tuple[Any, int]]:
+    """Build a reader for a fixed-width type."""
+    unpack_from = layout.unpack_from
+    size = layout.size
+    def read(data: bytes, offset: int) -> Tuple[Any, int]:
+        return unpack_from(data, offset)[0], offset + size
+    return read
+
+@lru_cache(maxsize=256)
+def _array_layout(type_name: str, length: int) -> struct.Struct:
+    """Layout for an array of a fixed-width type."""
+    return struct.Struct(f"<{length}{_FIXED_TYPES[type_name].format[1:]}")
+
+def _read_string(data: bytes, offset: int) -> Tuple[str, int]:
+    """Read a u32 length-prefixed UTF-8 string."""
+    length = _U32.unpack_from(data, offset)[0]
+    offset += 4
+    return data[offset:offset+length].decode(), offset + length
+
+def _read_public_key(data: bytes, offset: int) -> Tuple[str, int]:
+    """Read a 32-byte public key as hex."""
+    return data[offset:offset+32].hex(), offset + 32
+
+# IDL type name -> reader(data, offset) returning (value, new offset)
+_READERS: Dict[str, Callable[[bytes, int], Tuple[Any, int]]] = {
+    name: _fixed_reader(layout) for name, layout in _FIXED_TYPES.items()
+}
+_READERS["string"] = _read_string
+_READERS["publicKey"] = _read_public_key
+
+@lru_cache(maxsize=INSTRUCTION_DATA_CACHE_SIZE)
+def _decode_instruction_data(data: str) -> bytes:
+    """Decode base58 instruction data."""
+    return _b58decode(data.encode())
+
+# Below this many common token balances the NumPy setup costs more than the diff
+VECTOR_DIFF_MIN_BALANCES = 8
+
+def _ui_amount(balance: Dict[str, Any]) -> float:
+    """UI token amount of a balance entry, 0 when missing or null."""
+    return float(balance.get("uiTokenAmount", {}).get("uiAmount") or 0)
+
+class _FrozenSlots:
+    """
+    Copy/pickle support for frozen dataclasses with explicit __slots__.
+    
+    Without a __dict__ the default protocol restores state through
+    setattr, which the frozen __setattr__ rejects.
+    """
+    __slots__ = ()
+    
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+        
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+@dataclass(frozen=True)
+class TokenTransfer(_FrozenSlots):
+    __slots__ = ("token", "from_address", "to_address", "amount", "decimals")
+    
     token: str
     from_address: Optional[str]
     to_address: Optional[str]
     amount: float
     decimals: int
 
-@dataclass
-class ParsedInstruction:
+@dataclass(frozen=True)
+class ParsedInstruction(_FrozenSlots):
+    __slots__ = ("program_id", "program_name", "name", "data", "accounts")
+    
     program_id: str
     program_name: str
     name: str
     data: Dict[str, Any]
-    accounts: List[Dict[str, Any]]
+    accounts: Tuple[Dict[str, Any], ...]
 
-@dataclass
-class ParsedTransaction:
+@dataclass(frozen=True)
+class ParsedTransaction(_FrozenSlots):
+    __slots__ = (
+        "signature", "slot", "block_time", "success", "fee",
+        "instructions", "token_transfers", "program_ids", "accounts"
+    )
+    
     signature: str
     slot: int
     block_time: int
     success: bool
     fee: int
-    instructions: List[ParsedInstruction]
-    token_transfers: List[TokenTransfer]
-    program_ids: Set[str]
-    accounts: Set[str]
+    instructions: Tuple[ParsedInstruction, ...]
+    token_transfers: Tuple[TokenTransfer, ...]
+    program_ids: FrozenSet[str]
+    accounts: FrozenSet[str]
 
 class TransactionParser:
     """
@@ -51,17 +143,54 @@ class TransactionParser:
         """Initialize parser with program IDLs."""
         # Load program IDLs
         self.program_idls = {}
+        # Per-program instruction definitions and argument lists keyed by discriminator
+        self._ix_by_disc: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self._args_by_disc: Dict[str, Dict[Any, Tuple[Tuple[str, Dict[str, Any]], ...]]] = {}
+        # Instructions whose args are all fixed-width: (name, arg names, combined layout)
+        self._fast_unpack: Dict[str, Dict[Any, Tuple[str, Tuple[str, ...], struct.Struct]]] = {}
         for program_id in self.KNOWN_PROGRAMS:
             self._load_program_idl(program_id)
             
     def _load_program_idl(self, program_id: str):
-        """Load IDL for a program."""
+        """Load IDL for a program and build its instruction lookup tables."""
         try:
             idl_path = f"idl/{program_id}.json"
             with open(idl_path) as f:
-                self.program_idls[program_id] = json.load(f)
+                idl = json.load(f)
         except Exception:
-            pass
+            return
+        self.program_idls[program_id] = idl
+        
+        # Malformed instructions are skipped one at a time so the rest of
+        # the IDL stays usable; a skipped one decodes as raw data, as before
+        ix_by_disc = {}
+        args_by_disc = {}
+        fast_unpack = {}
+        instructions = idl.get("instructions", []) if isinstance(idl, dict) else []
+        for ix in instructions:
+            try:
+                discriminator = ix.get("discriminator")
+                # First definition wins, as with the previous linear scan
+                if discriminator in ix_by_disc:
+                    continue
+                name = ix["name"]
+                args = tuple((arg["name"], arg["type"]) for arg in ix.get("args", []))
+                # Only dict types can take the fast path; others (e.g. a bare
+                # "u64" string) are left to the generic per-argument path
+                if all(isinstance(arg_type, dict) and arg_type.get("type") in _FIXED_TYPES for _, arg_type in args):
+                    fast_unpack[discriminator] = (
+                        name,
+                        tuple(arg_name for arg_name, _ in args),
+                        struct.Struct("<" + "".join(_FIXED_TYPES[arg_type["type"]].format[1:] for _, arg_type in args))
+                    )
+            except (AttributeError, KeyError, TypeError) as e:
+                print(f"Skipping malformed instruction in IDL of {program_id}: {e!r}")
+                continue
+            ix_by_disc[discriminator] = ix
+            args_by_disc[discriminator] = args
+        self._ix_by_disc[program_id] = ix_by_disc
+        self._args_by_disc[program_id] = args_by_disc
+        self._fast_unpack[program_id] = fast_unpack
             
     def parse_transaction(self, tx_data: Dict[str, Any]) -> Optional[ParsedTransaction]:
         """
@@ -83,31 +212,28 @@ class TransactionParser:
             
             # Parse instructions
             instructions = []
-            program_ids = set()
-            accounts = set()
+            accounts = frozenset()
             
             if "message" in tx_data.get("transaction", {}):
                 message = tx_data["transaction"]["message"]
                 
-                # Get account keys
-                account_keys = []
-                for key in message.get("accountKeys", []):
-                    if isinstance(key, str):
-                        account_keys.append(key)
-                        accounts.add(key)
-                    elif isinstance(key, dict) and "pubkey" in key:
-                        account_keys.append(key["pubkey"])
-                        accounts.add(key["pubkey"])
+                # Get account keys, keeping their order for index lookups
+                account_keys = [
+                    key if isinstance(key, str) else key["pubkey"]
+                    for key in message.get("accountKeys", [])
+                    if isinstance(key, str) or (isinstance(key, dict) and "pubkey" in key)
+                ]
+                accounts = frozenset(account_keys)
                         
                 # Parse each instruction
                 for ix in message.get("instructions", []):
                     parsed_ix = self._parse_instruction(ix, account_keys)
                     if parsed_ix:
                         instructions.append(parsed_ix)
-                        program_ids.add(parsed_ix.program_id)
+            program_ids = frozenset(ix.program_id for ix in instructions)
                         
             # Parse token transfers
-            token_transfers = []
+            token_transfers = ()
             if "meta" in tx_data and "postTokenBalances" in tx_data["meta"]:
                 pre_balances = tx_data["meta"].get("preTokenBalances", [])
                 post_balances = tx_data["meta"].get("postTokenBalances", [])
@@ -123,25 +249,33 @@ class TransactionParser:
                 }
                 
                 # Find balance changes
-                for key in post_map:
-                    idx, mint = key
-                    post_bal = post_map[key]
-                    
-                    if key in pre_map:
-                        pre_bal = pre_map[key]
-                        
-                        pre_amount = float(pre_bal.get("uiTokenAmount", {}).get("uiAmount", 0))
-                        post_amount = float(post_bal.get("uiTokenAmount", {}).get("uiAmount", 0))
-                        
+                common = [key for key in post_map if key in pre_map]
+                if len(common) >= VECTOR_DIFF_MIN_BALANCES:
+                    pre_amounts = np.fromiter((_ui_amount(pre_map[key]) for key in common), np.float64, len(common))
+                    post_amounts = np.fromiter((_ui_amount(post_map[key]) for key in common), np.float64, len(common))
+                    changed = np.flatnonzero(post_amounts != pre_amounts)
+                    changes = zip(
+                        [common[i] for i in changed.tolist()],
+                        (post_amounts[changed] - pre_amounts[changed]).tolist()
+                    )
+                else:
+                    changes = []
+                    for key in common:
+                        pre_amount = _ui_amount(pre_map[key])
+                        post_amount = _ui_amount(post_map[key])
                         if post_amount != pre_amount:
-                            transfer = TokenTransfer(
-                                token=mint,
-                                from_address=account_keys[idx] if post_amount < pre_amount else None,
-                                to_address=account_keys[idx] if post_amount > pre_amount else None,
-                                amount=abs(post_amount - pre_amount),
-                                decimals=post_bal.get("uiTokenAmount", {}).get("decimals", 0)
-                            )
-                            token_transfers.append(transfer)
+                            changes.append((key, post_amount - pre_amount))
+                            
+                token_transfers = tuple(
+                    TokenTransfer(
+                        token=mint,
+                        from_address=account_keys[idx] if delta < 0 else None,
+                        to_address=account_keys[idx] if delta > 0 else None,
+                        amount=abs(delta),
+                        decimals=post_map[(idx, mint)].get("uiTokenAmount", {}).get("decimals", 0)
+                    )
+                    for (idx, mint), delta in changes
+                )
                             
             return ParsedTransaction(
                 signature=signature,
@@ -149,7 +283,7 @@ class TransactionParser:
                 block_time=block_time,
                 success=success,
                 fee=fee,
-                instructions=instructions,
+                instructions=tuple(instructions),
                 token_transfers=token_transfers,
                 program_ids=program_ids,
                 accounts=accounts
@@ -179,14 +313,15 @@ class TransactionParser:
             program_name = self.KNOWN_PROGRAMS.get(program_id, "unknown")
             
             # Get accounts
-            accounts = []
-            for idx in ix.get("accounts", []):
-                if idx < len(account_keys):
-                    accounts.append({
-                        "pubkey": account_keys[idx],
-                        "is_signer": idx < ix.get("header", {}).get("numRequiredSignatures", 0),
-                        "is_writable": idx < ix.get("header", {}).get("numRequiredWritableSignings", 0)
-                    })
+            accounts = tuple(
+                {
+                    "pubkey": account_keys[idx],
+                    "is_signer": idx < ix.get("header", {}).get("numRequiredSignatures", 0),
+                    "is_writable": idx < ix.get("header", {}).get("numRequiredWritableSignings", 0)
+                }
+                for idx in ix.get("accounts", [])
+                if idx < len(account_keys)
+            )
                     
             # Parse instruction data
             data = ix.get("data", "")
@@ -220,7 +355,7 @@ class TransactionParser:
         """
         try:
             # Decode base58 data
-            decoded = base64.b64decode(data)
+            decoded = _decode_instruction_data(data)
             
             # Get program IDL
             idl = self.program_idls.get(program_id)
@@ -229,14 +364,26 @@ class TransactionParser:
                 
             # Find instruction definition
             discriminator = decoded[0]
-            ix_def = next(
-                (ix for ix in idl["instructions"] if ix.get("discriminator") == discriminator),
-                None
-            )
+            ix_def = self._ix_by_disc[program_id].get(discriminator)
             
             if not ix_def:
                 return {"raw": data}
                 
+            # Fixed-layout instructions unpack all arguments at once
+            fast = self._fast_unpack[program_id].get(discriminator)
+            if fast is not None:
+                name, arg_names, layout = fast
+                try:
+                    values = layout.unpack_from(decoded, 1)
+                except struct.error:
+                    pass  # Truncated data, let the generic path parse what it can
+                else:
+                    return {
+                        "name": name,
+                        "discriminator": discriminator,
+                        "args": dict(zip(arg_names, values))
+                    }
+                
             # Parse instruction data according to IDL
             parsed = {
                 "name": ix_def["name"],
@@ -246,13 +393,13 @@ class TransactionParser:
             
             # Parse arguments
             offset = 1
-            for arg in ix_def.get("args", []):
+            for arg_name, arg_type in self._args_by_disc[program_id][discriminator]:
                 arg_data, offset = self._parse_idl_type(
                     decoded,
                     offset,
-                    arg["type"]
+                    arg_type
                 )
-                parsed["args"][arg["name"]] = arg_data
+                parsed["args"][arg_name] = arg_data
                 
             return parsed
             
@@ -275,33 +422,20 @@ class TransactionParser:
         try:
             type_name = type_info["type"]
             
-            if type_name == "u8":
-                return data[offset], offset + 1
-            elif type_name == "u16":
-                return int.from_bytes(data[offset:offset+2], "little"), offset + 2
-            elif type_name == "u32":
-                return int.from_bytes(data[offset:offset+4], "little"), offset + 4
-            elif type_name == "u64":
-                return int.from_bytes(data[offset:offset+8], "little"), offset + 8
-            elif type_name == "i8":
-                return int.from_bytes(data[offset:offset+1], "little", signed=True), offset + 1
-            elif type_name == "i16":
-                return int.from_bytes(data[offset:offset+2], "little", signed=True), offset + 2
-            elif type_name == "i32":
-                return int.from_bytes(data[offset:offset+4], "little", signed=True), offset + 4
-            elif type_name == "i64":
-                return int.from_bytes(data[offset:offset+8], "little", signed=True), offset + 8
-            elif type_name == "bool":
-                return bool(data[offset]), offset + 1
-            elif type_name == "string":
-                length = int.from_bytes(data[offset:offset+4], "little")
-                string_data = data[offset+4:offset+4+length].decode()
-                return string_data, offset + 4 + length
-            elif type_name == "publicKey":
-                return data[offset:offset+32].hex(), offset + 32
-            elif type_name == "array":
-                length = type_info.get("size", int.from_bytes(data[offset:offset+4], "little"))
-                offset += 0 if "size" in type_info else 4
+            reader = _READERS.get(type_name)
+            if reader is not None:
+                return reader(data, offset)
+            if type_name == "array":
+                if "size" in type_info:
+                    length = type_info["size"]
+                else:
+                    length = _U32.unpack_from(data, offset)[0]
+                    offset += 4
+                inner_type = type_info["inner"].get("type")
+                if inner_type in _FIXED_TYPES:
+                    # Fixed-width elements unpack in a single call
+                    layout = _array_layout(inner_type, length)
+                    return list(layout.unpack_from(data, offset)), offset + layout.size
                 array = []
                 for _ in range(length):
                     item, offset = self._parse_idl_type(
@@ -311,8 +445,7 @@ class TransactionParser:
                     )
                     array.append(item)
                 return array, offset
-            else:
-                return None, offset
+            return None, offset
                 
         except Exception as e:
             print(f"Error parsing IDL type: {e}")
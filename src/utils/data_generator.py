@@ -1,126 +1,325 @@
 """
 模拟数据生成器，用于测试和开发
 """
-import random
 import time
-import json
-from datetime import datetime, timedelta
+import sqlite3
+from datetime import datetime
 from typing import Dict, List, Any, Tuple
 
+import numpy as np
+import orjson
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow为可选依赖，仅按Arrow格式生成数据时需要
+    pa = None
+
+try:
+    import adbc_driver_sqlite.dbapi as adbc
+except ImportError:  # adbc_driver_sqlite为可选依赖，未安装时通过sqlite3逐行绑定写入
+    adbc = None
+
+from ..storage.schema import create_indexes
+
+# 安装了ADBC驱动时直接按列写入Arrow数据
+USE_ADBC = True
+
+# 常用代币列表
+TOKENS = {
+    "SOL": "So11111111111111111111111111111111111111112",
+    "USDC": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",
+    "USDT": "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",
+    "RAY": "4k3Dyjzvzp8eMZWUXbBCjEvwSkkk59S5iCNLY3QrkX6R",
+    "SRM": "SRMuApVNdxXokk5GT7XD5cUUgXMBCoAz2LHeuAoKWRt"
+}
+TOKEN_SYMBOLS = np.array(list(TOKENS), dtype=object)
+TOKEN_MINTS = np.array(list(TOKENS.values()), dtype=object)
+# 按代币下标(a, b)查找交易对名称
+TOKEN_PAIR_NAMES = np.array([[f"{a}/{b}" for b in TOKENS] for a in TOKENS], dtype=object)
+
+ROUTE_TYPES = ["direct", "split", "multi-hop"]
+
+# 向量化随机数生成器，整列数据一次生成
+_rng = np.random.default_rng()
+
+# Base58字母表，按下标查找字符
+ALPHABET = np.frombuffer(b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz", dtype=np.uint8)
+ADDRESS_LENGTH = 44
+SIGNATURE_LENGTH = 88
+
+# 批量写入生成数据的预编译语句，与schema.py中的表结构对应
+INSERT_BASE_TX_SQL = """
+INSERT OR REPLACE INTO base_transactions
+    (tx_hash, block_number, timestamp, from_address, to_address, success, gas_cost,
+     input_token, input_amount, output_token, output_amount)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_MARKET_STATE_SQL = """
+INSERT INTO market_states (tx_hash, price_data, depth_data, volume_data, market_data, timestamp)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+INSERT_EXECUTION_STATE_SQL = """
+INSERT INTO execution_states (tx_hash, route_data, slippage_data, performance_data, timestamp)
+VALUES (?, ?, ?, ?, ?)
+"""
+INSERT_POOL_STATE_SQL = """
+INSERT INTO pool_states (tx_hash, pool_address, reserve_data, fee_data, timestamp)
+VALUES (?, ?, ?, ?, ?)
+"""
+# 表名到INSERT语句，Arrow批次的列顺序与语句中的列顺序一致
+INSERT_SQL = {
+    "base_transactions": INSERT_BASE_TX_SQL,
+    "market_states": INSERT_MARKET_STATE_SQL,
+    "execution_states": INSERT_EXECUTION_STATE_SQL,
+    "pool_states": INSERT_POOL_STATE_SQL
+}
+
+def _random_base58(n: int, length: int) -> List[str]:
+    """一次生成n个指定长度的随机Base58字符串"""
+    text = ALPHABET[_rng.integers(0, len(ALPHABET), n * length)].tobytes().decode('ascii')
+    return [text[i:i + length] for i in range(0, n * length, length)]
+
+def gen_addresses(n: int) -> List[str]:
+    """批量生成随机Solana地址"""
+    return _random_base58(n, ADDRESS_LENGTH)
+
+def gen_signatures(n: int) -> List[str]:
+    """批量生成随机交易签名"""
+    return _random_base58(n, SIGNATURE_LENGTH)
+
 def generate_address() -> str:
     """生成随机Solana地址"""
-    return ''.join(random.choices('123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz', k=44))
+    return gen_addresses(1)[0]
 
 def generate_signature() -> str:
     """生成随机交易签名"""
-    return ''.join(random.choices('123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz', k=88))
+    return gen_signatures(1)[0]
 
-def generate_transaction_data(wallet_address: str = None) -> Dict[str, Any]:
-    """生成模拟交易数据"""
+def _json_text(obj: Any) -> str:
+    """序列化为JSON文本，SQLite中按TEXT存储"""
+    return orjson.dumps(obj).decode()
+
+def _columns_to_rows(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """将列数组转换为按行的字典列表"""
+    keys = list(columns)
+    values = [col.tolist() if isinstance(col, np.ndarray) else col for col in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+def generate_transactions_bulk(n: int, wallet_address: str = None) -> Dict[str, Any]:
+    """批量生成模拟交易数据
+    
+    Args:
+        n: 交易数量
+        wallet_address: 钱包地址，为空时随机生成
+        
+    Returns:
+        字段名到长度为n的数组的字典
+    """
     if not wallet_address:
         wallet_address = generate_address()
     
-    # 常用代币列表
-    tokens = {
-        "SOL": "So11111111111111111111111111111111111111112",
-        "USDC": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",
-        "USDT": "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",
-        "RAY": "4k3Dyjzvzp8eMZWUXbBCjEvwSkkk59S5iCNLY3QrkX6R",
-        "SRM": "SRMuApVNdxXokk5GT7XD5cUUgXMBCoAz2LHeuAoKWRt"
-    }
-    
     # 随机选择两个不同的代币
-    token_keys = list(tokens.keys())
-    token_a_key, token_b_key = random.sample(token_keys, 2)
-    token_a, token_b = tokens[token_a_key], tokens[token_b_key]
+    token_a_idx = _rng.integers(0, len(TOKEN_SYMBOLS), n)
+    token_b_idx = (token_a_idx + _rng.integers(1, len(TOKEN_SYMBOLS), n)) % len(TOKEN_SYMBOLS)
     
     # 随机确定交易方向 (买入 or 卖出)
-    is_buy = random.choice([True, False])
+    is_buy = _rng.random(n) < 0.5
     
     # 如果是买入，用户发送token_b获取token_a；如果是卖出，用户发送token_a获取token_b
-    if is_buy:
-        input_token = token_b
-        output_token = token_a
-        input_amount = round(random.uniform(1, 1000), 2)
-        output_amount = round(input_amount / random.uniform(0.8, 1.2), 6)
-    else:
-        input_token = token_a
-        output_token = token_b
-        input_amount = round(random.uniform(0.1, 10), 6)
-        output_amount = round(input_amount * random.uniform(0.8, 1.2), 2)
-    
-    timestamp = int(time.time() * 1000)
+    buy_amount = np.round(_rng.uniform(1, 1000, n), 2)
+    sell_amount = np.round(_rng.uniform(0.1, 10, n), 6)
+    rate = _rng.uniform(0.8, 1.2, n)
     
     return {
-        "transaction_hash": generate_signature(),
-        "block_number": random.randint(100000000, 200000000),
-        "timestamp": timestamp,
-        "wallet_address": wallet_address,
-        "amm_address": generate_address(),
-        "success": random.random() > 0.05,  # 5% 失败率
-        "gas_cost": round(random.uniform(0.000001, 0.00005), 8),
-        "input_token": input_token,
-        "input_amount": input_amount,
-        "output_token": output_token,
-        "output_amount": output_amount,
-        "token_pair": f"{token_a_key}/{token_b_key}"
+        "transaction_hash": gen_signatures(n),
+        "block_number": _rng.integers(100000000, 200000000, n, endpoint=True),
+        "timestamp": np.full(n, time.time_ns() // 1_000_000, dtype=np.int64),
+        "wallet_address": [wallet_address] * n,
+        "amm_address": gen_addresses(n),
+        "success": _rng.random(n) > 0.05,  # 5% 失败率
+        "gas_cost": np.round(_rng.uniform(0.000001, 0.00005, n), 8),
+        "input_token": TOKEN_MINTS[np.where(is_buy, token_b_idx, token_a_idx)],
+        "input_amount": np.where(is_buy, buy_amount, sell_amount),
+        "output_token": TOKEN_MINTS[np.where(is_buy, token_a_idx, token_b_idx)],
+        "output_amount": np.where(is_buy, np.round(buy_amount / rate, 6), np.round(sell_amount * rate, 2)),
+        "token_pair": TOKEN_PAIR_NAMES[token_a_idx, token_b_idx]
     }
 
-def generate_market_state_data(transaction_hash: str) -> Dict[str, Any]:
-    """生成市场状态数据"""
+def generate_market_states_bulk(transaction_hashes: List[str]) -> Dict[str, Any]:
+    """批量生成市场状态数据"""
+    n = len(transaction_hashes)
+    # 形状为(n, 买卖两侧, 5档, 价格和数量)
+    depth = np.stack([
+        np.round(_rng.uniform(0.1, 100, (n, 2, 5)), 6),
+        np.round(_rng.uniform(1, 1000, (n, 2, 5)), 2)
+    ], axis=-1).tolist()
+    market = zip(
+        np.round(_rng.uniform(-10, 10, n), 2).tolist(),
+        np.round(_rng.uniform(90, 110, n), 2).tolist(),
+        np.round(_rng.uniform(90, 110, n), 2).tolist(),
+        np.round(_rng.uniform(1000000, 100000000, n), 2).tolist()
+    )
     return {
-        "transaction_hash": transaction_hash,
-        "price": round(random.uniform(0.1, 100), 6),
-        "depth": {
-            "bids": [
-                [round(random.uniform(0.1, 100), 6), round(random.uniform(1, 1000), 2)]
-                for _ in range(5)
-            ],
-            "asks": [
-                [round(random.uniform(0.1, 100), 6), round(random.uniform(1, 1000), 2)]
-                for _ in range(5)
-            ]
-        },
-        "volume": round(random.uniform(10000, 1000000), 2),
-        "market_data": json.dumps({
-            "24h_change": round(random.uniform(-10, 10), 2),
-            "24h_high": round(random.uniform(90, 110), 2),
-            "24h_low": round(random.uniform(90, 110), 2),
-            "market_cap": round(random.uniform(1000000, 100000000), 2)
-        })
+        "transaction_hash": list(transaction_hashes),
+        "price": np.round(_rng.uniform(0.1, 100, n), 6),
+        "depth": [{"bids": bids, "asks": asks} for bids, asks in depth],
+        "volume": np.round(_rng.uniform(10000, 1000000, n), 2),
+        "market_data": [
+            _json_text({
+                "24h_change": change,
+                "24h_high": high,
+                "24h_low": low,
+                "market_cap": market_cap
+            })
+            for change, high, low, market_cap in market
+        ]
     }
 
-def generate_execution_state_data(transaction_hash: str) -> Dict[str, Any]:
-    """生成执行状态数据"""
+def generate_execution_states_bulk(transaction_hashes: List[str]) -> Dict[str, Any]:
+    """批量生成执行状态数据"""
+    n = len(transaction_hashes)
+    path_lengths = _rng.integers(1, 3, n, endpoint=True).tolist()
+    # 所有路由路径的地址一次生成后按长度切分
+    path_addresses = iter(gen_addresses(sum(path_lengths)))
+    route_types = _rng.choice(ROUTE_TYPES, n).tolist()
+    performance = zip(
+        _rng.integers(100, 2000, n, endpoint=True).tolist(),
+        _rng.integers(400, 600, n, endpoint=True).tolist(),
+        _rng.integers(1000, 5000, n, endpoint=True).tolist()
+    )
     return {
-        "transaction_hash": transaction_hash,
-        "route": json.dumps({
-            "path": [generate_address() for _ in range(random.randint(1, 3))],
-            "type": random.choice(["direct", "split", "multi-hop"])
-        }),
-        "slippage": round(random.uniform(0, 2), 4),
-        "performance": json.dumps({
-            "execution_time": random.randint(100, 2000),
-            "block_time": random.randint(400, 600),
-            "confirmation_time": random.randint(1000, 5000)
-        })
+        "transaction_hash": list(transaction_hashes),
+        "route": [
+            _json_text({
+                "path": [next(path_addresses) for _ in range(path_length)],
+                "type": route_type
+            })
+            for path_length, route_type in zip(path_lengths, route_types)
+        ],
+        "slippage": np.round(_rng.uniform(0, 2, n), 4),
+        "performance": [
+            _json_text({
+                "execution_time": execution_time,
+                "block_time": block_time,
+                "confirmation_time": confirmation_time
+            })
+            for execution_time, block_time, confirmation_time in performance
+        ]
+    }
+
+def generate_pool_states_bulk(transaction_hashes: List[str]) -> Dict[str, Any]:
+    """批量生成池状态数据"""
+    n = len(transaction_hashes)
+    reserves = np.round(_rng.uniform(10000, 1000000, (n, 2)), 2).tolist()
+    fees = zip(
+        np.round(_rng.uniform(0.1, 1, n), 2).tolist(),
+        np.round(_rng.uniform(0.1, 10, n), 6).tolist()
+    )
+    return {
+        "transaction_hash": list(transaction_hashes),
+        "pool_address": gen_addresses(n),
+        "reserve": [_json_text({"token_a": token_a, "token_b": token_b}) for token_a, token_b in reserves],
+        "fee": [_json_text({"fee_rate": fee_rate, "fee_amount": fee_amount}) for fee_rate, fee_amount in fees]
     }
 
+def generate_transaction_data(wallet_address: str = None) -> Dict[str, Any]:
+    """生成模拟交易数据"""
+    return _columns_to_rows(generate_transactions_bulk(1, wallet_address))[0]
+
+def generate_market_state_data(transaction_hash: str) -> Dict[str, Any]:
+    """生成市场状态数据"""
+    return _columns_to_rows(generate_market_states_bulk([transaction_hash]))[0]
+
+def generate_execution_state_data(transaction_hash: str) -> Dict[str, Any]:
+    """生成执行状态数据"""
+    return _columns_to_rows(generate_execution_states_bulk([transaction_hash]))[0]
+
 def generate_pool_state_data(transaction_hash: str) -> Dict[str, Any]:
     """生成池状态数据"""
+    return _columns_to_rows(generate_pool_states_bulk([transaction_hash]))[0]
+
+def _generate_history_columns(
+    wallet_address: str,
+    days: int,
+    daily_tx_count: Tuple[int, int]
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """按列生成历史交易数据(按时间戳升序)，返回(交易, 市场, 执行, 池)四组列"""
+    now = datetime.now()
+    # 每天随机交易数量
+    tx_counts = _rng.integers(daily_tx_count[0], daily_tx_count[1], days, endpoint=True)
+    total = int(tx_counts.sum())
+    
+    # 在当天随机时间点(时分秒)，保留当前时间的毫秒部分
+    day_offsets = np.repeat(np.arange(days, dtype=np.int64), tx_counts)
+    midnight_ms = int(now.replace(hour=0, minute=0, second=0).timestamp() * 1000)
+    timestamps = midnight_ms - day_offsets * 86400000 + _rng.integers(0, 86400, total) * 1000
+    # 其余字段与时间无关，先对时间戳排序即可得到按时间排序的结果
+    timestamps.sort(kind="stable")
+    
+    # 生成基础交易数据及关联数据
+    transactions = generate_transactions_bulk(total, wallet_address)
+    transactions["timestamp"] = timestamps
+    hashes = transactions["transaction_hash"]
+    return (
+        transactions,
+        generate_market_states_bulk(hashes),
+        generate_execution_states_bulk(hashes),
+        generate_pool_states_bulk(hashes)
+    )
+
+def _table_columns(
+    transactions: Dict[str, Any],
+    market: Dict[str, Any],
+    execution: Dict[str, Any],
+    pool: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """将生成的列映射为各数据库表的列，顺序与INSERT语句一致"""
+    hashes = transactions["transaction_hash"]
+    timestamps = transactions["timestamp"]
     return {
-        "transaction_hash": transaction_hash,
-        "pool_address": generate_address(),
-        "reserve": json.dumps({
-            "token_a": round(random.uniform(10000, 1000000), 2),
-            "token_b": round(random.uniform(10000, 1000000), 2)
-        }),
-        "fee": json.dumps({
-            "fee_rate": round(random.uniform(0.1, 1), 2),
-            "fee_amount": round(random.uniform(0.1, 10), 6)
-        })
+        "base_transactions": {
+            "tx_hash": hashes,
+            "block_number": transactions["block_number"],
+            "timestamp": timestamps,
+            "from_address": transactions["wallet_address"],
+            "to_address": transactions["amm_address"],
+            "success": transactions["success"].astype(np.int8),
+            "gas_cost": transactions["gas_cost"],
+            "input_token": transactions["input_token"],
+            "input_amount": transactions["input_amount"],
+            "output_token": transactions["output_token"],
+            "output_amount": transactions["output_amount"]
+        },
+        "market_states": {
+            "tx_hash": hashes,
+            "price_data": [_json_text(price) for price in market["price"].tolist()],
+            "depth_data": [_json_text(depth) for depth in market["depth"]],
+            "volume_data": [_json_text(volume) for volume in market["volume"].tolist()],
+            "market_data": market["market_data"],
+            "timestamp": timestamps
+        },
+        "execution_states": {
+            "tx_hash": hashes,
+            "route_data": execution["route"],
+            "slippage_data": [_json_text(slippage) for slippage in execution["slippage"].tolist()],
+            "performance_data": execution["performance"],
+            "timestamp": timestamps
+        },
+        "pool_states": {
+            "tx_hash": hashes,
+            "pool_address": pool["pool_address"],
+            "reserve_data": pool["reserve"],
+            "fee_data": pool["fee"],
+            "timestamp": timestamps
+        }
     }
 
+def _arrow_array(values: Any) -> "pa.Array":
+    """数值列直接由NumPy数组构建，字符串列使用large_string"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return pa.array(values)
+    return pa.array(list(values), type=pa.large_string())
+
 def generate_historical_trading_data(wallet_address: str, days: int = 30, daily_tx_count: Tuple[int, int] = (1, 10)) -> List[Dict[str, Any]]:
     """生成历史交易数据
     
@@ -132,39 +331,144 @@ def generate_historical_trading_data(wallet_address: str, days: int = 30, daily_
     Returns:
         包含交易数据、市场数据、执行数据和池数据的字典列表
     """
-    now = datetime.now()
-    result = []
+    transactions, market, execution, pool = _generate_history_columns(wallet_address, days, daily_tx_count)
+    result = [
+        {
+            'transaction': tx_data,
+            'market': market_data,
+            'execution': execution_data,
+            'pool': pool_data
+        }
+        for tx_data, market_data, execution_data, pool_data in zip(
+            _columns_to_rows(transactions),
+            _columns_to_rows(market),
+            _columns_to_rows(execution),
+            _columns_to_rows(pool)
+        )
+    ]
+    return result
+
+def generate_historical_trading_batches(
+    wallet_address: str,
+    days: int = 30,
+    daily_tx_count: Tuple[int, int] = (1, 10)
+) -> Dict[str, "pa.RecordBatch"]:
+    """生成历史交易数据，每张表一个Arrow RecordBatch，避免为每个单元格创建Python对象
     
-    for day in range(days):
-        target_date = now - timedelta(days=day)
-        # 当天随机交易数量
-        tx_count = random.randint(daily_tx_count[0], daily_tx_count[1])
+    Args:
+        wallet_address: 钱包地址
+        days: 生成多少天的数据
+        daily_tx_count: 每天交易数量范围(最小值, 最大值)
         
-        for _ in range(tx_count):
-            # 在当天随机时间点
-            tx_time = target_date.replace(
-                hour=random.randint(0, 23),
-                minute=random.randint(0, 59),
-                second=random.randint(0, 59)
-            )
-            timestamp = int(tx_time.timestamp() * 1000)
-            
-            # 生成基础交易数据
-            tx_data = generate_transaction_data(wallet_address)
-            tx_data['timestamp'] = timestamp
-            
-            # 生成关联数据
-            market_data = generate_market_state_data(tx_data['transaction_hash'])
-            execution_data = generate_execution_state_data(tx_data['transaction_hash'])
-            pool_data = generate_pool_state_data(tx_data['transaction_hash'])
-            
-            result.append({
-                'transaction': tx_data,
-                'market': market_data,
-                'execution': execution_data,
-                'pool': pool_data
-            })
+    Returns:
+        表名到RecordBatch的字典，列与数据库表一致
+    """
+    if pa is None:
+        raise ImportError("按Arrow格式生成数据需要安装pyarrow")
+    tables = _table_columns(*_generate_history_columns(wallet_address, days, daily_tx_count))
+    return {
+        name: pa.RecordBatch.from_arrays(
+            [_arrow_array(values) for values in columns.values()],
+            names=list(columns)
+        )
+        for name, columns in tables.items()
+    }
+
+def _insert_tables(conn: sqlite3.Connection, tables: Dict[str, Any]) -> None:
+    """在一个事务内写入各表的行，提交后统一建索引"""
+    # 一个事务提交所有行，避免自动提交模式下每行一次fsync
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        for name, rows in tables.items():
+            conn.executemany(INSERT_SQL[name], rows)
+    create_indexes(conn)
+
+def bulk_insert_generated(conn: sqlite3.Connection, rows: List[Dict[str, Any]]) -> int:
+    """将generate_historical_trading_data的结果在一个事务内批量写入数据库
+    
+    表需已用get_schema_sql(with_indexes=False)创建，写入提交后再统一建索引。
+    
+    Args:
+        conn: SQLite连接
+        rows: generate_historical_trading_data返回的字典列表
+        
+    Returns:
+        写入的交易数
+    """
+    base_rows = []
+    market_rows = []
+    execution_rows = []
+    pool_rows = []
+    for row in rows:
+        tx, market, execution, pool = row['transaction'], row['market'], row['execution'], row['pool']
+        tx_hash = tx['transaction_hash']
+        timestamp = tx['timestamp']
+        base_rows.append((
+            tx_hash, tx['block_number'], timestamp, tx['wallet_address'], tx['amm_address'],
+            int(tx['success']), tx['gas_cost'], tx['input_token'], tx['input_amount'],
+            tx['output_token'], tx['output_amount']
+        ))
+        market_rows.append((
+            tx_hash, _json_text(market['price']), _json_text(market['depth']),
+            _json_text(market['volume']), market['market_data'], timestamp
+        ))
+        execution_rows.append((
+            tx_hash, execution['route'], _json_text(execution['slippage']),
+            execution['performance'], timestamp
+        ))
+        pool_rows.append((tx_hash, pool['pool_address'], pool['reserve'], pool['fee'], timestamp))
+    
+    _insert_tables(conn, {
+        "base_transactions": base_rows,
+        "market_states": market_rows,
+        "execution_states": execution_rows,
+        "pool_states": pool_rows
+    })
+    return len(base_rows)
+
+def to_sqlite(conn: sqlite3.Connection, batches: Dict[str, "pa.RecordBatch"]) -> int:
+    """将generate_historical_trading_batches的结果批量写入数据库，按列转换后直接绑定参数
+    
+    Args:
+        conn: SQLite连接，表需已用get_schema_sql(with_indexes=False)创建
+        batches: 表名到RecordBatch的字典
+        
+    Returns:
+        写入的交易数
+    """
+    _insert_tables(conn, {
+        name: zip(*(column.to_pylist() for column in batch.columns))
+        for name, batch in batches.items()
+    })
+    return batches["base_transactions"].num_rows
+
+def ingest_batches(db_path: str, batches: Dict[str, "pa.RecordBatch"]) -> int:
+    """将generate_historical_trading_batches的结果写入数据库文件
+    
+    有ADBC驱动时按列直接写入Arrow数据，否则通过sqlite3批量绑定。
+    
+    Args:
+        db_path: 数据库文件路径，表需已用get_schema_sql(with_indexes=False)创建
+        batches: 表名到RecordBatch的字典
+        
+    Returns:
+        写入的交易数
+    """
+    if USE_ADBC and adbc is not None:
+        with adbc.connect(db_path) as adbc_conn:
+            with adbc_conn.cursor() as cursor:
+                for name, batch in batches.items():
+                    cursor.adbc_ingest(name, batch, mode="append")
+            adbc_conn.commit()
+        conn = sqlite3.connect(db_path)
+        try:
+            create_indexes(conn)
+        finally:
+            conn.close()
+        return batches["base_transactions"].num_rows
     
-    # 按时间戳排序
-    result.sort(key=lambda x: x['transaction']['timestamp'])
-    return result 
\ No newline at end of file
+    conn = sqlite3.connect(db_path)
+    try:
+        return to_sqlite(conn, batches)
+    finally:
+        conn.close()
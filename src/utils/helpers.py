@@ -3,56 +3,85 @@
 """
 import time
 import json
-import hashlib
 import logging
+import secrets
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 from ..config import REPORTS_DIR
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 交易对数量远少于交易数量，缓存交易对ID的生成和解析结果
+TOKEN_PAIR_CACHE_SIZE = 4096
+
+# 保存JSON文件的orjson选项：缩进2格，允许非字符串键和NumPy数值
+JSON_FILE_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def configure_logging(level=logging.INFO):
+    """配置根日志，仅由程序入口调用"""
+    logging.basicConfig(level=level, force=True)
+
 def current_timestamp():
     """获取当前时间戳（毫秒）"""
-    return int(time.time() * 1000)
+    return time.time_ns() // 1_000_000
 
 def format_timestamp(timestamp, format_str="%Y-%m-%d %H:%M:%S"):
     """将时间戳格式化为可读时间字符串"""
-    # 处理毫秒时间戳
+    # 处理毫秒时间戳，整数除法避免转换为浮点数
     if timestamp > 1000000000000:
-        timestamp = timestamp / 1000
+        timestamp = timestamp // 1000
     
     dt = datetime.fromtimestamp(timestamp)
     return dt.strftime(format_str)
 
+def format_timestamps_batch_utc(timestamps):
+    """批量将时间戳格式化为"%Y-%m-%d %H:%M:%S"字符串(UTC，format_timestamp为本地时间)，秒和毫秒时间戳均可"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    millis = np.where(timestamps > 1000000000000, timestamps, timestamps * 1000)
+    formatted = np.datetime_as_string(millis.astype("datetime64[ms]"), unit="s")
+    return np.char.replace(formatted, "T", " ")
+
 def ensure_directory(directory_path):
     """确保目录存在"""
     path = Path(directory_path)
     path.mkdir(parents=True, exist_ok=True)
     return path
 
+@lru_cache(maxsize=TOKEN_PAIR_CACHE_SIZE)
 def generate_token_pair_id(token_a, token_b):
     """生成交易对ID，确保顺序一致"""
     # 确保token_a和token_b按字母顺序排序，生成一致的ID
-    sorted_tokens = sorted([token_a, token_b])
-    return f"{sorted_tokens[0]}/{sorted_tokens[1]}"
+    if token_b < token_a:
+        token_a, token_b = token_b, token_a
+    return f"{token_a}/{token_b}"
 
 def generate_unique_id(prefix="", length=16):
     """生成唯一ID"""
-    timestamp = str(int(time.time() * 1000))
-    hash_obj = hashlib.md5(f"{timestamp}{prefix}".encode())
-    return f"{prefix}{hash_obj.hexdigest()[:length]}"
+    # 随机十六进制串，同一毫秒内多次调用也不会重复
+    return f"{prefix}{secrets.token_hex((length + 1) // 2)[:length]}"
 
 def safe_json_loads(json_str, default=None):
-    """安全加载JSON字符串"""
+    """
+    安全加载JSON字符串
+
+    orjson拒绝NaN、Infinity和超出双精度范围的数字，此时回退到标准库json解析。
+    注意orjson会把超出64位范围的整数解析为float，需要精确大整数时请直接使用json.loads。
+    """
+    if not json_str:
+        return default or {}
+    try:
+        return orjson.loads(json_str)
+    except orjson.JSONDecodeError:
+        pass
     try:
-        if not json_str:
-            return default or {}
         return json.loads(json_str)
-    except json.JSONDecodeError:
-        logger.error(f"JSON解析错误: {json_str[:100]}")
+    except ValueError:
+        logger.error("JSON解析错误: %s", json_str[:100])
         return default or {}
 
 def save_to_json_file(data, filename, directory=None):
@@ -63,11 +92,11 @@ def save_to_json_file(data, filename, directory=None):
     file_path = Path(directory) / filename
     
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # orjson直接输出UTF-8字节，不生成中间字符串
+        file_path.write_bytes(orjson.dumps(data, option=JSON_FILE_OPTIONS))
         return str(file_path)
     except Exception as e:
-        logger.error(f"保存JSON文件错误: {e}")
+        logger.error("保存JSON文件错误: %s", e)
         return None
 
 def load_from_json_file(file_path):
@@ -76,7 +105,7 @@ def load_from_json_file(file_path):
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
-        logger.error(f"加载JSON文件错误: {e}")
+        logger.error("加载JSON文件错误: %s", e)
         return None
 
 def format_number(number, decimal_places=4):
@@ -97,6 +126,7 @@ def calculate_percentage_change(old_value, new_value):
     except (TypeError, ZeroDivisionError):
         return 0
 
+@lru_cache(maxsize=TOKEN_PAIR_CACHE_SIZE)
 def parse_token_pair(pair_str):
     """解析交易对字符串，返回(token_a, token_b)"""
     if not pair_str or '/' not in pair_str:
@@ -108,6 +138,11 @@ def parse_token_pair(pair_str):
     
     return parts[0].strip(), parts[1].strip()
 
+def _pair_cache_clear():
+    """清空交易对缓存"""
+    generate_token_pair_id.cache_clear()
+    parse_token_pair.cache_clear()
+
 def extract_token_pair(tx):
     """从交易数据中提取交易对"""
     if not tx:
@@ -122,7 +157,7 @@ def extract_token_pair(tx):
         
         return generate_token_pair_id(input_token, output_token)
     except Exception as e:
-        logger.error(f"提取交易对错误: {e}")
+        logger.error("提取交易对错误: %s", e)
         return None
 
 def detect_transaction_type(tx, wallet_address):
@@ -142,7 +177,7 @@ def detect_transaction_type(tx, wallet_address):
         
         return "other"
     except Exception as e:
-        logger.error(f"检测交易类型错误: {e}")
+        logger.error("检测交易类型错误: %s", e)
         return "unknown"
 
 def is_buy_transaction(tx, wallet_address):
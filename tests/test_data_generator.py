@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from src.storage.schema import get_schema_sql
+from src.utils import data_generator
+
+
+def _create_tables(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(get_schema_sql(with_indexes=False))
+    finally:
+        conn.close()
+
+
+def _table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = {
+            name: conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            for name in ("base_transactions", "market_states", "execution_states", "pool_states")
+        }
+        indexes = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+    finally:
+        conn.close()
+    return counts, indexes
+
+
+@pytest.mark.parametrize("use_adbc", [True, False], ids=["adbc", "sqlite3"])
+def test_ingest_batches(tmp_path, monkeypatch, use_adbc):
+    pytest.importorskip("pyarrow")
+    if use_adbc:
+        pytest.importorskip("adbc_driver_sqlite")
+    monkeypatch.setattr(data_generator, "USE_ADBC", use_adbc)
+    db_path = str(tmp_path / "history.db")
+    _create_tables(db_path)
+    batches = data_generator.generate_historical_trading_batches("wallet", days=3, daily_tx_count=(2, 4))
+
+    written = data_generator.ingest_batches(db_path, batches)
+
+    counts, indexes = _table_counts(db_path)
+    assert written == batches["base_transactions"].num_rows
+    assert counts == {name: batch.num_rows for name, batch in batches.items()}
+    assert indexes
+
+
+def test_bulk_insert_generated(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    _create_tables(db_path)
+    rows = data_generator.generate_historical_trading_data("wallet", days=3, daily_tx_count=(2, 4))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        written = data_generator.bulk_insert_generated(conn, rows)
+    finally:
+        conn.close()
+
+    counts, indexes = _table_counts(db_path)
+    assert written == len(rows)
+    assert counts == {
+        "base_transactions": len(rows),
+        "market_states": len(rows),
+        "execution_states": len(rows),
+        "pool_states": len(rows),
+    }
+    assert indexes
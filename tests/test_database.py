@@ -0,0 +1,99 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.storage.database import Database
+
+TOKEN = "token-mint"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Database, "_start_flusher", lambda self: None)
+    database = Database()
+    database.initialize()
+    yield database
+    database.close()
+
+
+def _store(db, tx_hash, **extra):
+    tx_data = {"tx_hash": tx_hash, "input_token": {"mint": TOKEN, "amount": 1}, **extra}
+    asyncio.run(db.store_transaction(tx_data))
+    return tx_data
+
+
+def _row_count(db):
+    conn = sqlite3.connect(db.tx_db)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_reads_see_buffered_writes(db):
+    for i in range(db.WRITE_BATCH_SIZE + 10):
+        _store(db, f"tx{i}")
+
+    rows = db.get_transactions_by_token(TOKEN, limit=10_000)
+
+    assert len(rows) == db.WRITE_BATCH_SIZE + 10
+
+
+def test_close_flushes_buffered_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = Database()
+    db.initialize()
+    _store(db, "tx")
+
+    db.close()
+
+    assert _row_count(db) == 1
+
+
+def test_duplicate_transactions_are_skipped(db):
+    tx_data = _store(db, "tx")
+    asyncio.run(db.store_transaction(tx_data))
+    assert sum(len(rows) for rows in db._pending.values()) <= 1
+
+    db.flush()
+    asyncio.run(db.store_transaction(tx_data))
+
+    assert not db._pending
+    assert _row_count(db) == 1
+
+
+def test_failed_batch_backs_off(db, monkeypatch):
+    calls = []
+
+    def failing_execute_many(db_path, query, rows):
+        calls.append(len(rows))
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(db, "_execute_many", failing_execute_many)
+    _store(db, "tx")
+    db.flush()
+    db.flush()
+
+    assert calls == [1]
+    assert sum(len(rows) for rows in db._pending.values()) == 1
+
+
+def test_poison_row_is_dropped_after_retries(db, monkeypatch):
+    execute_many = db._execute_many
+
+    def poisoned_execute_many(db_path, query, rows):
+        if any("poison" in row for row in rows):
+            raise sqlite3.IntegrityError("poison row")
+        execute_many(db_path, query, rows)
+
+    monkeypatch.setattr(db, "_execute_many", poisoned_execute_many)
+    monkeypatch.setattr(db, "WRITE_MAX_RETRIES", 1)
+    _store(db, "good")
+    poison = _store(db, "poison")
+    db.flush()
+
+    assert not db._pending
+    assert [row["tx_hash"] for row in db.get_transactions_by_token(TOKEN)] == ["good"]
+    assert not db._seen_before(db.tx_fingerprint(poison))
@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+pytest.importorskip("solana")
+pytest.importorskip("solders")
+
+from src.solana import parser as solana_parser
+
+USDC = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+SOL = "So11111111111111111111111111111111111111112"
+JUPITER = "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB"
+
+
+def _balance(index, mint, amount, decimals, owner):
+    return {
+        "accountIndex": index,
+        "mint": mint,
+        "owner": owner,
+        "uiTokenAmount": {"amount": str(amount), "decimals": decimals}
+    }
+
+
+def _swap_transaction(signature="sig"):
+    return {
+        "slot": 5,
+        "blockTime": 1700000000,
+        "transaction": {
+            "signatures": [signature],
+            "message": {
+                "accountKeys": ["wallet", "usdc-account", "sol-account", JUPITER],
+                "instructions": [{"programIdIndex": 3, "accounts": [0, 1, 2], "data": "abc"}]
+            }
+        },
+        "meta": {
+            "err": None,
+            "fee": 5000,
+            "logMessages": ["Program log: route: split", "Program log: Instruction: Deposit"],
+            "preTokenBalances": [
+                _balance(1, USDC, 5_000_000, 6, "wallet"),
+                _balance(2, SOL, 0, 9, "wallet")
+            ],
+            "postTokenBalances": [
+                _balance(1, USDC, 3_000_000, 6, "wallet"),
+                _balance(2, SOL, 2_000_000_000, 9, "wallet"),
+                _balance(3, USDC, 7, 6, "other")
+            ]
+        }
+    }
+
+
+def test_parse_transaction():
+    result = solana_parser.parse_transaction(_swap_transaction())
+
+    assert result["signature"] == "sig"
+    assert result["program_ids"] == [JUPITER]
+    assert result["accounts"] == ["wallet", "usdc-account", "sol-account", JUPITER]
+    assert result["token_transfers"] == [
+        {"token": USDC, "from_index": 1, "to_index": None, "amount": 2.0, "decimals": 6},
+        {"token": SOL, "from_index": None, "to_index": 2, "amount": 2.0, "decimals": 9}
+    ]
+
+
+def test_extract_token_transfers_and_swap_info():
+    parser = solana_parser.TransactionParser()
+    tx = _swap_transaction()
+
+    transfers = parser._extract_token_transfers(tx)
+
+    assert [(t["token_symbol"], t["from_address"], t["to_address"], t["amount"]) for t in transfers] == [
+        ("USDC", "wallet", None, 2.0),
+        ("SOL", None, "wallet", 2.0),
+        ("USDC", None, "other", 7e-06)
+    ]
+    swap_info = parser._extract_swap_info(tx, transfers)
+    assert swap_info == parser._extract_swap_info(tx)
+    assert (swap_info["input_token"], swap_info["output_token"]) == (USDC, SOL)
+    assert (swap_info["input_amount"], swap_info["output_amount"]) == (2.0, 2.0)
+    assert swap_info["route_type"] == "split"
+
+
+def test_transaction_type_detection():
+    parser = solana_parser.TransactionParser()
+    tx = _swap_transaction()
+
+    assert parser._is_liquidity_transaction(tx)
+    assert not parser._is_stake_transaction(tx)
+    assert parser._extract_dex_info(tx) == {"name": "Jupiter", "program_id": JUPITER}
+
+
+def test_load_transaction_shares_address_strings():
+    raw = json.dumps(_swap_transaction())
+
+    first = solana_parser.load_transaction(raw)
+    second = solana_parser.load_transaction(raw)
+
+    assert first == _swap_transaction()
+    assert first["meta"]["postTokenBalances"][0]["mint"] is second["meta"]["postTokenBalances"][0]["mint"]
+
+
+def test_parse_transactions_in_process_pool(monkeypatch):
+    monkeypatch.setattr(solana_parser, "PARALLEL_MIN_BATCH", 4)
+    txs = [_swap_transaction(f"sig{i}") for i in range(8)]
+
+    try:
+        assert solana_parser.parse_transactions(txs) == [solana_parser.parse_transaction(tx) for tx in txs]
+    finally:
+        solana_parser.shutdown_pool()
+    assert solana_parser._pool is None
+
+
+def test_missing_decimals_are_not_memoized():
+    parser = solana_parser.TransactionParser()
+
+    def transfer_amount(decimals):
+        ui_amount = {"amount": "1000"}
+        if decimals is not None:
+            ui_amount["decimals"] = decimals
+        tx = {"meta": {
+            "preTokenBalances": [{"accountIndex": 1, "mint": "mint", "uiTokenAmount": {"amount": "0"}}],
+            "postTokenBalances": [{"accountIndex": 1, "mint": "mint", "uiTokenAmount": ui_amount}]
+        }}
+        return parser._extract_token_transfers(tx)[0]["amount"]
+
+    assert transfer_amount(None) == 1000.0
+    assert transfer_amount(3) == 1.0
+    assert transfer_amount(None) == 1.0
+
+
+def test_array_and_loop_balance_diffs_agree(monkeypatch):
+    parser = solana_parser.TransactionParser()
+    pre = [_balance(i, f"mint{i % 3}", (i * 7919) % 5 * 10 ** 9, i % 3 * 3, f"owner{i}") for i in range(12)]
+    post = [_balance(i, f"mint{i % 3}", (i * 3 + 1) % 5 * 10 ** 9, i % 3 * 3, f"owner{i}") for i in range(12)]
+    tx = {"meta": {"preTokenBalances": pre, "postTokenBalances": post}}
+
+    vectorized = parser._extract_token_transfers(tx)
+    monkeypatch.setattr(solana_parser, "VECTOR_DIFF_MIN_BALANCES", len(pre) + 1)
+    looped = parser._extract_token_transfers(tx)
+
+    assert vectorized
+    assert looped == vectorized
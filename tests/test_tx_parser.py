@@ -0,0 +1,90 @@
+import copy
+import json
+import pickle
+import struct
+
+import pytest
+
+try:
+    import based58  # noqa: F401
+except ImportError:
+    pytest.importorskip("base58")
+
+from src.tx_parser import parser as tx_parser
+from src.tx_parser.parser import ParsedInstruction, ParsedTransaction, TokenTransfer
+
+
+def _parsed_transaction():
+    transfer = TokenTransfer(
+        token="So11111111111111111111111111111111111111112",
+        from_address="A",
+        to_address=None,
+        amount=1.5,
+        decimals=9
+    )
+    instruction = ParsedInstruction(
+        program_id="11111111111111111111111111111111",
+        program_name="System Program",
+        name="transfer",
+        data={"lamports": 1000},
+        accounts=({"pubkey": "A", "isSigner": True},)
+    )
+    return ParsedTransaction(
+        signature="sig",
+        slot=1,
+        block_time=1700000000,
+        success=True,
+        fee=5000,
+        instructions=(instruction,),
+        token_transfers=(transfer,),
+        program_ids=frozenset({"11111111111111111111111111111111"}),
+        accounts=frozenset({"A"})
+    )
+
+
+@pytest.mark.parametrize("round_trip", [
+    copy.copy,
+    copy.deepcopy,
+    lambda value: pickle.loads(pickle.dumps(value)),
+], ids=["copy", "deepcopy", "pickle"])
+def test_parsed_types_round_trip(round_trip):
+    tx = _parsed_transaction()
+    restored = round_trip(tx)
+    assert restored == tx
+    assert restored.instructions[0] == tx.instructions[0]
+    assert restored.token_transfers[0] == tx.token_transfers[0]
+
+
+def test_parsed_types_stay_frozen_after_round_trip():
+    restored = pickle.loads(pickle.dumps(_parsed_transaction()))
+    with pytest.raises(AttributeError):
+        restored.slot = 2
+
+
+def _write_idl(directory, program_id, instructions):
+    idl_dir = directory / "idl"
+    idl_dir.mkdir(exist_ok=True)
+    (idl_dir / f"{program_id}.json").write_text(json.dumps({"instructions": instructions}))
+
+
+def test_malformed_idl_instructions_are_skipped_individually(tmp_path, monkeypatch):
+    program_id = next(iter(tx_parser.TransactionParser.KNOWN_PROGRAMS))
+    _write_idl(tmp_path, program_id, [
+        {"name": "anchor", "discriminator": [1, 2, 3, 4, 5, 6, 7, 8], "args": []},
+        {"discriminator": 2, "args": []},
+        {"name": "swap", "discriminator": 3, "args": [{"name": "amount", "type": {"type": "u64"}}]},
+        {"name": "legacy", "discriminator": 4, "args": [{"name": "amount", "type": "u64"}]}
+    ])
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tx_parser, "_decode_instruction_data", lambda data: data)
+    parser = tx_parser.TransactionParser()
+
+    assert program_id in parser.program_idls
+    assert parser._parse_program_data(program_id, bytes([3]) + struct.pack("<Q", 5)) == {
+        "name": "swap",
+        "discriminator": 3,
+        "args": {"amount": 5}
+    }
+    assert "raw" in parser._parse_program_data(program_id, bytes([2]))
+    assert 4 not in parser._fast_unpack[program_id]
+    assert parser._parse_program_data(program_id, bytes([4]))["name"] == "legacy"